@@ -0,0 +1,106 @@
+"""Enemy and pickup archetypes, loaded once from ARCHETYPE_FILE.
+
+Every type is a record indexed by a small integer id (its position in the
+file), so hot loops read `enemy.arch.kill_score` or index a NumPy table
+instead of comparing type strings. Adding a type means adding an entry to
+the file; the sim, the batch engine and the sprite atlas pick it up.
+"""
+from __future__ import annotations
+
+import json
+import os
+from bisect import bisect_right
+from itertools import accumulate
+
+from settings import ARCHETYPE_FILE
+
+# shot kinds
+SHOT_NONE, SHOT_BULLET, SHOT_LASER = 0, 1, 2
+_SHOTS = {"none": SHOT_NONE, "bullet": SHOT_BULLET, "laser": SHOT_LASER}
+
+# pickup effects
+EFFECT_AMMO, EFFECT_HP, EFFECT_COIN = 0, 1, 2
+_EFFECTS = {"ammo": EFFECT_AMMO, "hp": EFFECT_HP, "coin": EFFECT_COIN}
+
+
+class ArchetypeError(Exception):
+    pass
+
+
+class EnemyArchetype:
+    __slots__ = ("id", "name", "hp", "speed_mult", "color", "sprite", "shot", "bullet_color",
+                 "first_shot_delay", "kill_score", "spawn_weight", "elite")
+
+    def __init__(self, id: int, name: str, hp: int, speed_mult: float, color, sprite: str, shot: str = "none",
+                 first_shot_delay: float = 0.0, kill_score: int = 0, spawn_weight: float = 0.0,
+                 bullet_color=(255, 180, 90)) -> None:
+        if shot not in _SHOTS:
+            raise ArchetypeError(f"enemy {name!r}: unknown shot kind {shot!r}")
+        self.id = id
+        self.name = name
+        self.hp = int(hp)
+        self.speed_mult = float(speed_mult)
+        self.color = tuple(color)
+        self.sprite = sprite
+        self.shot = _SHOTS[shot]
+        self.bullet_color = tuple(bullet_color)
+        self.first_shot_delay = float(first_shot_delay)
+        self.kill_score = int(kill_score)
+        self.spawn_weight = float(spawn_weight)
+        # shooters count against MAX_ELITE_PER_LANE
+        self.elite = self.shot != SHOT_NONE
+
+
+class PickupArchetype:
+    __slots__ = ("id", "name", "color", "sprite", "effect", "amount", "score", "speed_mult", "spawn_weight")
+
+    def __init__(self, id: int, name: str, color, sprite: str, effect: str, amount: int = 1, score: int = 0,
+                 speed_mult: float = 1.0, spawn_weight: float = 0.0) -> None:
+        if effect not in _EFFECTS:
+            raise ArchetypeError(f"pickup {name!r}: unknown effect {effect!r}")
+        self.id = id
+        self.name = name
+        self.color = tuple(color)
+        self.sprite = sprite
+        self.effect = _EFFECTS[effect]
+        self.amount = int(amount)
+        self.score = int(score)
+        self.speed_mult = float(speed_mult)
+        self.spawn_weight = float(spawn_weight)
+
+
+class SpawnTable:
+    """Weighted choice by binary search over precomputed cumulative thresholds."""
+
+    def __init__(self, weights: list[float]) -> None:
+        total = sum(weights)
+        if not weights or total <= 0 or min(weights) < 0:
+            raise ArchetypeError("spawn weights must be >= 0 with a positive sum")
+        # the last type takes whatever is left above the final threshold
+        self.thresholds = [c / total for c in accumulate(weights)][:-1]
+
+    def pick(self, r: float) -> int:
+        """Type id for a uniform draw `r` in [0, 1)."""
+        return bisect_right(self.thresholds, r)
+
+
+def load(path: str = ARCHETYPE_FILE) -> tuple[list[EnemyArchetype], list[PickupArchetype]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        enemies = [EnemyArchetype(i, **entry) for i, entry in enumerate(data["enemies"])]
+        pickups = [PickupArchetype(i, **entry) for i, entry in enumerate(data["pickups"])]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise ArchetypeError(f"{path}: {e}") from None
+    if not any(not a.elite for a in enemies):
+        raise ArchetypeError(f"{path}: needs at least one enemy with shot 'none'")
+    return enemies, pickups
+
+
+ENEMIES, PICKUPS = load(os.path.join(os.path.dirname(__file__), ARCHETYPE_FILE))
+ENEMY_IDS = {a.name: a.id for a in ENEMIES}
+PICKUP_IDS = {a.name: a.id for a in PICKUPS}
+ENEMY_SPAWN = SpawnTable([a.spawn_weight for a in ENEMIES])
+PICKUP_SPAWN = SpawnTable([a.spawn_weight for a in PICKUPS])
+# spawned instead of the rolled type when the lane already holds MAX_ELITE_PER_LANE elites
+BASIC_ENEMY = next(a.id for a in ENEMIES if not a.elite)
@@ -0,0 +1,172 @@
+"""Prebuilt sprite atlas: every game sprite pre-scaled and packed into one raw RGBA file.
+
+File layout (little-endian):
+    header  magic "ATLS", version u8, width u16, height u16, count u16
+    index   per sprite: x, y, w, h u16, source file size u32, name length u8, name
+    pixels  width * height * 4 bytes, RGBA rows
+
+The runtime maps the file and wraps the pixel block in a Surface without
+decoding anything, so loading costs one read + one convert_alpha(). Ids
+are positions in entities.SPRITES. An entry whose name, size or source
+file size no longer matches is stale and the caller falls back to the PNG.
+
+Usage:
+    python atlas.py build   # after changing assets/*.png or sprite sizes
+    python atlas.py info
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+
+import pygame
+
+MAGIC = b"ATLS"
+VERSION = 1
+_HEADER = struct.Struct("<4sBHHH")
+_ENTRY = struct.Struct("<HHHHIB")
+ATLAS_WIDTH = 512  # max width; sprites are packed into rows (shelves)
+_ASSET_DIR = os.path.join(os.path.dirname(__file__), "assets")
+ATLAS_PATH = os.path.join(_ASSET_DIR, "sprites.atlas")
+
+
+class AtlasError(Exception):
+    pass
+
+
+class AtlasEntry:
+    __slots__ = ("name", "rect", "source_size")
+
+    def __init__(self, name: str, rect: pygame.Rect, source_size: int) -> None:
+        self.name = name
+        self.rect = rect
+        self.source_size = source_size
+
+
+def _source_size(name: str) -> int:
+    try:
+        return os.path.getsize(os.path.join(_ASSET_DIR, name))
+    except OSError:
+        return 0
+
+
+def pack(sizes: list[tuple[int, int]], width: int = ATLAS_WIDTH) -> tuple[list[pygame.Rect], int]:
+    """Shelf-pack `sizes` (tallest first); returns a rect per size and the atlas height."""
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    rects: list[pygame.Rect] = [pygame.Rect(0, 0, 0, 0)] * len(sizes)
+    x = y = shelf_h = 0
+    for i in order:
+        w, h = sizes[i]
+        if w > width:
+            raise AtlasError(f"sprite {w}x{h} wider than the atlas ({width})")
+        if x + w > width:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        rects[i] = pygame.Rect(x, y, w, h)
+        x += w
+        shelf_h = max(shelf_h, h)
+    return rects, y + shelf_h
+
+
+def build(sprites: list[tuple[str, tuple[int, int]]], path: str = ATLAS_PATH) -> list[AtlasEntry]:
+    """Decode, scale and pack `sprites` ((file name, size) per id) into `path`."""
+    sizes = [size for _, size in sprites]
+    width = min(ATLAS_WIDTH, sum(w for w, _ in sizes))
+    rects, height = pack(sizes, width)
+    sheet = pygame.Surface((max(1, width), max(1, height)), pygame.SRCALPHA)
+    entries = []
+    for (name, size), rect in zip(sprites, rects):
+        img = pygame.image.load(os.path.join(_ASSET_DIR, name))
+        sheet.blit(pygame.transform.smoothscale(img.convert_alpha(), size), rect)
+        entries.append(AtlasEntry(name, rect, _source_size(name)))
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, sheet.get_width(), sheet.get_height(), len(entries)))
+    for e in entries:
+        name = e.name.encode("utf-8")
+        out += _ENTRY.pack(e.rect.x, e.rect.y, e.rect.width, e.rect.height, e.source_size, len(name)) + name
+    out += pygame.image.tobytes(sheet, "RGBA")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(out)
+    os.replace(tmp, path)
+    return entries
+
+
+class Atlas:
+    """A loaded atlas; `get(id)` hands out subsurfaces of one display-format sheet."""
+
+    def __init__(self, sheet: pygame.Surface, entries: list[AtlasEntry]) -> None:
+        self.sheet = sheet
+        self.entries = entries
+        self._subsurfaces = [sheet.subsurface(e.rect) for e in entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, sprite_id: int) -> pygame.Surface:
+        return self._subsurfaces[sprite_id]
+
+    def matches(self, sprite_id: int, name: str, size: tuple[int, int]) -> bool:
+        """True if entry `sprite_id` was built from the current `name` at `size`."""
+        if sprite_id >= len(self.entries):
+            return False
+        e = self.entries[sprite_id]
+        return e.name == name and e.rect.size == tuple(size) and e.source_size == _source_size(name)
+
+    @classmethod
+    def load(cls, path: str = ATLAS_PATH) -> "Atlas":
+        """Map `path` and convert its pixels; needs a display mode for convert_alpha()."""
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            try:
+                magic, version, width, height, count = _HEADER.unpack_from(mm, 0)
+                if magic != MAGIC or version != VERSION:
+                    raise AtlasError("not a sprite atlas (or unsupported version)")
+                pos = _HEADER.size
+                entries = []
+                for _ in range(count):
+                    x, y, w, h, source_size, name_len = _ENTRY.unpack_from(mm, pos)
+                    pos += _ENTRY.size
+                    name = mm[pos:pos + name_len].decode("utf-8")
+                    pos += name_len
+                    entries.append(AtlasEntry(name, pygame.Rect(x, y, w, h), source_size))
+            except struct.error as e:
+                raise AtlasError(f"truncated atlas: {e}") from None
+            if len(mm) - pos < width * height * 4:
+                raise AtlasError("truncated atlas pixel data")
+            pixels = memoryview(mm)[pos:pos + width * height * 4]
+            try:
+                # frombuffer wraps the mapped bytes; convert_alpha makes the one real copy
+                sheet = pygame.image.frombuffer(pixels, (width, height), "RGBA").convert_alpha()
+            finally:
+                pixels.release()
+        return cls(sheet, entries)
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] not in ("build", "info"):
+        print(__doc__)
+        return 2
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    if argv[0] == "build":
+        from entities import SPRITES
+        entries = build(SPRITES)
+        print(f"{ATLAS_PATH}: {len(entries)} sprites, {os.path.getsize(ATLAS_PATH)} bytes")
+        return 0
+    try:
+        atlas = Atlas.load()
+    except (OSError, AtlasError) as e:
+        print(f"{ATLAS_PATH}: {e}")
+        return 1
+    w, h = atlas.sheet.get_size()
+    print(f"{ATLAS_PATH}: {w}x{h}, {len(atlas)} sprites")
+    for i, e in enumerate(atlas.entries):
+        stale = "" if e.source_size == _source_size(e.name) else "  (stale)"
+        print(f"  {i}: {e.name} {e.rect.width}x{e.rect.height} at {e.rect.x},{e.rect.y}{stale}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
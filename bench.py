@@ -0,0 +1,449 @@
+"""Benchmarks for the game.
+
+Usage:
+    python bench.py                          # quick summary
+    python bench.py run [-o results.json] [--repeats N] [--filter TEXT]
+    python bench.py compare base.json new.json [--alpha 0.01] [--threshold 0.05]
+
+`run` times the hot paths over fixed scenarios (seeded, speed level 1 vs
+20, light vs saturated lanes, a 1000-lane arena) and writes per-sample
+timings as JSON.
+`compare` runs a Mann-Whitney U test per benchmark and exits 1 if any
+benchmark got significantly slower by more than the threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+import pygame
+
+import entities
+from atlas import Atlas
+from bots import dodge_policy
+from core import GameCore
+from archetypes import BASIC_ENEMY
+from entities import Bullet, Enemy, LaserBeam, Pickup, SPRITES
+from settings import SIM_DT
+
+
+def bench_headless(ticks: int = 20000, seed: int = 1) -> float:
+    """Ticks/sec of the headless core driven by the scripted bot (restarts on death)."""
+    core = GameCore(seed)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if core.step(dodge_policy(core)):
+            core.reset()
+    elapsed = time.perf_counter() - start
+    return ticks / elapsed
+
+
+def _stress_core(per_lane: int) -> GameCore:
+    """Core with `per_lane` indestructible enemies in every lane and an invulnerable player."""
+    core = GameCore(0)
+    spawner = core.spawner
+    lanes = core.lane_system
+    for lane in range(lanes.lane_count):
+        x = lanes.lane_center_x(lane)
+        for i in range(per_lane):
+            e = Enemy(lane, x, -80 + 800 * i / per_lane, spawner.current_speed, BASIC_ENEMY)
+            e.hp = 10**9  # survive every hit so the scene stays saturated
+            e.spawn_id = len(spawner.enemies)
+            spawner.enemies.append(e)
+            spawner.enemy_index.add(e)
+    core.player.invuln_timer = 10**9
+    return core
+
+
+def _stress_bullets(core: GameCore, bullets_per_lane: int) -> list[Bullet]:
+    lanes = core.lane_system
+    return [
+        Bullet.acquire(lane, lanes.lane_center_x(lane), 720 * i / bullets_per_lane, from_player=True)
+        for lane in range(lanes.lane_count)
+        for i in range(bullets_per_lane)
+    ]
+
+
+def _naive_bullet_hits(core: GameCore, bullets: list[Bullet]) -> int:
+    """The old O(bullets x enemies) scan, for comparison."""
+    hits = 0
+    for b in bullets:
+        for e in core.spawner.enemies:
+            if b.rect.colliderect(e.rect):
+                hits += 1
+                break
+    return hits
+
+
+def bench_collisions(per_lane: int = 300, bullets_per_lane: int = 300, rounds: int = 5) -> tuple[float, float]:
+    """Seconds per handle_collisions() with the lane index vs the naive scan."""
+    core = _stress_core(per_lane)
+    indexed = 0.0
+    for _ in range(rounds):
+        # bullets that hit are released back to the pool; leftovers are dropped
+        core.player_bullets = _stress_bullets(core, bullets_per_lane)
+        start = time.perf_counter()
+        core.handle_collisions()
+        indexed += time.perf_counter() - start
+    bullets = _stress_bullets(core, bullets_per_lane)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        _naive_bullet_hits(core, bullets)
+    naive = (time.perf_counter() - start) / rounds
+    return indexed / rounds, naive
+
+
+def count_allocations(warmup: int = 6000, ticks: int = 6000, seed: int = 3) -> tuple[float, float]:
+    """Steady-state allocations per tick: (new pooled entities, net memory blocks).
+
+    Runs the bot long enough for the pools to reach their peak population,
+    then counts pool misses and the change in live allocator blocks.
+    """
+    pooled = (Enemy, Pickup, Bullet, LaserBeam)
+    core = GameCore(seed)
+    for _ in range(warmup):
+        if core.step(dodge_policy(core)):
+            core.reset()
+    created = sum(cls.created for cls in pooled)
+    blocks = sys.getallocatedblocks()
+    for _ in range(ticks):
+        if core.step(dodge_policy(core)):
+            core.reset()
+    new_entities = sum(cls.created for cls in pooled) - created
+    return new_entities / ticks, (sys.getallocatedblocks() - blocks) / ticks
+
+
+def bench_asset_load(rounds: int = 5) -> tuple[float, float]:
+    """Seconds to load every sprite: per-file PNG decode + scale vs the prebuilt atlas."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    png = atlas = 0.0
+    for _ in range(rounds):
+        entities._SOURCE_CACHE.clear()
+        entities._ASSET_CACHE.clear()
+        start = time.perf_counter()
+        for name, size in entities.SPRITES:
+            entities.load_sprite(name, size)
+        png += time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = Atlas.load()
+        for i in range(len(loaded)):
+            loaded.get(i)
+        atlas += time.perf_counter() - start
+    return png / rounds, atlas / rounds
+
+
+# ===== suite =====
+# name -> (speed level, saturated lanes, lane count)
+SCENARIOS = {
+    "lv1-light": (1, False, 3),
+    "lv20-light": (20, False, 3),
+    "lv1-saturated": (1, True, 3),
+    "lv20-saturated": (20, True, 3),
+    # wide arena: ~2000 live entities, most of them outside the camera view
+    "lv1-arena": (1, False, 1000),
+}
+SATURATED_PER_LANE = 40
+
+
+def make_scenario(name: str, seed: int = 1234) -> GameCore:
+    """Reproducible mid-run state: the bot plays 10 s at a fixed speed level, invulnerable.
+
+    Saturated scenarios then add SATURATED_PER_LANE indestructible enemies
+    and player bullets to every lane.
+    """
+    level, saturated, lanes = SCENARIOS[name]
+    core = GameCore(seed, lane_count=lanes)
+    for _ in range(level - 1):
+        core.spawner.increase_difficulty()
+    core.time_accum_for_speed = -1e9  # hold the level
+    core.player.invuln_timer = 1e9
+    for _ in range(600):
+        core.step(dodge_policy(core))
+    if saturated:
+        lanes = core.lane_system
+        spawner = core.spawner
+        for lane in range(lanes.lane_count):
+            x = lanes.lane_center_x(lane)
+            for i in range(SATURATED_PER_LANE):
+                e = Enemy.acquire(lane, x, -80 + 800 * i / SATURATED_PER_LANE, spawner.current_speed, BASIC_ENEMY)
+                e.hp = 10**9
+                e.spawn_id = 10**6 + len(spawner.enemies)
+                spawner.enemies.append(e)
+                spawner.enemy_index.add(e)
+        core.player_bullets += _stress_bullets(core, SATURATED_PER_LANE)
+    return core
+
+
+def _timed(setup, op, inner: int, reset=None) -> float:
+    """Seconds per `op(state)` over `inner` calls on one `setup()` state; `reset(state)` runs untimed."""
+    state = setup()
+    clock = time.perf_counter
+    total = 0.0
+    for _ in range(inner):
+        start = clock()
+        op(state)
+        total += clock() - start
+        if reset is not None:
+            reset(state)
+    return total / inner
+
+
+def _collision_state(name: str):
+    core = make_scenario(name)
+    return core, list(core.player_bullets)
+
+
+def _restore_bullets(state) -> None:
+    core, bullets = state
+    core.player_bullets[:] = bullets
+    # hits released these bullets; they are reused as-is, so keep them out of the pool
+    Bullet._free.clear()
+
+
+_game = None
+
+
+def _restore_state(name: str):
+    core = make_scenario(name)
+    return core, core.snapshot()
+
+
+def _display_game():
+    """One Game on the dummy video driver, shared by the rendering benchmarks."""
+    global _game
+    if _game is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from game import Game
+        _game = Game()
+    return _game
+
+
+def _draw_state(name: str):
+    game = _display_game()
+    game.core = make_scenario(name)
+    game.compositor.redraw_background()
+    game.draw(0.0)
+    return game, [0]
+
+
+def _draw_frame(state) -> None:
+    game, frame = state
+    frame[0] += 1
+    # a new blend value every call, so the compositor never skips the frame
+    game.draw((frame[0] % 100) / 100)
+
+
+def _hud_state():
+    game = _display_game()
+    import pygame
+    surface = pygame.Surface(game.base_size, pygame.SRCALPHA)
+    return game.hud, surface, make_scenario("lv1-light").player
+
+
+def _hud_draw(state) -> None:
+    hud, surface, player = state
+    player.score += 37
+    hud.draw_top_panel(surface, player, 3)
+
+
+def _env_state(obs_mode: str):
+    if obs_mode == "pixels":
+        _display_game()
+    from env import LaneRunnerEnv
+    env = LaneRunnerEnv(obs_mode)
+    env.reset(1)
+    return env, [0]
+
+
+def _env_step(state) -> None:
+    env, step = state
+    step[0] += 1
+    # mostly no-ops with a press every few steps, like a trained agent
+    if env.step(step[0] % 4 if step[0] % 5 == 0 else 0)[2]:
+        env.reset()
+
+
+def _update_enemies(enemies: list[Enemy]) -> None:
+    for e in enemies:
+        e.update(SIM_DT)
+
+
+def _sprite_hits(state) -> None:
+    import entities
+    for i in range(len(SPRITES)):
+        entities.sprite(i)
+
+
+def _load_sprite_hits(state) -> None:
+    import entities
+    for name, size in SPRITES:
+        entities.load_sprite(name, size)
+
+
+def benchmarks() -> list[tuple[str, object, object, int, object]]:
+    """(name, setup, op, inner calls per sample, untimed reset) for every benchmark."""
+    out = []
+    for scn in SCENARIOS:
+        out += [
+            (f"spawn_pair[{scn}]", lambda s=scn: make_scenario(s), lambda c: c.spawner.spawn_pair(), 200, None),
+            (f"spawner_update[{scn}]", lambda s=scn: make_scenario(s), lambda c: c.spawner.update(SIM_DT), 300, None),
+            (f"enemy_update[{scn}]", lambda s=scn: make_scenario(s).spawner.enemies, _update_enemies, 300, None),
+            (f"handle_collisions[{scn}]", lambda s=scn: _collision_state(s),
+             lambda st: st[0].handle_collisions(), 100, _restore_bullets),
+            (f"game_draw[{scn}]", lambda s=scn: _draw_state(s), _draw_frame, 200, None),
+            (f"snapshot[{scn}]", lambda s=scn: make_scenario(s), lambda c: c.snapshot(), 200, None),
+            (f"restore[{scn}]", lambda s=scn: _restore_state(s), lambda st: st[0].restore(st[1]), 200, None),
+        ]
+    out += [
+        ("sprite_cache_hit", _display_game, _sprite_hits, 2000, None),
+        ("load_sprite_cache_hit", _display_game, _load_sprite_hits, 2000, None),
+        ("hud_draw_top_panel", _hud_state, _hud_draw, 500, None),
+        ("env_step[grid]", lambda: _env_state("grid"), _env_step, 1000, None),
+        ("env_step[pixels]", lambda: _env_state("pixels"), _env_step, 1000, None),
+    ]
+    return out
+
+
+def run_suite(repeats: int = 15, name_filter: str | None = None, verbose: bool = True) -> dict:
+    """Time every benchmark `repeats` times.
+
+    Samples are taken round-robin (one per benchmark per round), so slow
+    drift of the machine spreads over all benchmarks as sample noise
+    instead of looking like a change in whichever one ran during it.
+    """
+    selected = [b for b in benchmarks() if not name_filter or name_filter in b[0]]
+    samples: dict[str, list[float]] = {b[0]: [] for b in selected}
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for name, setup, op, inner, reset in selected:
+            _timed(setup, op, max(1, inner // 10), reset)  # warm caches / pools
+        for _ in range(repeats):
+            for name, setup, op, inner, reset in selected:
+                samples[name].append(_timed(setup, op, inner, reset))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    results = {}
+    for name, values in samples.items():
+        median = statistics.median(values)
+        results[name] = {"unit": "s/op", "median": median, "samples": values}
+        if verbose:
+            print(f"{name:<36} {median * 1e6:10.2f} us/op")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def mann_whitney_p(a: list[float], b: list[float]) -> float:
+    """Two-sided p-value of the Mann-Whitney U test (normal approximation, tie-corrected)."""
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    ranked = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks = [0.0] * len(ranked)
+    tie_term = 0.0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+    r1 = sum(r for r, (_, group) in zip(ranks, ranked) if group == 0)
+    u = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2) / sigma
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def compare(base: dict, new: dict, alpha: float = 0.01, threshold: float = 0.05) -> int:
+    """Print per-benchmark change; returns the number of significant regressions."""
+    regressions = 0
+    base_results, new_results = base["results"], new["results"]
+    for name in sorted(set(base_results) & set(new_results)):
+        a, b = base_results[name]["samples"], new_results[name]["samples"]
+        ratio = statistics.median(b) / statistics.median(a)
+        p = mann_whitney_p(a, b)
+        flag = ""
+        if p < alpha and ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions += 1
+        elif p < alpha and ratio < 1 - threshold:
+            flag = "faster"
+        print(f"{name:<36} {ratio:6.2f}x  p={p:.4f}  {flag}")
+    for name in sorted(set(base_results) ^ set(new_results)):
+        print(f"{name:<36} only in {'base' if name in base_results else 'new'}")
+    return regressions
+
+
+def summary() -> None:
+    tps = bench_headless()
+    print(f"headless: {tps:,.0f} ticks/sec")
+    indexed, naive = bench_collisions()
+    print(f"collisions, 300 enemies + 300 bullets per lane: lane index {indexed * 1000:.2f} ms, "
+          f"naive scan {naive * 1000:.2f} ms ({naive / indexed:.0f}x)")
+    new_entities, blocks = count_allocations()
+    print(f"steady state: {new_entities:.4f} new entities/tick, {blocks:+.3f} net blocks/tick")
+    png, atlas = bench_asset_load()
+    print(f"sprite load: per-file PNG {png * 1000:.1f} ms, atlas {atlas * 1000:.2f} ms ({png / atlas:.0f}x)")
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Game benchmarks.")
+    sub = parser.add_subparsers(dest="command")
+    run_p = sub.add_parser("run", help="run the benchmark suite")
+    run_p.add_argument("-o", "--output", help="write results JSON here")
+    run_p.add_argument("--repeats", type=int, default=15, help="samples per benchmark")
+    run_p.add_argument("--filter", help="only benchmarks whose name contains this")
+    cmp_p = sub.add_parser("compare", help="compare two result files")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--alpha", type=float, default=0.01, help="significance level")
+    cmp_p.add_argument("--threshold", type=float, default=0.05, help="ignore changes smaller than this fraction")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        summary()
+        return 0
+    if args.command == "run":
+        results = run_suite(args.repeats, args.filter)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=1)
+            print(f"results written to {args.output}")
+        return 0
+    try:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"cannot read results: {e}")
+        return 2
+    return 1 if compare(base, new, args.alpha, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from core import Action, GameCore
+
+# how far above the player (pixels) a lane counts as dangerous
+DANGER_DISTANCE = 260
+
+
+def _lane_threat(core: GameCore, lane: int) -> float:
+    """Rough danger score for a lane: nearer enemies / bullets / lasers weigh more."""
+    player_y = core.player.y
+    threat = 0.0
+    for e in core.spawner.enemies:
+        if e.lane_index == lane:
+            gap = player_y - e.y
+            if -e.height < gap < DANGER_DISTANCE:
+                threat += (DANGER_DISTANCE - max(0.0, gap)) / DANGER_DISTANCE + 1.0
+    for b in core.enemy_bullets:
+        if b.lane_index == lane and 0 < player_y - b.y < DANGER_DISTANCE:
+            threat += 1.0
+    for laser in core.lasers:
+        if laser.lane_index == lane and laser.alive:
+            threat += 3.0
+    return threat
+
+
+def dodge_policy(core: GameCore) -> int:
+    """Simple scripted player: dodge the most dangerous lane, shoot what is ahead."""
+    lane = core.player.lane_index
+    here = _lane_threat(core, lane)
+    if here > 0.0:
+        best_dir, best_threat = 0, here
+        for direction in (-1, 1):
+            neighbour = lane + direction
+            if 0 <= neighbour < core.lane_system.lane_count:
+                threat = _lane_threat(core, neighbour)
+                if threat < best_threat:
+                    best_dir, best_threat = direction, threat
+        if best_dir < 0:
+            return Action.LEFT
+        if best_dir > 0:
+            return Action.RIGHT
+
+    # one bullet in flight at a time, ammo is scarce
+    if core.player.ammo > 0 and not core.player_bullets:
+        for e in core.spawner.enemies:
+            if e.lane_index == lane and 0 < core.player.y - e.y < 500:
+                return Action.SHOOT
+    return Action.NOOP
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import random
+from operator import attrgetter
+
+from lane_system import LaneSystem
+from player import PlayerCar
+from spawner import Spawner
+from snapshot import lane_count as snapshot_lane_count, pack, unpack_into
+from archetypes import EFFECT_AMMO, EFFECT_COIN, EFFECT_HP, SHOT_BULLET, SHOT_LASER
+from entities import ENEMY_WIDTH, Bullet, LaserBeam
+from settings import (
+    WINDOW_HEIGHT,
+    SIM_DT,
+    LANE_COUNT,
+    SPEED_INCREASE_INTERVAL,
+    SPAWN_INTERVAL_START,
+    PLAYER_START_HP,
+    ENEMY_SHOOT_INTERVAL,
+    ENEMY_SHOOT_INTERVAL_MIN,
+    ENEMY_SHOOT_INTERVAL_DECAY_PER_LEVEL,
+    LASER_DURATION,
+)
+
+_spawn_order = attrgetter("spawn_id")
+
+
+class Action:
+    NOOP = 0
+    LEFT = 1
+    RIGHT = 2
+    SHOOT = 3
+
+
+class Event:
+    """What happened during a tick, for the presentation layer (GameCore.events, sounds)."""
+    SHOT = 0
+    ENEMY_SHOT = 1
+    LASER = 2
+    ENEMY_HIT = 3
+    ENEMY_KILLED = 4
+    PICKUP = 5
+    PLAYER_HIT = 6
+    GAME_OVER = 7
+
+
+class GameCore:
+    """Simulation-only game state: no window, no mixer, no display flip.
+
+    Owns the player, spawner, bullets and lasers and advances them by an
+    explicit dt. The interactive `Game` is a thin shell around this class,
+    bots and tools drive it directly through `step()`. Given the same seed
+    and inputs, a run is reproducible bit for bit.
+    """
+
+    def __init__(self, seed: int | None = None, lane_count: int = LANE_COUNT) -> None:
+        self.rng = random.Random(seed)
+        # more than LANE_COUNT lanes = wide arena, wider than the window (Game scrolls a camera)
+        self.lane_system = LaneSystem.with_lanes(lane_count)
+        self.player = self._new_player()
+        self.spawner = Spawner(self.lane_system, self.rng)
+
+        self.game_over = False
+        # what dealt the final hit: "enemy", "bullet" or "laser" (None while alive)
+        self.death_cause: str | None = None
+        self.time_accum_for_speed: float = 0.0
+        # simulated seconds / ticks since reset (elapsed drives lane-change cooldown)
+        self.elapsed: float = 0.0
+        self.tick: int = 0
+        # projectiles and lasers
+        self.player_bullets: list[Bullet] = []
+        self.enemy_bullets: list[Bullet] = []
+        self.lasers: list[LaserBeam] = []
+        # Event codes since the last update() began (input shots included); Game drains
+        # them, headless callers can ignore them since every tick starts a fresh list
+        self.events: list[int] = []
+
+    def reset(self, seed: int | None = None) -> None:
+        """Start a new run; reseeds the RNG when `seed` is given, else keeps its stream."""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.player = self._new_player()
+        self.spawner.clear_all()
+        self.spawner.speed_level = 1
+        self.spawner.spawn_interval = SPAWN_INTERVAL_START
+        self.spawner.time_since_last_spawn = 0.0
+        self.spawner.current_shoot_interval = ENEMY_SHOOT_INTERVAL
+        self.time_accum_for_speed = 0.0
+        self.elapsed = 0.0
+        self.tick = 0
+        self.game_over = False
+        self.death_cause = None
+        self.events.clear()
+        for items in (self.player_bullets, self.enemy_bullets, self.lasers):
+            for item in items:
+                item.release()
+            items.clear()
+
+    # ===== snapshots (snapshot.py) =====
+    def snapshot(self) -> bytes:
+        """The whole run state as packed bytes (microseconds; also the suspend file format)."""
+        return pack(self)
+
+    def restore(self, data: bytes) -> None:
+        """Continue from a `snapshot()`; the run goes on exactly as it would have from that tick."""
+        unpack_into(self, data)
+
+    @classmethod
+    def from_snapshot(cls, data: bytes) -> "GameCore":
+        core = cls(lane_count=snapshot_lane_count(data))
+        core.restore(data)
+        return core
+
+    def _new_player(self) -> PlayerCar:
+        # start in the middle lane
+        return PlayerCar(self.lane_system, lane_index=self.lane_system.lane_count // 2)
+
+    # ===== input =====
+    def change_lane(self, direction: int) -> None:
+        self.player.change_lane(direction, self.elapsed)
+
+    def shoot(self) -> bool:
+        """Fire a player bullet if ammo allows; returns True if one was spawned."""
+        if self.game_over or not self.player.consume_shot():
+            return False
+        bullet = Bullet.acquire(
+            lane_index=self.player.lane_index,
+            x=self.player.x,
+            y=self.player.y - self.player.height / 2,
+            from_player=True,
+        )
+        self.player_bullets.append(bullet)
+        self.events.append(Event.SHOT)
+        return True
+
+    def apply_action(self, action: int) -> None:
+        if action == Action.LEFT:
+            self.change_lane(-1)
+        elif action == Action.RIGHT:
+            self.change_lane(1)
+        elif action == Action.SHOOT:
+            self.shoot()
+
+    def step(self, action: int = Action.NOOP, dt: float = SIM_DT) -> bool:
+        """Apply one action then advance the simulation; returns game_over."""
+        self.apply_action(action)
+        self.update(dt)
+        return self.game_over
+
+    # ===== simulation =====
+    def _damage_player(self, cause: str) -> None:
+        if self.game_over:
+            return
+        hp = self.player.hp
+        if self.player.apply_damage(1):
+            self.game_over = True
+            self.death_cause = cause
+            self.events.append(Event.GAME_OVER)
+        elif self.player.hp < hp:
+            self.events.append(Event.PLAYER_HIT)
+
+    def handle_collisions(self) -> None:
+        # use smaller hitbox for more forgiving collisions
+        player_rect = self.player.hitbox_rect
+        enemy_index = self.spawner.enemy_index
+
+        # Player vs enemies (body collision); enemy stays, it is a solid obstacle
+        for e in enemy_index.candidates(player_rect):
+            if player_rect.colliderect(e.rect):
+                self._damage_player("enemy")
+                break
+
+        # Player bullets vs enemies (lists are compacted in place: swap-remove + release)
+        bullets = self.player_bullets
+        enemy_died = False
+        i = 0
+        while i < len(bullets):
+            b = bullets[i]
+            bullet_rect = b.rect
+            hits = [e for e in enemy_index.candidates(bullet_rect) if bullet_rect.colliderect(e.rect)]
+            if not hits:
+                i += 1
+                continue
+            # the oldest enemy the bullet overlaps takes the hit
+            e = min(hits, key=_spawn_order)
+            e.hp -= b.damage
+            if e.hp <= 0:
+                # enemy destroyed, give score based on type
+                self.player.add_score(e.arch.kill_score)
+                enemy_died = True
+                self.events.append(Event.ENEMY_KILLED)
+            else:
+                self.events.append(Event.ENEMY_HIT)
+            bullets[i] = bullets[-1]
+            bullets.pop()
+            b.release()
+
+        # remove dead enemies after bullet processing
+        if enemy_died:
+            self.spawner.remove_dead_enemies()
+
+        # Player vs enemy bullets
+        bullets = self.enemy_bullets
+        i = 0
+        while i < len(bullets):
+            b = bullets[i]
+            if b.rect.colliderect(player_rect) and not self.game_over:
+                self._damage_player("bullet")
+                # bullet consumed on hit
+                bullets[i] = bullets[-1]
+                bullets.pop()
+                b.release()
+            else:
+                i += 1
+
+        # Player vs lasers (cheap x test first: the wide arena has lasers in every lane)
+        reach = player_rect.width / 2 + ENEMY_WIDTH
+        for laser in self.lasers:
+            if not laser.alive or abs(laser.x - player_rect.centerx) > reach:
+                continue
+            if laser.get_rect(WINDOW_HEIGHT).colliderect(player_rect):
+                self._damage_player("laser")
+
+        # Player vs pickups
+        if self.game_over:
+            return
+        picked = [p for p in self.spawner.pickup_index.candidates(player_rect) if player_rect.colliderect(p.rect)]
+        for p in picked:
+            arch = p.arch
+            if arch.effect == EFFECT_AMMO:
+                self.player.ammo += arch.amount
+            elif arch.effect == EFFECT_HP:
+                # heal but cap at max hp
+                self.player.hp = min(self.player.hp + arch.amount, PLAYER_START_HP)
+            elif arch.effect == EFFECT_COIN:
+                self.player.add_coin(arch.amount)
+            if arch.score:
+                self.player.add_score(arch.score)
+        if picked:
+            self.events.append(Event.PICKUP)
+            # pickups consumed
+            self.spawner.remove_pickups(picked)
+
+    def update(self, dt: float, profiler=None) -> None:
+        """Advance one tick; with a `profiler` (profiler.FrameProfiler) each phase is timed."""
+        if self.game_over:
+            return
+        self.events.clear()
+        self.elapsed += dt
+        self.tick += 1
+        if profiler is None:
+            for _, run in self.PHASES:
+                run(self, dt)
+        else:
+            for name, run in self.PHASES:
+                with profiler.phase(name):
+                    run(self, dt)
+
+    def _update_player(self, dt: float) -> None:
+        # update player smooth lane animation
+        self.player.update(dt)
+
+    def _update_spawner(self, dt: float) -> None:
+        self.spawner.update(dt)
+
+    def _enemy_fire(self, dt: float) -> None:
+        # enemy shooting (bullets / lasers)
+        for e in self.spawner.enemies:
+            if e.can_shoot():
+                e.reset_shot_timer()
+                shot = e.arch.shot
+                if shot == SHOT_BULLET:
+                    # spawn a single circular bullet in this lane
+                    b = Bullet.acquire(
+                        e.lane_index,
+                        e.x,
+                        e.y + e.height / 2,
+                        from_player=False,
+                        is_circle=True,
+                        color_override=e.arch.bullet_color,
+                    )
+                    self.enemy_bullets.append(b)
+                    self.events.append(Event.ENEMY_SHOT)
+                elif shot == SHOT_LASER:
+                    # spawn a full-lane laser going downward from enemy
+                    laser = LaserBeam.acquire(e.lane_index, e.x, e.y, e.width, e.color)
+                    self.lasers.append(laser)
+                    self.events.append(Event.LASER)
+                    # the enemy stands still while channeling the laser
+                    e.channel_timer = LASER_DURATION
+
+    def _update_projectiles(self, dt: float) -> None:
+        # update bullets & lasers, dropping off-screen bullets / expired lasers in place
+        for bullets in (self.player_bullets, self.enemy_bullets):
+            i = 0
+            while i < len(bullets):
+                b = bullets[i]
+                b.update(dt)
+                if 0 - 50 < b.y < WINDOW_HEIGHT + 50:
+                    i += 1
+                else:
+                    # swapped-in bullet lands on index i and is updated next
+                    bullets[i] = bullets[-1]
+                    bullets.pop()
+                    b.release()
+        lasers = self.lasers
+        i = 0
+        while i < len(lasers):
+            laser = lasers[i]
+            laser.update(dt)
+            if laser.alive:
+                i += 1
+            else:
+                lasers[i] = lasers[-1]
+                lasers.pop()
+                laser.release()
+
+    def _collide(self, dt: float) -> None:
+        self.handle_collisions()
+
+    def _update_score(self, dt: float) -> None:
+        # passive score over time, scaled by speed level
+        self.player.add_score(int(60 * dt * self.spawner.speed_level))
+
+        # difficulty scaling over time
+        self.time_accum_for_speed += dt
+        if self.time_accum_for_speed >= SPEED_INCREASE_INTERVAL:
+            self.time_accum_for_speed = 0.0
+            self.spawner.increase_difficulty()
+            # also decrease enemy shoot cooldown as difficulty increases
+            level = self.spawner.speed_level
+            new_interval = max(
+                ENEMY_SHOOT_INTERVAL_MIN,
+                ENEMY_SHOOT_INTERVAL - ENEMY_SHOOT_INTERVAL_DECAY_PER_LEVEL * (level - 1),
+            )
+            self.spawner.current_shoot_interval = new_interval
+            for e in self.spawner.enemies:
+                if e.shoot_interval is not None:
+                    e.shoot_interval = new_interval
+
+    # tick phases in order: (profiler name, method)
+    PHASES = (
+        ("player", _update_player),
+        ("spawner", _update_spawner),
+        ("enemy_fire", _enemy_fire),
+        ("projectiles", _update_projectiles),
+        ("collisions", _collide),
+        ("score", _update_score),
+    )
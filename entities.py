@@ -1,142 +1,245 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from collections import OrderedDict
 from typing import Tuple
 
 import pygame
 import os
-_ASSET_CACHE: dict[str, pygame.Surface] = {}
-
 
+from archetypes import ENEMIES, PICKUPS
+from atlas import Atlas, AtlasError
 from settings import (
     PLAYER_WIDTH,
     PLAYER_HEIGHT,
-    ENEMY_NORMAL_COLOR,
-    ENEMY_LEVEL2_COLOR,
-    ENEMY_SPECIAL_COLOR,
-    ENEMY_NORMAL_HP,
-    ENEMY_LEVEL2_HP,
-    ENEMY_SPECIAL_HP,
     ENEMY_SHOOT_INTERVAL,
-    ENEMY_LEVEL2_FIRST_SHOT_DELAY,
-    ENEMY_SPECIAL_FIRST_SHOT_DELAY,
-    ENEMY_NORMAL_SPEED_MULT,
-    ENEMY_LEVEL2_SPEED_MULT,
-    ENEMY_SPECIAL_SPEED_MULT,
     PLAYER_BULLET_SPEED,
     ENEMY_BULLET_SPEED,
     LASER_DURATION,
-    PICKUP_AMMO_COLOR,
-    PICKUP_HP_COLOR,
-    PICKUP_COIN_COLOR,
     PICKUP_RADIUS,
+    SPRITE_CACHE_SIZE,
 )
 
 _ASSET_DIR = os.path.join(os.path.dirname(__file__), "assets")
 
+ENEMY_WIDTH = PLAYER_WIDTH
+ENEMY_HEIGHT = int(PLAYER_HEIGHT * 0.8)
+
+
+# decoded source images, and scaled copies in LRU order (oldest first)
+_SOURCE_CACHE: dict[str, pygame.Surface | None] = {}
+_ASSET_CACHE: OrderedDict[tuple[str, tuple[int, int], float], pygame.Surface | None] = OrderedDict()
 
-def load_sprite(name: str, size: tuple[int, int]) -> pygame.Surface | None:
-    key = f"{name}@{size[0]}x{size[1]}"
-    if key in _ASSET_CACHE:
-        return _ASSET_CACHE[key]
 
-    path = os.path.join(_ASSET_DIR, name)
-    if not os.path.exists(path):
-        return None
+def load_sprite(name: str, size: tuple[int, int], scale: float = 1.0) -> pygame.Surface | None:
+    """PNG `name` decoded and scaled to `size` * `scale`, or None if the file is missing.
 
-    img = pygame.image.load(path).convert_alpha()
-    img = pygame.transform.smoothscale(img, size)
+    The slow path, for sprites not in the prebuilt atlas. Scaled copies are
+    kept in an LRU cache, so after a zoom change the old scale ages out.
+    """
+    key = (name, size, scale)
+    img = _ASSET_CACHE.get(key)
+    if img is not None or key in _ASSET_CACHE:
+        _ASSET_CACHE.move_to_end(key)
+        return img
+
+    if name not in _SOURCE_CACHE:
+        path = os.path.join(_ASSET_DIR, name)
+        _SOURCE_CACHE[name] = pygame.image.load(path).convert_alpha() if os.path.exists(path) else None
+    src = _SOURCE_CACHE[name]
+    if src is not None:
+        img = pygame.transform.smoothscale(src, (max(1, round(size[0] * scale)), max(1, round(size[1] * scale))))
     _ASSET_CACHE[key] = img
+    if len(_ASSET_CACHE) > SPRITE_CACHE_SIZE:
+        _ASSET_CACHE.popitem(last=False)
     return img
 
 
-ENEMY_SPRITES = {
-    "normal": "enemy_normal.png",
-    "level2": "enemy_level2.png",
-    "special": "enemy_special.png",
-}
+def scale_rect(rect: pygame.Rect, scale: float) -> pygame.Rect:
+    """`rect` on a surface drawn at `scale` (edges rounded so neighbours stay flush)."""
+    if scale == 1:
+        return rect
+    left, top = round(rect.left * scale), round(rect.top * scale)
+    return pygame.Rect(left, top, round(rect.right * scale) - left, round(rect.bottom * scale) - top)
+
+
+def scale_point(x: float, y: float, scale: float) -> tuple[int, int]:
+    if scale == 1:
+        return int(x), int(y)
+    return round(x * scale), round(y * scale)
+
+
+# sprite id -> (file, base size); the ids index the prebuilt atlas (python atlas.py build)
+SPRITES: list[tuple[str, tuple[int, int]]] = [("player.png", (PLAYER_WIDTH, PLAYER_HEIGHT))]
+SPRITES += [(a.sprite, (ENEMY_WIDTH, ENEMY_HEIGHT)) for a in ENEMIES]
+SPRITES += [(a.sprite, (PICKUP_RADIUS * 2, PICKUP_RADIUS * 2)) for a in PICKUPS]
+PLAYER_SPRITE = 0
+# archetype id -> sprite id
+ENEMY_SPRITE_IDS = [1 + a.id for a in ENEMIES]
+PICKUP_SPRITE_IDS = [1 + len(ENEMIES) + a.id for a in PICKUPS]
+
+_BASE_SPRITES: list[pygame.Surface | None] = []
+_SCALED_SPRITES: OrderedDict[tuple[int, float], pygame.Surface | None] = OrderedDict()
+
+
+def preload_sprites() -> None:
+    """Load every sprite in SPRITES at base size (needs a display mode).
+
+    Reads the prebuilt atlas in one go; entries missing from it or stale
+    fall back to decoding the PNG.
+    """
+    try:
+        atlas = Atlas.load()
+    except FileNotFoundError:
+        atlas = None
+    except (OSError, AtlasError) as e:
+        print(f"[WARN] Cannot load sprite atlas: {e}")
+        atlas = None
+    base = []
+    stale = []
+    for i, (name, size) in enumerate(SPRITES):
+        if atlas is not None and atlas.matches(i, name, size):
+            base.append(atlas.get(i))
+        else:
+            if atlas is not None:
+                stale.append(name)
+            base.append(load_sprite(name, size))
+    if stale:
+        print(f"[WARN] Sprite atlas is stale ({', '.join(stale)}), run: python atlas.py build")
+    _BASE_SPRITES[:] = base
+    _SCALED_SPRITES.clear()
+
+
+def sprite(sprite_id: int, scale: float = 1.0) -> pygame.Surface | None:
+    """Sprite `sprite_id` at `scale` times its base size, or None if its file is missing."""
+    if not _BASE_SPRITES:
+        preload_sprites()
+    if scale == 1:
+        return _BASE_SPRITES[sprite_id]
+    key = (sprite_id, scale)
+    img = _SCALED_SPRITES.get(key)
+    if img is not None or key in _SCALED_SPRITES:
+        _SCALED_SPRITES.move_to_end(key)
+        return img
+    base = _BASE_SPRITES[sprite_id]
+    if base is not None:
+        w, h = base.get_size()
+        img = pygame.transform.smoothscale(base, (max(1, round(w * scale)), max(1, round(h * scale))))
+    _SCALED_SPRITES[key] = img
+    if len(_SCALED_SPRITES) > SPRITE_CACHE_SIZE:
+        _SCALED_SPRITES.popitem(last=False)
+    return img
+
+
+class Pooled:
+    """Free-list pool per subclass: `acquire()` re-runs __init__ on a released object.
+
+    __init__ of a pooled class must fully (re)initialise the object.
+    """
 
-PICKUP_SPRITES = {
-    "ammo": "pickup_ammo.png",
-    "hp": "pickup_hp.png",
-    "coin": "pickup_coin.png",
-}
+    __slots__ = ()
+    _free: list
+    created: int
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._free = []
+        cls.created = 0  # objects built because the free list was empty
 
+    @classmethod
+    def acquire(cls, *args, **kwargs):
+        if cls._free:
+            obj = cls._free.pop()
+            obj.__init__(*args, **kwargs)
+            return obj
+        cls.created += 1
+        return cls(*args, **kwargs)
 
-@dataclass
-class BaseEntity:
-    lane_index: int
-    x: float
-    y: float
-    width: int
-    height: int
-    color: Tuple[int, int, int]
-    speed: float  # positive = moving down, negative = moving up
+    def release(self) -> None:
+        """Hand the object back; the caller must drop every reference to it."""
+        type(self)._free.append(self)
+
+
+def swap_remove(items: list, item) -> None:
+    """O(1) removal that does not keep list order (order is not meaningful here)."""
+    i = items.index(item)
+    items[i] = items[-1]
+    items.pop()
+
+
+class BaseEntity(Pooled):
+    __slots__ = ("lane_index", "x", "y", "width", "height", "color", "speed", "prev_y", "_rect")
+
+    def __init__(self, lane_index: int, x: float, y: float, width: int, height: int,
+                 color: Tuple[int, int, int], speed: float) -> None:
+        self.lane_index = lane_index
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.color = color
+        self.speed = speed  # positive = moving down, negative = moving up
+        # position at the start of the last sim tick, for render interpolation
+        self.prev_y = y
+        try:
+            self._rect.size = (width, height)
+        except AttributeError:
+            self._rect = pygame.Rect(0, 0, width, height)
 
     def update(self, dt: float) -> None:
+        self.prev_y = self.y
         self.y += self.speed * dt
 
     @property
     def rect(self) -> pygame.Rect:
-        return pygame.Rect(int(self.x - self.width / 2), int(self.y - self.height / 2), self.width, self.height)
-
-    def draw(self, surface: pygame.Surface) -> None:
-        pygame.draw.rect(surface, self.color, self.rect, border_radius=6)
+        """Bounds at the current position; the same Rect object is updated in place."""
+        r = self._rect
+        r.x = int(self.x - self.width / 2)
+        r.y = int(self.y - self.height / 2)
+        return r
 
-
-class EnemyType:
-    NORMAL = "normal"
-    LEVEL2 = "level2"
-    SPECIAL = "special"
+    def draw(self, surface: pygame.Surface, scale: float = 1.0) -> pygame.Rect:
+        return pygame.draw.rect(surface, self.color, scale_rect(self.rect, scale), border_radius=round(6 * scale))
 
 
 class Enemy(BaseEntity):
-    """Enemy with HP and optional shooting behaviour."""
-
-    def __init__(self, lane_index: int, x: float, y: float, speed: float, enemy_type: str, shoot_interval: float | None = None) -> None:
-        base_speed = speed
-        if enemy_type == EnemyType.LEVEL2:
-            color = ENEMY_LEVEL2_COLOR
-            hp = ENEMY_LEVEL2_HP
-            speed_mult = ENEMY_LEVEL2_SPEED_MULT
-            first_shot_delay = ENEMY_LEVEL2_FIRST_SHOT_DELAY
-        elif enemy_type == EnemyType.SPECIAL:
-            color = ENEMY_SPECIAL_COLOR
-            hp = ENEMY_SPECIAL_HP
-            speed_mult = ENEMY_SPECIAL_SPEED_MULT
-            first_shot_delay = ENEMY_SPECIAL_FIRST_SHOT_DELAY
-        else:
-            color = ENEMY_NORMAL_COLOR
-            hp = ENEMY_NORMAL_HP
-            enemy_type = EnemyType.NORMAL
-            speed_mult = ENEMY_NORMAL_SPEED_MULT
-            first_shot_delay = 0.0
+    """Enemy with HP and optional shooting behaviour; stats come from its archetype."""
 
+    __slots__ = (
+        "enemy_type", "arch", "hp", "shoot_interval", "first_shot_delay",
+        "_time_since_shot", "_has_shot_once", "channel_timer", "spawn_id",
+    )
+
+    def __init__(self, lane_index: int, x: float, y: float, speed: float, enemy_type: int, shoot_interval: float | None = None) -> None:
+        arch = ENEMIES[enemy_type]
         super().__init__(
             lane_index=lane_index,
             x=x,
             y=y,
-            width=PLAYER_WIDTH,
-            height=int(PLAYER_HEIGHT * 0.8),
-            color=color,
-            speed=base_speed * speed_mult,
+            width=ENEMY_WIDTH,
+            height=ENEMY_HEIGHT,
+            color=arch.color,
+            speed=speed * arch.speed_mult,
         )
         self.enemy_type = enemy_type
-        self.hp = hp
+        self.arch = arch
+        self.hp = arch.hp
+        # position in spawn order (set by Spawner); bullets hit the oldest enemy first
+        self.spawn_id: int = 0
         base_interval = shoot_interval if shoot_interval is not None else ENEMY_SHOOT_INTERVAL
-        self.shoot_interval = base_interval if enemy_type in (EnemyType.LEVEL2, EnemyType.SPECIAL) else None
-        self.first_shot_delay = first_shot_delay
+        self.shoot_interval = base_interval if arch.elite else None
+        self.first_shot_delay = arch.first_shot_delay
         self._time_since_shot = 0.0
         self._has_shot_once = False
-        # for special enemies: channeling laser, stop movement during channel
+        # for laser shooters: channeling laser, stop movement during channel
         self.channel_timer: float = 0.0
 
     def update(self, dt: float) -> None:
-        # if special is channeling a laser, it does not move
-        if not (self.enemy_type == EnemyType.SPECIAL and self.channel_timer > 0.0):
+        # while channeling a laser it does not move (only laser shooters channel)
+        if self.channel_timer <= 0.0:
             super().update(dt)
         else:
+            self.prev_y = self.y
             self.channel_timer -= dt
         if self.shoot_interval is not None:
             self._time_since_shot += dt
@@ -154,24 +257,18 @@ class Enemy(BaseEntity):
         self._has_shot_once = True
 
     
-    def draw(self, surface: pygame.Surface) -> None:
-        name = ENEMY_SPRITES.get(self.enemy_type)
-        if name:
-            sprite = load_sprite(name, (self.width, self.height))
-            if sprite is not None:
-                surface.blit(sprite, sprite.get_rect(center=(int(self.x), int(self.y))))
-                return
-        super().draw(surface)
+    def draw(self, surface: pygame.Surface, scale: float = 1.0) -> pygame.Rect:
+        img = sprite(ENEMY_SPRITE_IDS[self.enemy_type], scale)
+        if img is not None:
+            return surface.blit(img, img.get_rect(center=scale_point(self.x, self.y, scale)))
+        return super().draw(surface, scale)
 
 
 
-@dataclass
 class Bullet(BaseEntity):
     """Generic bullet, from player or enemy."""
 
-    damage: int
-    from_player: bool
-    is_circle: bool
+    __slots__ = ("damage", "from_player", "is_circle")
 
     def __init__(self, lane_index: int, x: float, y: float, from_player: bool, is_circle: bool = False, color_override=None) -> None:
         width = 12
@@ -185,17 +282,19 @@ class Bullet(BaseEntity):
         self.from_player = from_player
         self.is_circle = is_circle
 
-    def draw(self, surface: pygame.Surface) -> None:
+    def draw(self, surface: pygame.Surface, scale: float = 1.0) -> pygame.Rect:
         if self.is_circle:
             radius = self.width // 2
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), radius)
+            return pygame.draw.circle(surface, self.color, scale_point(self.x, self.y, scale), round(radius * scale))
         else:
-            super().draw(surface)
+            return super().draw(surface, scale)
 
 
-class LaserBeam:
+class LaserBeam(Pooled):
     """Full-lane laser shot by special enemies."""
 
+    __slots__ = ("lane_index", "x", "start_y", "width", "color", "duration", "elapsed", "_rect")
+
     def __init__(self, lane_index: int, x: float, start_y: float, width: int, color: Tuple[int, int, int]) -> None:
         self.lane_index = lane_index
         self.x = x
@@ -204,6 +303,10 @@ class LaserBeam:
         self.color = color
         self.duration = LASER_DURATION
         self.elapsed = 0.0
+        try:
+            self._rect
+        except AttributeError:
+            self._rect = pygame.Rect(0, 0, 0, 0)
 
     def update(self, dt: float) -> None:
         self.elapsed += dt
@@ -213,33 +316,23 @@ class LaserBeam:
         return self.elapsed < self.duration
 
     def get_rect(self, screen_height: int) -> pygame.Rect:
-        # laser only goes downward from enemy towards the player
-        return pygame.Rect(int(self.x - self.width / 2), int(self.start_y), self.width, max(0, screen_height - int(self.start_y)))
-
-    def draw(self, surface: pygame.Surface) -> None:
-        rect = self.get_rect(surface.get_height())
-        pygame.draw.rect(surface, self.color, rect, border_radius=4)
-
+        # laser only goes downward from enemy towards the player; Rect updated in place
+        r = self._rect
+        r.update(int(self.x - self.width / 2), int(self.start_y), self.width, max(0, screen_height - int(self.start_y)))
+        return r
 
-class PickupType:
-    AMMO = "ammo"
-    HP = "hp"
-    COIN = "coin"
+    def draw(self, surface: pygame.Surface, scale: float = 1.0) -> pygame.Rect:
+        rect = self.get_rect(math.ceil(surface.get_height() / scale))
+        return pygame.draw.rect(surface, self.color, scale_rect(rect, scale), border_radius=round(4 * scale))
 
 
-@dataclass
 class Pickup(BaseEntity):
-    """Circular pickups (ammo / HP / coin)."""
+    """Circular pickups (ammo / HP / coin, see archetypes.json)."""
 
-    pickup_type: str = PickupType.AMMO
+    __slots__ = ("pickup_type", "arch")
 
-    def __init__(self, lane_index: int, x: float, y: float, speed: float, pickup_type: str) -> None:
-        if pickup_type == PickupType.AMMO:
-            color = PICKUP_AMMO_COLOR
-        elif pickup_type == PickupType.HP:
-            color = PICKUP_HP_COLOR
-        else:
-            color = PICKUP_COIN_COLOR
+    def __init__(self, lane_index: int, x: float, y: float, speed: float, pickup_type: int) -> None:
+        arch = PICKUPS[pickup_type]
         diameter = PICKUP_RADIUS * 2
         super().__init__(
             lane_index=lane_index,
@@ -247,30 +340,18 @@ class Pickup(BaseEntity):
             y=y,
             width=diameter,
             height=diameter,
-            color=color,
-            speed=speed * 0.9,
+            color=arch.color,
+            speed=speed * arch.speed_mult,
         )
         self.pickup_type = pickup_type
+        self.arch = arch
 
-    @property
-    def rect(self) -> pygame.Rect:
-        # collision bounds use the underlying square
-        return super().rect
-
-    def draw(self, surface: pygame.Surface) -> None:
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), PICKUP_RADIUS)
-    
-
-    def draw(self, surface: pygame.Surface) -> None:
-        diameter = PICKUP_RADIUS * 2
+    def draw(self, surface: pygame.Surface, scale: float = 1.0) -> pygame.Rect:
+        center = scale_point(self.x, self.y, scale)
 
-        name = PICKUP_SPRITES.get(self.pickup_type)
-        if name:
-            sprite = load_sprite(name, (diameter, diameter))
-            if sprite is not None:
-                surface.blit(sprite, sprite.get_rect(center=(int(self.x), int(self.y))))
-                return
+        img = sprite(PICKUP_SPRITE_IDS[self.pickup_type], scale)
+        if img is not None:
+            return surface.blit(img, img.get_rect(center=center))
 
         # fallback nếu thiếu ảnh
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), PICKUP_RADIUS)
-
+        return pygame.draw.circle(surface, self.color, center, round(PICKUP_RADIUS * scale))
@@ -0,0 +1,223 @@
+"""Gym-style environment around GameCore, for training agents without fake key events.
+
+    env = LaneRunnerEnv(obs_mode="grid")
+    obs = env.reset(seed=1)
+    obs, reward, done, info = env.step(Action.SHOOT)
+
+Actions are the discrete `core.Action` codes (no-op, left, right, shoot).
+Observation modes:
+
+- "grid": float32 occupancy tensor (channels, lanes, rows). Rows split the
+  road from the top of the screen down to the player. The channels are
+  listed in GRID_CHANNELS.
+- "pixels": a downsampled (height, width, 3) uint8 frame. It is drawn
+  straight at the reduced scale onto a surface made with
+  `pygame.image.frombuffer` over a NumPy array the env owns, so the
+  observation is a plain view of that array: no pixel is copied and no
+  surface lock is held, however long the caller keeps it.
+
+Both are buffers owned by the env and overwritten in place. Two pixel
+frames alternate, so an observation keeps its content until the step
+after next; call `.copy()` on it to keep it longer (e.g. in a replay
+buffer).
+
+Reward is the score gained during the step, minus ENV_HIT_PENALTY per HP
+lost. Steps/sec for both modes: python env.py bench
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from core import Action, GameCore
+from entities import preload_sprites
+from settings import (
+    BACKGROUND_COLOR,
+    LANE_COUNT,
+    WINDOW_WIDTH,
+    WINDOW_HEIGHT,
+    ENV_GRID_ROWS,
+    ENV_PIXEL_SCALE,
+    ENV_HIT_PENALTY,
+)
+
+ACTIONS = (Action.NOOP, Action.LEFT, Action.RIGHT, Action.SHOOT)
+GRID_CHANNELS = ("player", "enemy", "shooter", "pickup", "enemy_bullet", "laser", "player_bullet")
+OBS_MODES = ("grid", "pixels")
+
+
+class LaneRunnerEnv:
+    def __init__(self, obs_mode: str = "grid", lane_count: int = LANE_COUNT, rows: int = ENV_GRID_ROWS,
+                 pixel_scale: float = ENV_PIXEL_SCALE, repeat: int = 1, max_ticks: int | None = None) -> None:
+        if obs_mode not in OBS_MODES:
+            raise ValueError(f"unknown obs_mode {obs_mode!r}, expected one of {OBS_MODES}")
+        self.obs_mode = obs_mode
+        self.core = GameCore(lane_count=lane_count)
+        self.n_actions = len(ACTIONS)
+        self.repeat = repeat          # sim ticks per step, same action
+        self.max_ticks = max_ticks    # truncate runs longer than this (None = until death)
+        self.rows = rows
+        self.grid = np.zeros((len(GRID_CHANNELS), lane_count, rows), dtype=np.float32)
+        self.pixel_scale = pixel_scale
+        self._frames: list[pygame.Surface] = []
+        self._frame = 0
+        if obs_mode == "pixels":
+            self._init_pixels()
+        self._score = 0
+        self._hp = 0
+
+    @property
+    def observation_shape(self) -> tuple[int, ...]:
+        if self.obs_mode == "grid":
+            return self.grid.shape
+        w, h = self._frames[0].get_size()
+        return (h, w, 3)
+
+    # ===== api =====
+    def reset(self, seed: int | None = None):
+        self.core.reset(seed)
+        self._score = self.core.player.score
+        self._hp = self.core.player.hp
+        return self._observe()
+
+    def step(self, action: int):
+        """Apply `action` for `repeat` ticks; returns (obs, reward, done, info)."""
+        core = self.core
+        for _ in range(self.repeat):
+            if core.step(action):
+                break
+            # the action is a press, not a held key: repeats are no-ops
+            action = Action.NOOP
+        player = core.player
+        reward = player.score - self._score - ENV_HIT_PENALTY * max(0, self._hp - player.hp)
+        self._score = player.score
+        self._hp = player.hp
+        truncated = self.max_ticks is not None and core.tick >= self.max_ticks
+        info = {
+            "tick": core.tick,
+            "score": player.score,
+            "hp": player.hp,
+            "ammo": player.ammo,
+            "coins": player.coins,
+            "death_cause": core.death_cause,
+            "truncated": truncated,
+        }
+        return self._observe(), float(reward), core.game_over or truncated, info
+
+    def close(self) -> None:
+        self._frames.clear()
+        self._buffers = []
+
+    def _observe(self):
+        return self._grid() if self.obs_mode == "grid" else self._pixels()
+
+    # ===== grid observation =====
+    def _grid(self) -> np.ndarray:
+        core = self.core
+        grid = self.grid
+        grid.fill(0.0)
+        rows = self.rows
+        # row of a y position; the player's row is the last one
+        row_scale = rows / (core.player.y + 1)
+
+        def mark(channel: int, items) -> None:
+            lanes = []
+            ys = []
+            for item in items:
+                if 0 <= item.y <= core.player.y:
+                    lanes.append(item.lane_index)
+                    ys.append(item.y)
+            if lanes:
+                grid[channel, lanes, (np.array(ys) * row_scale).astype(np.intp)] = 1.0
+
+        enemies = core.spawner.enemies
+        mark(1, [e for e in enemies if not e.arch.elite])
+        mark(2, [e for e in enemies if e.arch.elite])
+        mark(3, core.spawner.pickups)
+        mark(4, core.enemy_bullets)
+        mark(6, core.player_bullets)
+        for laser in core.lasers:
+            if laser.alive:
+                # a laser covers its lane from the enemy down
+                grid[5, laser.lane_index, max(0, int(laser.start_y * row_scale)):] = 1.0
+        grid[0, core.player.lane_index, rows - 1] = 1.0
+        return grid
+
+    # ===== pixel observation =====
+    def _init_pixels(self) -> None:
+        if pygame.display.get_surface() is None:
+            # sprites are converted to the display format, so one (hidden) window has to exist
+            pygame.display.init()
+            pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        preload_sprites()
+        w, h = (max(1, round(WINDOW_WIDTH * self.pixel_scale)), max(1, round(WINDOW_HEIGHT * self.pixel_scale)))
+        # two frames: the one handed out last step keeps its content while the other one is drawn.
+        # Each surface draws into an array we own (RGBX rows), so observations are views that lock nothing.
+        self._buffers = [np.zeros((h, w, 4), dtype=np.uint8) for _ in range(2)]
+        self._frames = [pygame.image.frombuffer(buf, (w, h), "RGBX") for buf in self._buffers]
+        self._views = [buf[:, :, :3] for buf in self._buffers]
+
+    def _pixels(self) -> np.ndarray:
+        self._frame ^= 1
+        i = self._frame
+        self._draw(self._frames[i])
+        return self._views[i]
+
+    def _draw(self, surf: pygame.Surface) -> None:
+        core = self.core
+        s = self.pixel_scale
+        lanes = core.lane_system
+        # same camera as Game.update_camera: the player centred, clamped to the arena
+        cam_x = int(max(0, min(lanes.width - WINDOW_WIDTH, core.player.current_x - WINDOW_WIDTH / 2)))
+        surf.fill(BACKGROUND_COLOR)
+        lanes.draw(surf, s, cam_x)
+        items = [core.spawner.enemies, core.spawner.pickups, core.lasers, core.enemy_bullets, core.player_bullets]
+        for group in items:
+            for item in group:
+                x = item.x
+                if -WINDOW_WIDTH < x - cam_x < 2 * WINDOW_WIDTH:
+                    item.x = x - cam_x
+                    item.draw(surf, s)
+                    item.x = x
+        player = core.player
+        current_x = player.current_x
+        player.current_x = current_x - cam_x
+        player.draw(surf, s)
+        player.current_x = current_x
+
+
+def bench_env(obs_mode: str, steps: int = 20000, seed: int = 1) -> float:
+    """Steps/sec with random actions, resetting on done."""
+    env = LaneRunnerEnv(obs_mode)
+    rng = np.random.default_rng(seed)
+    actions = rng.choice(len(ACTIONS), size=steps, p=[0.7, 0.1, 0.1, 0.1])
+    env.reset(seed)
+    start = time.perf_counter()
+    for a in actions:
+        _, _, done, _ = env.step(int(a))
+        if done:
+            env.reset()
+    elapsed = time.perf_counter() - start
+    env.close()
+    return steps / elapsed
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Gym-style environment for the lane runner.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_p = sub.add_parser("bench", help="steps/sec for each observation mode")
+    bench_p.add_argument("--steps", type=int, default=20000)
+    bench_p.add_argument("--mode", choices=OBS_MODES, action="append", help="default: all modes")
+    args = parser.parse_args(argv)
+
+    for mode in args.mode or OBS_MODES:
+        print(f"{mode:<7} {bench_env(mode, args.steps):>10,.0f} steps/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,75 +2,162 @@ from __future__ import annotations
 
 import sys
 import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
 import pygame
 
-from lane_system import LaneSystem
-from player import PlayerCar
-from spawner import Spawner
-from entities import EnemyType, Bullet, LaserBeam, PickupType
-from hud import HUD
+from core import Action, GameCore
+from entities import ENEMY_WIDTH, preload_sprites
+from governor import FRAME_SKIP, FULL, NEAR_ONLY, NEAREST, QualityGovernor
+from history import RunHistory, run_record
+from hud import HUD, load_font
+from inputs import WINDOW_EVENTS, InputPipeline, LatencyProbe
+from profiler import FrameProfiler
+from render import Compositor
+from replay import Replay, ReplayError, ReplayRecorder, replay_path
+from sfx import Sfx
+import snapshot
+from storage import Store
 from settings import (
     WINDOW_WIDTH,
     WINDOW_HEIGHT,
+    LANE_COUNT,
     WINDOW_TITLE,
     FPS,
-    BACKGROUND_COLOR,
-    SPEED_INCREASE_INTERVAL,
-    SPAWN_INTERVAL_START,
-    PLAYER_START_HP,
-    PICKUP_AMMO_AMOUNT,
-    PICKUP_HP_AMOUNT,
-    PICKUP_COIN_SCORE,
-    ENEMY_SHOOT_INTERVAL,
-    ENEMY_SHOOT_INTERVAL_MIN,
-    ENEMY_SHOOT_INTERVAL_DECAY_PER_LEVEL,
-    LASER_DURATION,
+    SIM_DT,
+    MAX_CATCHUP_STEPS,
     SCREEN_SCALE,
     START_FULLSCREEN,
+    REPLAY_DIR,
+    SUSPEND_FILE,
+    FONT_NAME,
     SMOOTH_SCALE,
+    GOVERNOR_ENABLED,
+    GOVERNOR_DRAW_DISTANCE,
 )
 
+# gameplay keys -> core actions (recorded into the replay)
+KEY_ACTIONS = {
+    pygame.K_a: Action.LEFT,
+    pygame.K_LEFT: Action.LEFT,
+    pygame.K_d: Action.RIGHT,
+    pygame.K_RIGHT: Action.RIGHT,
+    pygame.K_SPACE: Action.SHOOT,
+}
 
-class Game:
-    def __init__(self) -> None:
-        pygame.init()
-        # ==== Music on start ====
+
+class StartupProfile:
+    """Wall time of each startup phase (main.py --startup-profile)."""
+
+    def __init__(self, start: float | None = None) -> None:
+        self.start = time.perf_counter() if start is None else start
+        self.phases: list[tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
         try:
-            pygame.mixer.pre_init(44100, -16, 2, 512)
-            pygame.mixer.init()
-            bgm_path = os.path.join(os.path.dirname(__file__), "assets", "anh_do_skibidi.mp3")  # hoặc bgm.wav
-            pygame.mixer.music.load(bgm_path)
-            pygame.mixer.music.set_volume(0.35)   # 0.0 -> 1.0
-            pygame.mixer.music.play(-1)           # -1 = loop vô hạn
-        except pygame.error as e:
-            print(f"[WARN] Cannot play music: {e}")
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
 
-        pygame.display.set_caption(WINDOW_TITLE)
-        self.base_size = (WINDOW_WIDTH, WINDOW_HEIGHT)
-        self.scale = SCREEN_SCALE
-        self.fullscreen = START_FULLSCREEN
+    def report(self) -> str:
+        lines = [f"  {name:<22} {secs * 1000:8.1f} ms" for name, secs in self.phases]
+        lines.append(f"  {'total (wall)':<22} {(time.perf_counter() - self.start) * 1000:8.1f} ms")
+        return "\n".join(lines)
 
-        # screen: cửa sổ thật (sẽ là base_size * scale hoặc fullscreen)
-        self.apply_display_mode()
 
-        # canvas: nơi vẽ game ở size gốc
-        self.canvas = pygame.Surface(self.base_size).convert_alpha()
+class Game:
+    def __init__(self, profile: StartupProfile | None = None, save_replays: bool = True,
+                 lane_count: int = LANE_COUNT, resume: bool = False) -> None:
+        # the first frame only waits for what it draws with; music starts after it (start_music)
+        self.profile = profile or StartupProfile()
+        # replays assume the 3-lane game (replay.simulate rebuilds a default GameCore)
+        self.save_replays = save_replays and lane_count == LANE_COUNT
+        phase = self.profile.phase
+        with phase("display + font init"):
+            pygame.display.init()
+            pygame.font.init()
+        self.music_thread: threading.Thread | None = None
+        # sound effects; silent until the music thread has decoded them (Sfx.load)
+        self.sfx = Sfx()
+
+        # high score, stats and window settings; written on a background thread
+        self.store = Store()
+        # every finished run, appended and indexed on its own thread
+        self.history = RunHistory()
+        prefs = self.store.get("settings", {})
 
-        self.clock = pygame.time.Clock()
+        pygame.display.set_caption(WINDOW_TITLE)
+        self.base_size = (WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.scale = prefs.get("scale", SCREEN_SCALE)
+        self.fullscreen = prefs.get("fullscreen", START_FULLSCREEN)
 
-        self.lane_system = LaneSystem()
-        self.player = PlayerCar(self.lane_system)
-        self.spawner = Spawner(self.lane_system)
-        self.hud = HUD()
+        # world x of the view's left edge; only moves in the wide arena (follows the player)
+        self.camera_x = 0
+        # canvas: nơi vẽ game (at window resolution, or base size for RENDER_MODE "scaled")
+        self.compositor = Compositor(
+            self.base_size, lambda surf, scale: self.core.lane_system.draw(surf, scale, self.camera_x))
+
+        # screen: cửa sổ thật (sẽ là base_size * scale hoặc fullscreen)
+        with phase("display mode"):
+            self.apply_display_mode()
+        # all sprites up front (one atlas read) instead of a decode hitch on first appearance
+        with phase("sprites"):
+            preload_sprites()
+
+        # filtered, timestamped input; frames are paced by waiting on it instead of clock.tick
+        self.input = InputPipeline()
+        self.input.install()
+        self.latency = LatencyProbe()
+
+        # simulation state lives in the headless core; Game only renders and reads input
+        with phase("core"):
+            self.core = GameCore(lane_count=lane_count)
+        with phase("hud (fonts)"):
+            self.hud = HUD(self.store)
+        self.start_run()
+        # an unfinished run from last time continues where it was left (only the real game;
+        # tools that build a Game must not consume the player's saved run)
+        self.suspend_on_quit = resume
+        if resume:
+            self.resume()
+
+        # F3 overlay / F4 trace export; costs next to nothing while off
+        self.profiler = FrameProfiler()
+        self._profiler_font: pygame.font.Font | None = None
+        # lowers render quality when frames run over budget (run() feeds it frame times)
+        # without smooth scaling "nearest" is what already runs: go straight to the next level
+        self.governor = QualityGovernor(max_level=FRAME_SKIP if GOVERNOR_ENABLED else FULL,
+                                        skip=() if SMOOTH_SCALE else (NEAREST,))
 
         self.running = True
-        self.game_over = False
-        self.time_accum_for_speed: float = 0.0
-        # projectiles and lasers
-        self.player_bullets: list[Bullet] = []
-        self.enemy_bullets: list[Bullet] = []
-        self.lasers: list[LaserBeam] = []
 
+    def start_music(self) -> None:
+        """Init the mixer and start the music on a background thread (mp3 decode is slow)."""
+        self.music_thread = threading.Thread(target=self._play_music, name="music", daemon=True)
+        self.music_thread.start()
+
+    def _play_music(self) -> None:
+        # ==== Music on start ====
+        with self.profile.phase("music (background)"):
+            try:
+                pygame.mixer.pre_init(44100, -16, 2, 512)
+                pygame.mixer.init()
+                bgm_path = os.path.join(os.path.dirname(__file__), "assets", "anh_do_skibidi.mp3")  # hoặc bgm.wav
+                pygame.mixer.music.load(bgm_path)
+                pygame.mixer.music.set_volume(0.35)   # 0.0 -> 1.0
+                pygame.mixer.music.play(-1)           # -1 = loop vô hạn
+            except pygame.error as e:
+                print(f"[WARN] Cannot play music: {e}")
+        with self.profile.phase("sfx (background)"):
+            try:
+                self.sfx.load()
+            except pygame.error as e:
+                print(f"[WARN] Cannot load sound effects: {e}")
 
     def apply_display_mode(self) -> None:
         if self.fullscreen:
@@ -79,217 +166,285 @@ class Game:
             w = int(WINDOW_WIDTH * self.scale)
             h = int(WINDOW_HEIGHT * self.scale)
             self.screen = pygame.display.set_mode((w, h))
+        self.compositor.set_target(self.screen)
+        self.store.set("settings", {"scale": self.scale, "fullscreen": self.fullscreen})
+
+    def apply_quality(self) -> None:
+        """Apply the governor's current level to the renderer."""
+        self.compositor.set_smooth(SMOOTH_SCALE and self.governor.level < NEAREST)
+        self.compositor.invalidate()
 
     def toggle_fullscreen(self) -> None:
         self.fullscreen = not self.fullscreen
         self.apply_display_mode()
 
 
-    def reset(self) -> None:
-        self.player = PlayerCar(self.lane_system)
-        self.spawner.clear_all()
-        self.spawner.speed_level = 1
-        self.spawner.spawn_interval = SPAWN_INTERVAL_START
-        self.time_accum_for_speed = 0.0
-        self.game_over = False
-        self.player_bullets.clear()
-        self.enemy_bullets.clear()
-        self.lasers.clear()
-
-    def handle_collisions(self) -> None:
-        # use smaller hitbox for more forgiving collisions
-        player_rect = self.player.hitbox_rect
-
-        # Player vs enemies (body collision)
-        remaining_enemies = []
-        for e in self.spawner.enemies:
-            if player_rect.colliderect(e.rect) and not self.game_over:
-                if self.player.apply_damage(1):
-                    self.game_over = True
-                    self.hud.update_high_score(self.player.score)
-                # enemy stays; it is a solid obstacle
-            remaining_enemies.append(e)
-        self.spawner.enemies = remaining_enemies
-
-        # Player bullets vs enemies
-        remaining_player_bullets: list[Bullet] = []
-        for b in self.player_bullets:
-            hit_any = False
-            for e in self.spawner.enemies:
-                if b.rect.colliderect(e.rect):
-                    e.hp -= b.damage
-                    hit_any = True
-                    if e.hp <= 0:
-                        # enemy destroyed, give score based on type
-                        if e.enemy_type == EnemyType.NORMAL:
-                            self.player.add_score(50)
-                        elif e.enemy_type == EnemyType.LEVEL2:
-                            self.player.add_score(100)
-                        elif e.enemy_type == EnemyType.SPECIAL:
-                            self.player.add_score(200)
-                    break
-            if not hit_any:
-                remaining_player_bullets.append(b)
-
-        # remove dead enemies after bullet processing
-        self.spawner.enemies = [e for e in self.spawner.enemies if e.hp > 0]
-        self.player_bullets = remaining_player_bullets
-
-        # Player vs enemy bullets
-        remaining_enemy_bullets: list[Bullet] = []
-        for b in self.enemy_bullets:
-            if b.rect.colliderect(player_rect) and not self.game_over:
-                if self.player.apply_damage(1):
-                    self.game_over = True
-                    self.hud.update_high_score(self.player.score)
-                # bullet consumed on hit
-            else:
-                remaining_enemy_bullets.append(b)
-        self.enemy_bullets = remaining_enemy_bullets
-
-        # Player vs lasers
-        for laser in self.lasers:
-            if not laser.alive:
-                continue
-            if laser.get_rect(WINDOW_HEIGHT).colliderect(player_rect) and not self.game_over:
-                if self.player.apply_damage(1):
-                    self.game_over = True
-                    self.hud.update_high_score(self.player.score)
-
-        # Player vs pickups
-        remaining_pickups = []
-        for p in self.spawner.pickups:
-            if player_rect.colliderect(p.rect) and not self.game_over:
-                if p.pickup_type == PickupType.AMMO:
-                    self.player.ammo += PICKUP_AMMO_AMOUNT
-                elif p.pickup_type == PickupType.HP:
-                    # heal but cap at max hp
-                    self.player.hp = min(self.player.hp + PICKUP_HP_AMOUNT, PLAYER_START_HP)
-                elif p.pickup_type == PickupType.COIN:
-                    self.player.add_score(PICKUP_COIN_SCORE)
-                    self.player.add_coin(1)
-                # pickup consumed
-            else:
-                remaining_pickups.append(p)
-        self.spawner.pickups = remaining_pickups
+    def start_run(self) -> None:
+        """Reset the core with a fresh seed and start recording its replay."""
+        seed = random.SystemRandom().getrandbits(63)
+        self.seed = seed
+        self.core.reset(seed)
+        self.recorder = ReplayRecorder(seed)
 
-    def update(self, dt: float) -> None:
-        if self.game_over:
-            return
+    def suspend(self, path: str = SUSPEND_FILE) -> None:
+        """Save the unfinished run (core snapshot + its replay so far) for `resume()`."""
+        try:
+            snapshot.save(path, self.core, self.recorder.replay.to_bytes())
+        except OSError as e:
+            print(f"[WARN] Cannot save the run: {e}")
+
+    def resume(self, path: str = SUSPEND_FILE) -> bool:
+        """Continue a run saved by `suspend()`; the file is consumed. False if there is none."""
+        if not os.path.exists(path):
+            return False
+        try:
+            state, replay_data = snapshot.load(path)
+            if snapshot.lane_count(state) != self.core.lane_system.lane_count:
+                # e.g. saved in the arena: leave it for a matching start
+                return False
+            replay = Replay.from_bytes(replay_data)
+            self.core.restore(state)
+        except (OSError, snapshot.SnapshotError, ReplayError) as e:
+            print(f"[WARN] Cannot resume the saved run: {e}")
+            self.start_run()
+            return False
+        self.seed = replay.seed
+        self.recorder = ReplayRecorder.resume(replay)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return True
 
-        # update player smooth lane animation
-        self.player.update(dt)
-
-        self.spawner.update(dt)
-
-        # enemy shooting (bullets / lasers)
-        for e in self.spawner.enemies:
-            if e.can_shoot():
-                e.reset_shot_timer()
-                if e.enemy_type == EnemyType.LEVEL2:
-                    # spawn a single circular bullet in this lane (red circle)
-                    b = Bullet(
-                        e.lane_index,
-                        e.x,
-                        e.y + e.height / 2,
-                        from_player=False,
-                        is_circle=True,
-                        color_override=(230, 60, 60),
-                    )
-                    self.enemy_bullets.append(b)
-                elif e.enemy_type == EnemyType.SPECIAL:
-                    # spawn a full-lane laser going downward from enemy
-                    laser = LaserBeam(e.lane_index, e.x, e.y, e.width, e.color)
-                    self.lasers.append(laser)
-                    # special enemy stands still while channeling the laser
-                    e.channel_timer = LASER_DURATION
-
-        # update bullets & lasers
-        for b in self.player_bullets:
-            b.update(dt)
-        for b in self.enemy_bullets:
-            b.update(dt)
-        for laser in self.lasers:
-            laser.update(dt)
-
-        # remove off-screen bullets / expired lasers
-        self.player_bullets = [b for b in self.player_bullets if 0 - 50 < b.y < WINDOW_HEIGHT + 50]
-        self.enemy_bullets = [b for b in self.enemy_bullets if 0 - 50 < b.y < WINDOW_HEIGHT + 50]
-        self.lasers = [lz for lz in self.lasers if lz.alive]
-
-        self.handle_collisions()
-
-        # passive score over time, scaled by speed level
-        self.player.add_score(int(60 * dt * self.spawner.speed_level))
-
-        # difficulty scaling over time
-        self.time_accum_for_speed += dt
-        if self.time_accum_for_speed >= SPEED_INCREASE_INTERVAL:
-            self.time_accum_for_speed = 0.0
-            self.spawner.increase_difficulty()
-            # also decrease enemy shoot cooldown as difficulty increases
-            level = self.spawner.speed_level
-            new_interval = max(
-                ENEMY_SHOOT_INTERVAL_MIN,
-                ENEMY_SHOOT_INTERVAL - ENEMY_SHOOT_INTERVAL_DECAY_PER_LEVEL * (level - 1),
-            )
-            self.spawner.current_shoot_interval = new_interval
-            for e in self.spawner.enemies:
-                if e.enemy_type in (EnemyType.LEVEL2, EnemyType.SPECIAL):
-                    e.shoot_interval = new_interval
-
-    def draw(self) -> None:
-        surf = self.canvas
-        surf.fill(BACKGROUND_COLOR)
-        self.lane_system.draw(surf)
-
-        for e in self.spawner.enemies:
-            e.draw(surf)
-        for p in self.spawner.pickups:
-            p.draw(surf)
-
-        for laser in self.lasers:
-            if laser.alive:
-                laser.draw(surf)
-
-        for b in self.enemy_bullets:
-            b.draw(surf)
-        for b in self.player_bullets:
-            b.draw(surf)
-
-        self.player.draw(surf)
-        self.hud.draw_top_panel(surf, self.player, self.spawner.speed_level)
-
-        if self.game_over:
-            self.hud.draw_game_over(surf, self.player.score)
-
-        # ===== scale canvas -> screen (giữ tỉ lệ, có letterbox nếu fullscreen) =====
-        sw, sh = self.screen.get_size()
-        bw, bh = self.base_size
-        scale = min(sw / bw, sh / bh)
-        dw, dh = int(bw * scale), int(bh * scale)
-
-        if SMOOTH_SCALE:
-            scaled = pygame.transform.smoothscale(surf, (dw, dh))
-        else:
-            scaled = pygame.transform.scale(surf, (dw, dh))
+    def reset(self) -> None:
+        self.input.clear()
+        self.latency.reset()
+        self.start_run()
 
-        x = (sw - dw) // 2
-        y = (sh - dh) // 2
+    def save_replay(self) -> None:
+        replay = self.recorder.finish(self.core)
+        try:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            replay.save(replay_path(replay.seed))
+        except OSError as e:
+            print(f"[WARN] Cannot save replay: {e}")
+
+    def handle_action(self, action: int) -> None:
+        if not self.core.game_over:
+            self.recorder.record(self.core.tick, action)
+        self.core.apply_action(action)
+        self.play_sounds()
+
+    def play_sounds(self) -> None:
+        """Play what the core reported since the last call, then drop it."""
+        events = self.core.events
+        if events:
+            self.sfx.play_events(events)
+            events.clear()
 
-        self.screen.fill((0, 0, 0))
-        self.screen.blit(scaled, (x, y))
-        pygame.display.flip()
+    def update(self, dt: float) -> None:
+        if self.core.game_over:
+            return
+        prof = self.profiler
+        self.core.update(dt, prof if prof.enabled else None)
+        with prof.phase("replay"):
+            self.recorder.on_tick(self.core)
+        with prof.phase("sfx"):
+            self.play_sounds()
+        if self.core.game_over:
+            player = self.core.player
+            self.hud.update_high_score(player.score)
+            self.store.add("runs_played", 1)
+            self.store.add("coins", player.coins)
+            # queued for the writer thread, which also ranks it (history.last_percentile)
+            self.history.append(run_record(self.core, self.seed))
+            if self.save_replays:
+                self.save_replay()
+
+    @property
+    def game_over(self) -> bool:
+        return self.core.game_over
+
+    @staticmethod
+    def _draw_lerp(entity, surface: pygame.Surface, alpha: float, scale: float, cam_x: float = 0) -> pygame.Rect:
+        """Draw an entity at its position interpolated between the last two sim ticks, relative to the camera."""
+        x, y = entity.x, entity.y
+        entity.x = x - cam_x
+        entity.y = entity.prev_y + (y - entity.prev_y) * alpha
+        rect = entity.draw(surface, scale)
+        entity.x, entity.y = x, y
+        return rect
+
+    def update_camera(self, player_x: float) -> None:
+        """Centre the view on the player, clamped to the arena; the background follows."""
+        lanes = self.core.lane_system
+        view_w = self.base_size[0]
+        cam_x = int(max(0, min(lanes.width - view_w, player_x - view_w / 2)))
+        if cam_x != self.camera_x:
+            self.camera_x = cam_x
+            self.compositor.redraw_background()
+
+    def draw(self, alpha: float = 1.0) -> bool:
+        """Render the current state; `alpha` in [0, 1] blends from the previous sim tick.
+
+        Returns False if nothing changed and the frame was not presented.
+        """
+        core = self.core
+        if core.game_over:
+            alpha = 1.0
+        comp = self.compositor
+        prof = self.profiler
+        # same tick + same blend -> identical frame (on the game-over screen only the run's
+        # percentile still changes, when the history writer has ranked it)
+        player = core.player
+        self.update_camera(player.prev_x + (player.current_x - player.prev_x) * alpha)
+        with prof.phase("draw.clear"):
+            if not comp.begin((core.tick, round(alpha, 3), core.game_over, self.history.last_percentile)):
+                return False
+        surf = comp.canvas
+        s = comp.scale
+
+        with prof.phase("draw.sprites"):
+            self._draw_sprites(surf, alpha, s)
+
+        with prof.phase("draw.hud"):
+            self._draw_overlays()
+
+        # ===== canvas -> screen (giữ tỉ lệ, có letterbox nếu fullscreen) =====
+        with prof.phase("present"):
+            comp.present()
+        return True
+
+    def _draw_sprites(self, surf: pygame.Surface, alpha: float, s: float) -> None:
+        core = self.core
+        comp = self.compositor
+        draw = self._draw_lerp
+        cam_x = self.camera_x
+        # culling: only lanes the view overlaps (+ half an entity) are drawn; the rest is simulated only
+        visible = core.lane_system.lanes_between(cam_x - ENEMY_WIDTH, cam_x + self.base_size[0] + ENEMY_WIDTH)
+        lo, hi = visible.start, visible.stop
+        # "near only" quality: nothing drawn above the draw distance (things that just spawned)
+        far_y = core.player.y - GOVERNOR_DRAW_DISTANCE if self.governor.level >= NEAR_ONLY else -1e9
+        spawner = core.spawner
+        for lane in visible:
+            for e in spawner.enemy_index.lanes[lane]:
+                if e.y > far_y:
+                    comp.add(draw(e, surf, alpha, s, cam_x))
+        for lane in visible:
+            for p in spawner.pickup_index.lanes[lane]:
+                if p.y > far_y:
+                    comp.add(draw(p, surf, alpha, s, cam_x))
+
+        for laser in core.lasers:
+            if laser.alive and lo <= laser.lane_index < hi:
+                x = laser.x
+                laser.x = x - cam_x
+                comp.add(laser.draw(surf, s))
+                laser.x = x
+
+        for b in core.enemy_bullets:
+            if lo <= b.lane_index < hi and b.y > far_y:
+                comp.add(draw(b, surf, alpha, s, cam_x))
+        for b in core.player_bullets:
+            if b.y > far_y:
+                comp.add(draw(b, surf, alpha, s, cam_x))
+
+        player = core.player
+        current_x = player.current_x
+        player.current_x = player.prev_x + (current_x - player.prev_x) * alpha - cam_x
+        comp.add(player.draw(surf, s))
+        player.current_x = current_x
+
+    def _draw_overlays(self) -> None:
+        core = self.core
+        comp = self.compositor
+        player = core.player
+        level = core.spawner.speed_level
+        hud = self.hud
+        # score changes every tick, the rest rarely: separate layers keep re-renders small
+        comp.layer("score", player.score, lambda s: hud.draw_score(s, player))
+        comp.layer("hud", (hud.high_score, level, player.hp, player.ammo, player.coins),
+                   lambda s: hud.draw_status(s, player, level))
+        governor = self.governor
+        if governor.level > FULL:
+            comp.layer("quality", governor.level, lambda s: hud.draw_quality(s, governor.name))
+
+        if core.game_over:
+            score = player.score
+            # None until the writer thread has ranked the run; it is part of the frame signature
+            # in draw(), so the layer is re-rendered when it arrives
+            pct = self.history.last_percentile
+            comp.layer("game_over", (score, hud.high_score, pct), lambda s: hud.draw_game_over(s, score, pct))
+
+        prof = self.profiler
+        if prof.enabled:
+            if self._profiler_font is None:
+                self._profiler_font = load_font(FONT_NAME, 14)
+            font = self._profiler_font
+            # redrawn every 10 frames, the numbers are unreadable at 60 Hz anyway
+            comp.layer("profiler", prof.frames // 10, lambda s: prof.draw_overlay(s, font, 1.0 / FPS))
+
+    def entity_count(self) -> int:
+        core = self.core
+        return (len(core.spawner.enemies) + len(core.spawner.pickups) + len(core.lasers)
+                + len(core.enemy_bullets) + len(core.player_bullets))
+
+    def toggle_profiler(self) -> None:
+        self.profiler.toggle()
+        self.compositor.invalidate()
+
+    def export_profile(self) -> None:
+        try:
+            path = self.profiler.export()
+        except OSError as e:
+            print(f"[WARN] Cannot export profile: {e}")
+            return
+        print(f"Profile trace written to {path}")
 
 
-    def run(self) -> None:
-        dt = 0.0
+    def show_first_frame(self) -> None:
+        with self.profile.phase("first frame"):
+            self.draw()
+        self.start_music()
+
+    def run(self, startup_profile: bool = False, latency_probe: int | None = None) -> None:
+        """Main loop; with `startup_profile`, print the startup phase times and quit after the first frame.
+
+        With `latency_probe`, print input latency percentiles at exit; a count > 0
+        also injects that many lane-change presses and quits once they are shown.
+        """
+        self.show_first_frame()
+        if startup_profile:
+            self.music_thread.join()
+            print("startup profile:")
+            print(self.profile.report())
+            self.running = False
+        latency = self.latency
+        if latency_probe:
+            latency.inject(latency_probe)
+
+        # fixed-step simulation: render rate only decides how many SIM_DT ticks run per frame
+        accumulator = 0.0
+        frame_time = 1.0 / FPS
+        prof = self.profiler
+        governor = self.governor
+        inputs = self.input
+        last = time.perf_counter()
         while self.running:
-            dt = self.clock.tick(FPS) / 1000.0
-
-            for event in pygame.event.get():
+            # wait out the rest of the frame on the event queue: a press wakes it and gets its arrival time
+            events = inputs.wait(last + frame_time)
+            # the governor judges work time only, not that wait
+            frame_start = time.perf_counter()
+            accumulator += frame_start - last
+            last = frame_start
+            prof.begin_frame()
+
+            for pressed, event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type in WINDOW_EVENTS:
+                    # static screens skip frames and only dirty rects are repainted: redraw it all
+                    self.compositor.invalidate()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.running = False
@@ -299,6 +454,12 @@ class Game:
                     elif event.key == pygame.K_F11:
                         self.toggle_fullscreen()
 
+                    elif event.key == pygame.K_F3:
+                        self.toggle_profiler()
+
+                    elif event.key == pygame.K_F4:
+                        self.export_profile()
+
                     elif event.key in (pygame.K_EQUALS, pygame.K_KP_PLUS):  # = hoặc numpad +
                         self.scale = min(6, self.scale + 1)
                         if not self.fullscreen:
@@ -309,26 +470,47 @@ class Game:
                         if not self.fullscreen:
                             self.apply_display_mode()
 
-                    else:
-                        # lane change input with cooldown
-                        current_time = pygame.time.get_ticks() / 1000.0
-                        self.player.handle_event(event, current_time)
-                        # shooting (space)
-                        if event.key == pygame.K_SPACE and not self.game_over:
-                            if self.player.consume_shot():
-                                bullet = Bullet(
-                                    lane_index=self.player.lane_index,
-                                    x=self.player.x,
-                                    y=self.player.y - self.player.height / 2,
-                                    from_player=True,
-                                )
-                                self.player_bullets.append(bullet)
+                    elif event.key in KEY_ACTIONS:
+                        # lane change (with cooldown in sim time) / shooting, applied at the tick it falls in
+                        inputs.push(pressed, KEY_ACTIONS[event.key])
 
+            if latency_probe:
+                if self.game_over:
+                    self.reset()
+                elif not latency.injecting(inputs):
+                    self.running = False
             if not self.running:
                 break
 
-            self.update(dt)
-            self.draw()
-
+            # wall time the sim has reached; tick n of this frame ends at sim_time + n * SIM_DT
+            sim_time = frame_start - accumulator
+            steps = 0
+            while accumulator >= SIM_DT and steps < MAX_CATCHUP_STEPS:
+                steps += 1
+                # presses in the leftover partial tick go to the last tick instead of waiting a frame
+                last_tick = accumulator < 2 * SIM_DT or steps == MAX_CATCHUP_STEPS
+                for when, action in inputs.due(sim_time + steps * SIM_DT, last_tick):
+                    if not self.game_over:
+                        latency.applied(when)
+                    self.handle_action(action)
+                self.update(SIM_DT)
+                accumulator -= SIM_DT
+            if steps == MAX_CATCHUP_STEPS:
+                # long stall: drop the backlog instead of spiralling
+                accumulator = min(accumulator, SIM_DT)
+
+            if not governor.skip_render() and self.draw(accumulator / SIM_DT):
+                latency.presented()
+            if governor.end_frame(time.perf_counter() - frame_start):
+                self.apply_quality()
+            if prof.enabled:
+                prof.end_frame(self.entity_count(), governor.level)
+
+        if latency_probe is not None:
+            print(latency.report())
+        if self.suspend_on_quit and not self.game_over and self.core.tick:
+            self.suspend()
+        self.store.close()
+        self.history.close()
         pygame.quit()
         sys.exit(0)
@@ -0,0 +1,103 @@
+"""Adaptive quality: trade looks for frame time when the machine cannot keep up.
+
+`QualityGovernor` watches the work time of recent frames (everything but
+the wait for input until the frame deadline, see `inputs.InputPipeline.wait`).
+When their mean stays above the down threshold, it lowers quality one
+level. Each level keeps the ones before it:
+
+    1 nearest     nearest-neighbour scaling instead of smoothscale
+    2 near only   sprites far up the road (just spawned) are not drawn
+    3 frame skip  every other frame is not rendered; the sim still runs every tick
+
+Levels that would not save anything here are passed over (`skip`), e.g.
+nearest when SMOOTH_SCALE is already off.
+
+When frames stay well under budget for `up_frames`, quality goes back up
+one level. The gap between the two thresholds plus the wait is the
+hysteresis. A level that has to be dropped again soon after it was
+restored doubles the wait before the next try, so a machine sitting right
+at the edge settles instead of flapping.
+"""
+from __future__ import annotations
+
+from collections import deque
+
+from settings import (
+    FPS,
+    GOVERNOR_WINDOW,
+    GOVERNOR_DOWN,
+    GOVERNOR_UP,
+    GOVERNOR_UP_FRAMES,
+    GOVERNOR_UP_FRAMES_MAX,
+)
+
+FULL, NEAREST, NEAR_ONLY, FRAME_SKIP = range(4)
+LEVEL_NAMES = ("full", "nearest", "near only", "frame skip")
+
+
+class QualityGovernor:
+    def __init__(self, budget: float = 1.0 / FPS, window: int = GOVERNOR_WINDOW,
+                 up_frames: int = GOVERNOR_UP_FRAMES, max_level: int = FRAME_SKIP,
+                 skip: tuple[int, ...] = ()) -> None:
+        self.budget = budget
+        self.max_level = max_level
+        self.skip = skip
+        self.level = FULL
+        self.up_frames = up_frames
+        self._base_up_frames = up_frames
+        self._times: deque[float] = deque(maxlen=window)
+        self._sum = 0.0
+        self._frame = 0
+        self._changed_at = 0
+        self._raised_at: int | None = None  # frame of the last step up
+
+    @property
+    def name(self) -> str:
+        return LEVEL_NAMES[self.level]
+
+    def end_frame(self, work: float) -> bool:
+        """Record one frame's work time (seconds); True if the level changed."""
+        times = self._times
+        if len(times) == times.maxlen:
+            self._sum -= times[0]
+        times.append(work)
+        self._sum += work
+        self._frame += 1
+        if len(times) < times.maxlen:
+            return False
+
+        mean = self._sum / len(times)
+        if mean > self.budget * GOVERNOR_DOWN and self.level < self.max_level:
+            if self._raised_at is not None and self._frame - self._raised_at < 2 * self.up_frames:
+                # the level we just restored is too expensive: wait longer before retrying it
+                self.up_frames = min(self.up_frames * 2, GOVERNOR_UP_FRAMES_MAX)
+            self._raised_at = None
+            self._set(self._next(self.level, 1))
+            return True
+        if (mean < self.budget * GOVERNOR_UP and self.level > FULL
+                and self._frame - self._changed_at >= self.up_frames):
+            self._raised_at = self._frame
+            self._set(self._next(self.level, -1))
+            return True
+        if self._raised_at is not None and self._frame - self._raised_at >= 2 * self.up_frames:
+            # the restored level held up: back to the normal wait
+            self._raised_at = None
+            self.up_frames = self._base_up_frames
+        return False
+
+    def _next(self, level: int, step: int) -> int:
+        level += step
+        while level in self.skip and FULL < level < self.max_level:
+            level += step
+        return level
+
+    def _set(self, level: int) -> None:
+        self.level = level
+        self._changed_at = self._frame
+        # judge the new level on its own frames only
+        self._times.clear()
+        self._sum = 0.0
+
+    def skip_render(self) -> bool:
+        """True if this frame should not be drawn (frame-skip level, every other frame)."""
+        return self.level >= FRAME_SKIP and self._frame % 2 == 1
@@ -0,0 +1,353 @@
+"""Run history: every finished run, one fixed-width column file per field.
+
+Layout of HISTORY_DIR:
+    <column>.col   raw little-endian values, one per run, append-only
+    order.col      row ids sorted by score     } written by compaction;
+    sorted.col     scores in that order        } cover the first
+    days.col       per-day totals              } n rows only
+    index.json     {"rows": n, ...}            }
+
+Game hands finished runs to `append()`, which only queues them; a writer
+thread ranks the newest one against the runs on disk (`last_percentile`),
+appends the queue to the column files and, every
+HISTORY_COMPACT_EVERY rows, rebuilds the sorted score index and the
+per-day totals. Reads map the files with np.memmap, so leaderboards,
+percentiles and daily aggregates over millions of runs touch the index
+plus only the rows added since the last compaction.
+
+Usage:
+    python history.py top [N]
+    python history.py daily [DAYS]
+    python history.py bench [ROWS]   # synthetic history in a temp dir, query timings
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from settings import HISTORY_COMPACT_EVERY, HISTORY_DIR
+
+COLUMNS: dict[str, np.dtype] = {
+    "ended": np.dtype("<i8"),      # unix time the run ended
+    "score": np.dtype("<i8"),
+    "coins": np.dtype("<i4"),
+    "duration": np.dtype("<f4"),   # simulated seconds
+    "max_level": np.dtype("<i2"),  # highest speed_level reached
+    "cause": np.dtype("u1"),       # index into CAUSES
+    "seed": np.dtype("<u8"),
+}
+CAUSES = ("unknown", "enemy", "bullet", "laser")
+_ORDER = np.dtype("<i8")
+# per local day over the compacted rows, written by compaction
+_DAY = np.dtype([("day", "<i8"), ("runs", "<i8"), ("best", "<i8"), ("score", "<i8"), ("coins", "<i8")])
+
+
+def _utc_offset(now: float) -> int:
+    return time.localtime(now).tm_gmtoff
+
+
+def _rollup(ended: np.ndarray, scores: np.ndarray, coins: np.ndarray, offset: int) -> np.ndarray:
+    """Per-day runs / best / score sum / coins, sorted by day."""
+    day = (np.asarray(ended) + offset) // 86400
+    keys, inverse = np.unique(day, return_inverse=True)
+    out = np.zeros(len(keys), dtype=_DAY)
+    out["day"] = keys
+    out["runs"] = np.bincount(inverse, minlength=len(keys))
+    out["score"] = np.bincount(inverse, weights=scores, minlength=len(keys))
+    out["coins"] = np.bincount(inverse, weights=coins, minlength=len(keys))
+    best = np.full(len(keys), np.iinfo(np.int64).min)
+    np.maximum.at(best, inverse, np.asarray(scores))
+    out["best"] = best
+    return out
+
+
+def run_record(core, seed: int, ended: float | None = None) -> dict:
+    """History row for the run `core` just finished."""
+    cause = core.death_cause
+    return {
+        "ended": int(time.time() if ended is None else ended),
+        "score": core.player.score,
+        "coins": core.player.coins,
+        "duration": core.elapsed,
+        "max_level": core.spawner.speed_level,  # never goes down during a run
+        "cause": CAUSES.index(cause) if cause in CAUSES else 0,
+        "seed": seed,
+    }
+
+
+class RunHistory:
+    def __init__(self, path: str = HISTORY_DIR, compact_every: int = HISTORY_COMPACT_EVERY) -> None:
+        self.path = path
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending: list[dict] = []
+        self._busy = False
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        # percentile of the newest appended run among earlier ones; None until the writer ranked it
+        self.last_percentile: float | None = None
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name + ".col")
+
+    # ===== game thread =====
+    def append(self, record: dict) -> None:
+        """Queue a finished run (see run_record); returns immediately."""
+        with self._lock:
+            self._pending.append(record)
+            self.last_percentile = None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="history-writer", daemon=True)
+                self._thread.start()
+            self._wake.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until queued runs are on disk; False on timeout."""
+        with self._lock:
+            return self._wake.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout: float | None = 2.0) -> None:
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # ===== writer thread =====
+    def _writer(self) -> None:
+        try:
+            self._repair()
+        except OSError as e:
+            print(f"[WARN] Cannot open run history {self.path}: {e}")
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wake.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                self._busy = True
+            try:
+                # the newest run is ranked against every earlier one, queued together with it or not
+                if len(batch) > 1:
+                    self._write(batch[:-1])
+                pct = self.percentile(batch[-1]["score"])
+                with self._lock:
+                    if not self._pending:  # a newer run was queued meanwhile: it gets ranked next round
+                        self.last_percentile = pct
+                self._write(batch[-1:])
+                rows = self.rows()
+                if rows - self._index_rows() >= self.compact_every:
+                    self.compact()
+            except OSError as e:
+                print(f"[WARN] Cannot save run history: {e}")
+            with self._lock:
+                self._busy = False
+                self._wake.notify_all()
+
+    def _repair(self) -> None:
+        """Cut every column to the shortest one (a crash can leave a half-appended row)."""
+        os.makedirs(self.path, exist_ok=True)
+        rows = self.rows()
+        for name, dtype in COLUMNS.items():
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) != rows * dtype.itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * dtype.itemsize)
+
+    def _write(self, batch: list[dict]) -> None:
+        for name, dtype in COLUMNS.items():
+            values = np.array([r[name] for r in batch], dtype=dtype)
+            with open(self._file(name), "ab") as f:
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact(self) -> None:
+        """Rebuild the score index over all rows (runs on the writer thread)."""
+        rows = self.rows()
+        scores = np.array(self.column("score", rows))
+        order = np.argsort(scores, kind="stable").astype(_ORDER)
+        offset = _utc_offset(time.time())
+        days = _rollup(self.column("ended", rows), scores, self.column("coins", rows), offset)
+        for name, data in (("order", order), ("sorted", scores[order]), ("days", days)):
+            tmp = self._file(name) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._file(name))
+        tmp = os.path.join(self.path, "index.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"rows": rows, "days": len(days), "utc_offset": offset}, f)
+        os.replace(tmp, os.path.join(self.path, "index.json"))
+
+    # ===== queries (any thread) =====
+    def rows(self) -> int:
+        """Complete rows on disk (queued runs are not counted)."""
+        n = None
+        for name, dtype in COLUMNS.items():
+            try:
+                size = os.path.getsize(self._file(name)) // dtype.itemsize
+            except OSError:
+                return 0
+            n = size if n is None else min(n, size)
+        return n or 0
+
+    def column(self, name: str, rows: int | None = None) -> np.ndarray:
+        """Read-only memory map of the first `rows` values of a column."""
+        dtype = _DAY if name == "days" else COLUMNS.get(name, _ORDER)
+        if rows is None:
+            rows = self.rows()
+        if rows == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=(rows,))
+
+    def _read_index(self) -> dict:
+        try:
+            with open(os.path.join(self.path, "index.json"), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            rows, days = int(index["rows"]), int(index["days"])
+            sizes = [os.path.getsize(self._file(name)) for name in ("order", "sorted", "days")]
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+        if sizes != [rows * _ORDER.itemsize, rows * _ORDER.itemsize, days * _DAY.itemsize]:
+            return {}  # index files from a half-finished compaction
+        return index
+
+    def _index_rows(self) -> int:
+        return int(self._read_index().get("rows", 0))
+
+    def _index(self) -> tuple[int, np.ndarray, np.ndarray]:
+        n = self._index_rows()
+        return n, self.column("order", n), self.column("sorted", n)
+
+    def percentile(self, score: int) -> float | None:
+        """Share of recorded runs (0-100) that scored below `score`; None with no history."""
+        rows = self.rows()
+        if rows == 0:
+            return None
+        n, _, sorted_scores = self._index()
+        below = int(np.searchsorted(sorted_scores, score, side="left"))
+        tail = self.column("score", rows)[n:]
+        below += int(np.count_nonzero(tail < score))
+        return 100.0 * below / rows
+
+    def top(self, count: int = 10) -> list[dict]:
+        """Best `count` runs, highest score first."""
+        rows = self.rows()
+        n, order, _ = self._index()
+        candidates = np.concatenate([order[-count:], np.arange(n, rows, dtype=_ORDER)])
+        scores = self.column("score", rows)[candidates]
+        best = candidates[np.argsort(-scores, kind="stable")[:count]]
+        cols = {name: self.column(name, rows)[best] for name in COLUMNS}
+        runs = []
+        for i in range(len(best)):
+            run = {name: values[i].item() for name, values in cols.items()}
+            run["cause"] = CAUSES[run["cause"]] if run["cause"] < len(CAUSES) else "unknown"
+            runs.append(run)
+        return runs
+
+    def daily(self, days: int = 7, now: float | None = None) -> list[dict]:
+        """Runs, best / mean score and coins per local calendar day, oldest day first."""
+        rows = self.rows()
+        now = time.time() if now is None else now
+        offset = _utc_offset(now)
+        first_day = (int(now) + offset) // 86400 - days + 1
+        index = self._read_index()
+        n = index.get("rows", 0)
+        totals: dict[int, list[int]] = {}
+        if n and index.get("utc_offset") == offset:
+            rollup = self.column("days", index["days"])
+            for r in rollup[np.searchsorted(rollup["day"], first_day):]:
+                totals[int(r["day"])] = [int(r["runs"]), int(r["best"]), int(r["score"]), int(r["coins"])]
+        else:
+            n = 0  # no index, or it was built in another time zone: aggregate everything
+        for r in _rollup(self.column("ended", rows)[n:], self.column("score", rows)[n:],
+                         self.column("coins", rows)[n:], offset):
+            day = int(r["day"])
+            if day < first_day:
+                continue
+            t = totals.setdefault(day, [0, int(r["best"]), 0, 0])
+            t[0] += int(r["runs"])
+            t[1] = max(t[1], int(r["best"]))
+            t[2] += int(r["score"])
+            t[3] += int(r["coins"])
+        return [
+            {
+                "day": time.strftime("%Y-%m-%d", time.gmtime(day * 86400)),
+                "runs": runs,
+                "best": best,
+                "mean": total / runs,
+                "coins": coins,
+            }
+            for day, (runs, best, total, coins) in sorted(totals.items())
+        ]
+
+
+def bench(rows: int) -> None:
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory(prefix="history-") as tmp:
+        history = RunHistory(tmp)
+        now = time.time()
+        data = {
+            "ended": np.sort(rng.integers(int(now) - 90 * 86400, int(now), rows)),
+            "score": rng.gamma(2.0, 1500.0, rows).astype(np.int64),
+            "coins": rng.integers(0, 80, rows),
+            "duration": rng.gamma(2.0, 40.0, rows),
+            "max_level": rng.integers(1, 30, rows),
+            "cause": rng.integers(1, len(CAUSES), rows),
+            "seed": rng.integers(0, 2**63, rows),
+        }
+        for name, dtype in COLUMNS.items():
+            with open(history._file(name), "wb") as f:
+                f.write(data[name].astype(dtype).tobytes())
+        start = time.perf_counter()
+        history.compact()
+        print(f"{rows} rows, compaction {(time.perf_counter() - start) * 1000:.0f} ms")
+        # a few uncompacted runs on top, as after a play session
+        history._write([{name: data[name][i] for name in COLUMNS} | {"ended": int(now)} for i in range(50)])
+
+        def timed(label, fn, repeat=20):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                result = fn()
+            print(f"  {label:<14} {(time.perf_counter() - start) / repeat * 1000:7.2f} ms")
+            return result
+
+        timed("top 10", lambda: history.top(10))
+        timed("percentile", lambda: history.percentile(3000))
+        timed("daily (7)", lambda: history.daily(7))
+        timed("daily (90)", lambda: history.daily(90))
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] not in ("top", "daily", "bench"):
+        print(__doc__)
+        return 2
+    arg = int(argv[1]) if len(argv) > 1 else None
+    if argv[0] == "bench":
+        bench(arg or 2_000_000)
+        return 0
+    history = RunHistory()
+    if argv[0] == "top":
+        for i, run in enumerate(history.top(arg or 10), 1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["ended"]))
+            print(f"{i:3d}. {run['score']:8d}  coins {run['coins']:4d}  level {run['max_level']:3d}  "
+                  f"{run['duration']:6.1f} s  {run['cause']:<7} {when}  seed {run['seed']}")
+    else:
+        for d in history.daily(arg or 7):
+            print(f"{d['day']}  runs {d['runs']:6d}  best {d['best']:8d}  mean {d['mean']:9.1f}  coins {d['coins']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,56 +2,152 @@ from __future__ import annotations
 
 import json
 import os
+from collections import OrderedDict
 from typing import Tuple
 
 import pygame
 
+from storage import Store
 from settings import (
     FONT_NAME,
     PLAYER_START_HP,
-    HIGHSCORE_FILE,
     WINDOW_WIDTH,
+    TEXT_CACHE_SIZE,
+    FONT_CACHE_FILE,
 )
 
+TEXT_COLOR = (240, 240, 240)
+COIN_COLOR = (240, 220, 120)
+
+
+_FONT_PATHS: dict[str, str | None] = {}
 
-def load_high_score() -> int:
-    if not os.path.exists(HIGHSCORE_FILE):
-        return 0
-    try:
-        with open(HIGHSCORE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return int(data.get("high_score", 0))
-    except Exception:
-        return 0
 
+def find_font(name: str) -> str | None:
+    """File of system font `name` (None = pygame's default font).
 
-def save_high_score(score: int) -> None:
+    The system font scan behind SysFont is slow, so results are kept in
+    FONT_CACHE_FILE and the scan only runs once per machine (or when the
+    cached file has gone away).
+    """
+    if name in _FONT_PATHS:
+        return _FONT_PATHS[name]
+    cache: dict = {}
     try:
-        with open(HIGHSCORE_FILE, "w", encoding="utf-8") as f:
-            json.dump({"high_score": int(score)}, f, ensure_ascii=False, indent=2)
-    except Exception:
+        with open(FONT_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
         pass
+    if name in cache and (cache[name] is None or os.path.exists(cache[name])):
+        path = cache[name]
+    else:
+        path = pygame.font.match_font(name)
+        cache[name] = path
+        try:
+            with open(FONT_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+        except OSError:
+            pass
+    _FONT_PATHS[name] = path
+    return path
+
+
+def load_font(name: str, size: int) -> pygame.font.Font:
+    """Same font as pygame.font.SysFont(name, size), without rescanning the system fonts."""
+    return pygame.font.Font(find_font(name), size)
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (font, text, color), least recently used evicted first."""
+
+    def __init__(self, max_size: int = TEXT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._items: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def render(self, font: pygame.font.Font, text: str, color) -> pygame.Surface:
+        key = (font, text, tuple(color))
+        img = self._items.get(key)
+        if img is not None:
+            self._items.move_to_end(key)
+            return img
+        img = self._items[key] = font.render(text, True, color)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        return img
+
+
+class DigitAtlas:
+    """Pre-rendered 0-9 glyphs of one font and color; numbers are built from glyph blits."""
+
+    def __init__(self, font: pygame.font.Font, color) -> None:
+        chars = "0123456789-"
+        # (glyph, advance): stepping by the font's advance matches a whole-string render
+        self.glyphs = {c: (font.render(c, True, color), m[4]) for c, m in zip(chars, font.metrics(chars))}
+
+    def width(self, value: int) -> int:
+        glyphs = self.glyphs
+        return sum(glyphs[c][1] for c in str(value))
+
+    def draw(self, surface: pygame.Surface, value: int, pos: Tuple[int, int]) -> pygame.Rect:
+        x, y = pos
+        area = pygame.Rect(x, y, 0, 0)
+        glyphs = self.glyphs
+        for c in str(value):
+            img, advance = glyphs[c]
+            area.union_ip(surface.blit(img, (x, y)))
+            x += advance
+        return area
 
 
 class HUD:
-    def __init__(self, font_size: int = 22) -> None:
-        self.font = pygame.font.SysFont(FONT_NAME, font_size)
-        self.big_font = pygame.font.SysFont(FONT_NAME, 40)
-        self.high_score: int = load_high_score()
+    def __init__(self, store: Store, font_size: int = 22) -> None:
+        self.font = load_font(FONT_NAME, font_size)
+        self.big_font = load_font(FONT_NAME, 40)
+        self.small_font = load_font(FONT_NAME, 16)
+        self.store = store
+        self.high_score: int = int(store.get("high_score", 0))
+        self.text_cache = TextCache()
+        self._atlases: dict[tuple, DigitAtlas] = {}
 
     def update_high_score(self, score: int) -> None:
-        if score > self.high_score:
+        # written by the store's thread, not here: this runs on the frame the player dies
+        if self.store.set_max("high_score", score):
             self.high_score = score
-            save_high_score(score)
 
-    def draw_text(self, surface: pygame.Surface, text: str, pos: Tuple[int, int], color=(240, 240, 240)) -> None:
-        img = self.font.render(text, True, color)
-        surface.blit(img, pos)
-
-    def draw_top_panel(self, surface: pygame.Surface, player, speed_level: int) -> None:
-        self.draw_text(surface, f"Score: {player.score}", (16, 10))
-        self.draw_text(surface, f"Best: {self.high_score}", (16, 32))
-        self.draw_text(surface, f"Speed Lv: {speed_level}", (16, 54))
+    def draw_text(self, surface: pygame.Surface, text: str, pos: Tuple[int, int], color=TEXT_COLOR) -> pygame.Rect:
+        img = self.text_cache.render(self.font, text, color)
+        return surface.blit(img, pos)
+
+    def _atlas(self, color) -> DigitAtlas:
+        key = tuple(color)
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = DigitAtlas(self.font, color)
+        return atlas
+
+    def draw_value(self, surface: pygame.Surface, label: str, value: int, pos: Tuple[int, int],
+                   color=TEXT_COLOR, align_right: bool = False) -> pygame.Rect:
+        """Draw `label` + `value`; the label comes from the text cache, the number from the digit atlas.
+
+        With `align_right`, `pos` is the top-right corner.
+        """
+        label_img = self.text_cache.render(self.font, label, color)
+        atlas = self._atlas(color)
+        x, y = pos
+        if align_right:
+            x -= label_img.get_width() + atlas.width(value)
+        area = surface.blit(label_img, (x, y))
+        area.union_ip(atlas.draw(surface, value, (x + label_img.get_width(), y)))
+        return area
+
+    def draw_score(self, surface: pygame.Surface, player) -> pygame.Rect:
+        """The score line alone: it changes every tick, so Game keeps it on its own layer."""
+        return self.draw_value(surface, "Score: ", player.score, (16, 10))
+
+    def draw_status(self, surface: pygame.Surface, player, speed_level: int) -> pygame.Rect:
+        """Best / speed level / hp / ammo / coins."""
+        area = self.draw_value(surface, "Best: ", self.high_score, (16, 32))
+        area.union_ip(self.draw_value(surface, "Speed Lv: ", speed_level, (16, 54)))
 
         # HP hearts
         heart_w, heart_h = 18, 18
@@ -59,30 +155,44 @@ class HUD:
             color = (220, 80, 80) if i < player.hp else (80, 50, 50)
             x = WINDOW_WIDTH - 20 - (PLAYER_START_HP - i) * (heart_w + 4)
             y = 10
-            pygame.draw.rect(surface, color, pygame.Rect(x, y, heart_w, heart_h), border_radius=4)
+            area.union_ip(pygame.draw.rect(surface, color, pygame.Rect(x, y, heart_w, heart_h), border_radius=4))
+
+        # Ammo / coin text, right-aligned
+        area.union_ip(self.draw_value(surface, "Ammo: ", player.ammo, (WINDOW_WIDTH - 20, 40), align_right=True))
+        area.union_ip(self.draw_value(surface, "Coins: ", player.coins, (WINDOW_WIDTH - 20, 64),
+                                      color=COIN_COLOR, align_right=True))
+        return area
 
-        # Ammo text
-        ammo_text = f"Ammo: {player.ammo}"
-        ammo_pos = (WINDOW_WIDTH - 20 - self.font.size(ammo_text)[0], 40)
-        self.draw_text(surface, ammo_text, ammo_pos)
+    def draw_top_panel(self, surface: pygame.Surface, player, speed_level: int) -> pygame.Rect:
+        """Draw score / hp / ammo; returns the area touched."""
+        area = self.draw_score(surface, player)
+        area.union_ip(self.draw_status(surface, player, speed_level))
+        return area
 
-        # Coin text
-        coin_text = f"Coins: {player.coins}"
-        coin_pos = (WINDOW_WIDTH - 20 - self.font.size(coin_text)[0], 64)
-        self.draw_text(surface, coin_text, coin_pos, color=(240, 220, 120))
+    def draw_quality(self, surface: pygame.Surface, name: str) -> pygame.Rect:
+        """Reduced-quality notice under the status lines (governor level above full)."""
+        return self.draw_text(surface, f"GFX: {name}", (16, 76), (150, 150, 170))
 
-    def draw_game_over(self, surface: pygame.Surface, score: int) -> None:
+    def draw_game_over(self, surface: pygame.Surface, score: int, percentile: float | None = None) -> pygame.Rect:
         msg = "CHƯA TÀY ĐÂU!"
         sub = "Press ENTER to restart / ESC to quit"
         best = f"Score: {score}  Best: {self.high_score}"
 
-        msg_img = self.big_font.render(msg, True, (255, 220, 220))
-        best_img = self.font.render(best, True, (240, 240, 240))
-        sub_img = self.font.render(sub, True, (200, 200, 230))
+        cache = self.text_cache
+        msg_img = cache.render(self.big_font, msg, (255, 220, 220))
+        best_img = cache.render(self.font, best, TEXT_COLOR)
+        sub_img = cache.render(self.font, sub, (200, 200, 230))
 
         center_x = surface.get_width() // 2
         center_y = surface.get_height() // 2
 
-        surface.blit(msg_img, msg_img.get_rect(center=(center_x, center_y - 60)))
-        surface.blit(best_img, best_img.get_rect(center=(center_x, center_y)))
-        surface.blit(sub_img, sub_img.get_rect(center=(center_x, center_y + 40)))
+        area = surface.blit(msg_img, msg_img.get_rect(center=(center_x, center_y - 60)))
+        area.union_ip(surface.blit(best_img, best_img.get_rect(center=(center_x, center_y))))
+        sub_y = center_y + 40
+        if percentile is not None:
+            # own line in the small font: appended to the score line it is wider than the window
+            pct_img = cache.render(self.small_font, f"better than {percentile:.0f}% of runs", (180, 180, 200))
+            area.union_ip(surface.blit(pct_img, pct_img.get_rect(center=(center_x, center_y + 26))))
+            sub_y += 16
+        area.union_ip(surface.blit(sub_img, sub_img.get_rect(center=(center_x, sub_y))))
+        return area
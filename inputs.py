@@ -0,0 +1,137 @@
+"""Input pipeline: filtered event queue, arrival timestamps, per-tick dispatch, latency probe.
+
+Only the event types the game handles are queued at all (`USED_EVENTS`:
+quit, key presses and the window events that need a repaint); SDL drops
+the rest (mouse motion, focus, text input ...) before Python sees them.
+Instead of sleeping in `clock.tick`, `InputPipeline.wait()` blocks on the
+event queue until the frame deadline, so a key press wakes it and is
+stamped with the time it arrived. pygame does not expose SDL's
+own event timestamps; events that queued up while the frame was busy are
+stamped when they are read.
+
+Gameplay actions are then handed to the sim at the tick whose time span
+contains the press (`due()`), not all before the frame's first tick. The
+`LatencyProbe` measures press -> display flip of the frame that first
+shows its effect.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+
+import pygame
+
+from profiler import percentile
+
+_clock = time.perf_counter
+
+# the window was uncovered / restored / resized: its contents must be repainted
+WINDOW_EVENTS = (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED)
+# everything else is blocked at the SDL level
+USED_EVENTS = (pygame.QUIT, pygame.KEYDOWN) + WINDOW_EVENTS
+
+
+class InputPipeline:
+    def __init__(self) -> None:
+        # (press time, action) not yet given to the sim, oldest first
+        self.pending: deque[tuple[float, int]] = deque()
+
+    def install(self) -> None:
+        """Block unused event types (call after the display is initialised)."""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(USED_EVENTS)
+
+    def wait(self, deadline: float) -> list[tuple[float, pygame.event.Event]]:
+        """Collect events until `deadline` (perf_counter); each is (arrival time, event)."""
+        now = _clock()
+        events = [(_stamp(e, now), e) for e in pygame.event.get()]
+        while True:
+            ms = int((deadline - _clock()) * 1000)
+            if ms <= 0:
+                return events
+            e = pygame.event.wait(ms)
+            if e.type != pygame.NOEVENT:
+                events.append((_stamp(e, _clock()), e))
+
+    def push(self, when: float, action: int) -> None:
+        self.pending.append((when, action))
+
+    def due(self, tick_end: float, last_tick: bool) -> list[tuple[float, int]]:
+        """Actions pressed before wall time `tick_end`; the frame's `last_tick` takes all of them."""
+        pending = self.pending
+        out = []
+        while pending and (last_tick or pending[0][0] < tick_end):
+            out.append(pending.popleft())
+        return out
+
+    def clear(self) -> None:
+        self.pending.clear()
+
+
+def _stamp(event: pygame.event.Event, arrival: float) -> float:
+    # synthetic presses from LatencyProbe.inject carry their post time
+    return getattr(event, "probe_time", arrival)
+
+
+class LatencyProbe:
+    """Input-to-photon latency: press time -> flip of the first frame drawn after the sim applied it."""
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self.samples: deque[float] = deque(maxlen=capacity)
+        self._applied: list[float] = []
+        self._injector: threading.Thread | None = None
+        self.injected = 0
+
+    def applied(self, pressed: float) -> None:
+        self._applied.append(pressed)
+
+    def presented(self) -> None:
+        """Call right after a frame was flipped to the display."""
+        if self._applied:
+            now = _clock()
+            self.samples.extend(now - t for t in self._applied)
+            self._applied.clear()
+
+    def reset(self) -> None:
+        # presses still in flight when a run restarts never show up on screen
+        self._applied.clear()
+
+    def stats(self) -> dict:
+        values = sorted(self.samples)
+        return {
+            "samples": len(values),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000 if values else 0.0,
+        }
+
+    def report(self) -> str:
+        st = self.stats()
+        return (f"input latency over {st['samples']} presses: p50 {st['p50_ms']:.1f}  p95 {st['p95_ms']:.1f}  "
+                f"p99 {st['p99_ms']:.1f}  max {st['max_ms']:.1f} ms")
+
+    # ===== synthetic presses =====
+    def inject(self, count: int, keys: tuple[int, ...] = (pygame.K_LEFT, pygame.K_RIGHT),
+               gap: tuple[float, float] = (0.15, 0.35)) -> None:
+        """Post `count` key presses at random gaps from a background thread (headless measurement)."""
+        def run() -> None:
+            rng = random.Random(0)
+            for i in range(count):
+                time.sleep(rng.uniform(*gap))
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=keys[i % len(keys)], probe_time=_clock()))
+                self.injected += 1
+
+        self._injector = threading.Thread(target=run, name="latency-probe", daemon=True)
+        self._injector.start()
+
+    def injecting(self, pipeline: InputPipeline) -> bool:
+        """True while an injected press has not been shown yet: still to be posted, in the event
+        queue, waiting in `pipeline` for its tick, or applied but not yet presented."""
+        if self._injector is None:
+            return False
+        # checked in the order a press moves through, so one in transit is not missed
+        return (self._injector.is_alive() or pygame.event.peek(pygame.KEYDOWN)
+                or bool(pipeline.pending) or bool(self._applied))
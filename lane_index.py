@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from operator import attrgetter
+
+from lane_system import LaneSystem
+
+_y = attrgetter("y")
+
+
+class LaneIndex:
+    """Per-lane lists of lane-centred entities kept ordered by y.
+
+    Entities only move vertically inside their lane, so a collision test is
+    a 1-D y-interval query in the lane(s) a rect overlaps horizontally.
+    `resort()` after each movement step keeps the order; the lists are
+    nearly sorted already, so that is a linear pass.
+    """
+
+    def __init__(self, lane_system: LaneSystem, half_width: float, half_height: float, is_elite=None) -> None:
+        self.lane_system = lane_system
+        self.lane_centers = [lane_system.lane_center_x(i) for i in range(lane_system.lane_count)]
+        # largest half extents of the indexed entities (they all sit on a lane centre)
+        self.half_width = half_width
+        self.half_height = half_height
+        # precomputed horizontal span per lane (+1 covers int() truncation of rect.x)
+        self._spans = [(cx - half_width - 1, cx + half_width + 1) for cx in self.lane_centers]
+        # the same spans as two ascending lists, so a query bisects to its first lane
+        self._span_lo = [lo for lo, _ in self._spans]
+        self._span_hi = [hi for _, hi in self._spans]
+        self.lanes: list[list] = [[] for _ in range(lane_system.lane_count)]
+        # per-lane count of entities matching `is_elite` (e.g. level2 + special enemies)
+        self._is_elite = is_elite
+        self.elite_count = [0] * lane_system.lane_count
+
+    def add(self, entity) -> None:
+        insort(self.lanes[entity.lane_index], entity, key=_y)
+        if self._is_elite is not None and self._is_elite(entity):
+            self.elite_count[entity.lane_index] += 1
+
+    def remove(self, entity) -> None:
+        lane = self.lanes[entity.lane_index]
+        # equal y values can sit side by side, so search the run by identity
+        i = bisect_left(lane, entity.y, key=_y)
+        while lane[i] is not entity:
+            i += 1
+        del lane[i]
+        if self._is_elite is not None and self._is_elite(entity):
+            self.elite_count[entity.lane_index] -= 1
+
+    def clear(self) -> None:
+        for lane in self.lanes:
+            lane.clear()
+        self.elite_count = [0] * len(self.lanes)
+
+    def resort(self) -> None:
+        for lane in self.lanes:
+            lane.sort(key=_y)
+
+    def lanes_overlapping(self, x0: float, x1: float) -> list[int]:
+        """Lanes whose entities can overlap the horizontal span [x0, x1)."""
+        lanes = []
+        i = bisect_right(self._span_hi, x0)
+        while i < len(self._spans) and self._span_lo[i] < x1:
+            lanes.append(i)
+            i += 1
+        return lanes
+
+    def query(self, lane: int, y_min: float, y_max: float) -> list:
+        """Entities in `lane` with y in [y_min, y_max], ordered by y."""
+        entities = self.lanes[lane]
+        lo = bisect_left(entities, y_min, key=_y)
+        hi = bisect_right(entities, y_max, lo=lo, key=_y)
+        return entities[lo:hi]
+
+    def candidates(self, rect) -> list:
+        """Entities that may collide with `rect`; caller confirms with colliderect."""
+        x0, x1 = rect.left, rect.right
+        y_min = rect.top - self.half_height - 1
+        y_max = rect.bottom + self.half_height + 1
+        found: list = []
+        # hot path: same as query() over lanes_overlapping(), inlined
+        span_lo, lanes = self._span_lo, self.lanes
+        i, n = bisect_right(self._span_hi, x0), len(lanes)
+        while i < n and span_lo[i] < x1:
+            entities = lanes[i]
+            i += 1
+            if entities:
+                lo = bisect_left(entities, y_min, key=_y)
+                hi = bisect_right(entities, y_max, lo=lo, key=_y)
+                if hi > lo:
+                    found += entities[lo:hi]
+        return found
@@ -12,16 +12,32 @@ class LaneSystem:
 
     def __post_init__(self) -> None:
         self.lane_width = self.width / self.lane_count
+        # lane geometry tables (the wide arena has dozens of lanes)
+        self.centers = [int(self.lane_width * i + self.lane_width / 2) for i in range(self.lane_count)]
+        self.edges = [int(self.lane_width * i) for i in range(self.lane_count + 1)]
+
+    @classmethod
+    def with_lanes(cls, lane_count: int) -> "LaneSystem":
+        """`lane_count` lanes as wide as the normal ones (the world grows, not the window)."""
+        return cls(lane_count, int(lane_count * WINDOW_WIDTH / LANE_COUNT))
 
     def lane_center_x(self, lane_index: int) -> int:
-        lane_index = max(0, min(self.lane_count - 1, lane_index))
-        return int(self.lane_width * lane_index + self.lane_width / 2)
+        return self.centers[max(0, min(self.lane_count - 1, lane_index))]
 
     def clamp_lane(self, lane_index: int) -> int:
         return max(0, min(self.lane_count - 1, lane_index))
 
-    def draw(self, surface: pygame.Surface) -> None:
-        # draw vertical lane separators
-        for i in range(1, self.lane_count):
-            x = int(self.lane_width * i)
-            pygame.draw.line(surface, LANE_LINE_COLOR, (x, 0), (x, self.height), 2)
+    def lanes_between(self, x0: float, x1: float) -> range:
+        """Lanes whose area overlaps [x0, x1)."""
+        lo = max(0, int(x0 // self.lane_width))
+        hi = min(self.lane_count, int(x1 // self.lane_width) + 1)
+        return range(lo, hi)
+
+    def draw(self, surface: pygame.Surface, scale: float = 1.0, offset_x: float = 0.0) -> None:
+        # draw vertical lane separators; offset_x = world x of the surface's left edge
+        width = max(1, round(2 * scale))
+        view_w = surface.get_width() / scale
+        for x in self.edges[1:-1]:
+            if offset_x <= x <= offset_x + view_w:
+                sx = round((x - offset_x) * scale)
+                pygame.draw.line(surface, LANE_LINE_COLOR, (sx, 0), (sx, surface.get_height()), width)
@@ -1,9 +1,28 @@
-from game import Game
+import argparse
+import time
+
+_start = time.perf_counter()
+
+from game import Game, StartupProfile  # noqa: E402  (timed as the "imports" phase)
+from settings import ARENA_LANES, LANE_COUNT  # noqa: E402
 
 
 def main() -> None:
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Lane runner game.")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each startup phase takes, then exit after the first frame")
+    parser.add_argument("--arena", type=int, nargs="?", const=ARENA_LANES, default=LANE_COUNT, metavar="LANES",
+                        help=f"wide arena with a scrolling camera (default {ARENA_LANES} lanes)")
+    parser.add_argument("--latency-probe", type=int, nargs="?", const=0, default=None, metavar="PRESSES",
+                        help="print key-press to screen latency percentiles at exit; "
+                             "with PRESSES, inject that many lane changes and quit")
+    args = parser.parse_args()
+
+    profile = StartupProfile(_start)
+    profile.phases.append(("imports", time.perf_counter() - _start))
+    # the probe plays (and resets) runs of its own: leave the saved run for a normal start
+    game = Game(profile, lane_count=max(1, args.arena), resume=args.latency_probe is None)
+    game.run(startup_profile=args.startup_profile, latency_probe=args.latency_probe)
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ from typing import Tuple
 import pygame
 
 from lane_system import LaneSystem
-from entities import load_sprite
+from entities import PLAYER_SPRITE, scale_point, scale_rect, sprite
 from settings import (
     PLAYER_WIDTH,
     PLAYER_HEIGHT,
@@ -15,6 +15,7 @@ from settings import (
     PLAYER_START_AMMO,
     PLAYER_SHOOT_COOLDOWN,
     PLAYER_INVULN_TIME,
+    PLAYER_LANE_CHANGE_DURATION,
     WINDOW_HEIGHT,
     LANE_CHANGE_COOLDOWN,
 )
@@ -28,7 +29,7 @@ class PlayerCar:
     score: int = 0
     coins: int = 0
     last_lane_change_time: float = -999.0
-    lane_change_duration: float = 0.1  # seconds, visual smooth move
+    lane_change_duration: float = PLAYER_LANE_CHANGE_DURATION
     ammo: int = PLAYER_START_AMMO
 
     def __post_init__(self) -> None:
@@ -39,11 +40,16 @@ class PlayerCar:
         # visual horizontal position (can be between lanes during animation)
         self.current_x: float = self.lane_system.lane_center_x(self.lane_index)
         self.target_x: float = self.current_x
+        # x at the start of the last sim tick, for render interpolation
+        self.prev_x: float = self.current_x
         self._lane_change_elapsed: float = 0.0
         self._lane_change_start_x: float = self.current_x
         # shooting / damage
         self._shoot_cooldown_timer: float = PLAYER_SHOOT_COOLDOWN
         self.invuln_timer: float = 0.0
+        # rects are updated in place on access instead of allocated every time
+        self._rect = pygame.Rect(0, 0, self.width, self.height)
+        self._hitbox = pygame.Rect(0, 0, int(self.width * 0.6), int(self.height * 0.7))
 
     @property
     def x(self) -> float:
@@ -51,19 +57,18 @@ class PlayerCar:
 
     @property
     def rect(self) -> pygame.Rect:
-        return pygame.Rect(int(self.x - self.width / 2), int(self.y - self.height / 2), self.width, self.height)
+        r = self._rect
+        r.x = int(self.x - self.width / 2)
+        r.y = int(self.y - self.height / 2)
+        return r
 
     @property
     def hitbox_rect(self) -> pygame.Rect:
         """Smaller hitbox than visual rectangle to feel fairer."""
-        hit_w = int(self.width * 0.6)
-        hit_h = int(self.height * 0.7)
-        return pygame.Rect(
-            int(self.x - hit_w / 2),
-            int(self.y - hit_h / 2),
-            hit_w,
-            hit_h,
-        )
+        r = self._hitbox
+        r.x = int(self.x - r.width / 2)
+        r.y = int(self.y - r.height / 2)
+        return r
 
     def can_change_lane(self, current_time: float) -> bool:
         return (current_time - self.last_lane_change_time) >= LANE_CHANGE_COOLDOWN
@@ -89,6 +94,7 @@ class PlayerCar:
                 self.change_lane(1, current_time)
 
     def update(self, dt: float) -> None:
+        self.prev_x = self.current_x
         # smooth lane switching
         if self.current_x != self.target_x:
             self._lane_change_elapsed += dt
@@ -124,11 +130,10 @@ class PlayerCar:
         self.invuln_timer = PLAYER_INVULN_TIME
         return self.hp <= 0
 
-    def draw(self, surface: pygame.Surface) -> None:
-        sprite = load_sprite("player.png", (self.width, self.height))
-        if sprite is not None:
-            surface.blit(sprite, sprite.get_rect(center=(int(self.x), int(self.y))))
-            return
+    def draw(self, surface: pygame.Surface, scale: float = 1.0) -> pygame.Rect:
+        img = sprite(PLAYER_SPRITE, scale)
+        if img is not None:
+            return surface.blit(img, img.get_rect(center=scale_point(self.x, self.y, scale)))
 
         # fallback nếu thiếu ảnh
         color = self.color
@@ -136,7 +141,7 @@ class PlayerCar:
             alpha_phase = int((self.invuln_timer * 20) % 2)
             if alpha_phase == 0:
                 color = (min(255, color[0] + 40), min(255, color[1] + 40), min(255, color[2] + 40))
-        pygame.draw.rect(surface, color, self.rect, border_radius=8)
+        return pygame.draw.rect(surface, color, scale_rect(self.rect, scale), border_radius=round(8 * scale))
 
 
     def add_score(self, amount: int) -> None:
@@ -0,0 +1,197 @@
+"""Frame profiler: per-phase timings in ring buffers, an overlay graph and Chrome trace export.
+
+Game owns one FrameProfiler. While it is disabled `phase()` hands back a
+shared no-op context and the sim tick is not instrumented at all, so the
+hooks cost a couple of attribute lookups per frame. F3 toggles profiling
+and the overlay, F4 writes the recorded session as a Chrome trace (open
+it in chrome://tracing or https://ui.perfetto.dev).
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from array import array
+from collections import deque
+
+from settings import PROFILER_FRAMES, PROFILER_TRACE_EVENTS, PROFILE_DIR
+
+_clock = time.perf_counter
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """Reusable timing context for one phase name (no allocation per use)."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "FrameProfiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = _clock()
+
+    def __exit__(self, *exc) -> None:
+        end = _clock()
+        prof = self.profiler
+        prof._frame_phases[self.name] = prof._frame_phases.get(self.name, 0.0) + (end - self.start)
+        prof.events.append((self.name, self.start, end - self.start))
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class FrameProfiler:
+    """Last `capacity` frames of frame time, per-phase time and entity count."""
+
+    def __init__(self, capacity: int = PROFILER_FRAMES, max_events: int = PROFILER_TRACE_EVENTS) -> None:
+        self.enabled = False
+        self.capacity = capacity
+        self.frame_times = array("d", bytes(8 * capacity))  # seconds of work per frame
+        self.entity_counts = array("i", bytes(4 * capacity))
+        self.quality_levels = array("b", bytes(capacity))  # governor level per frame
+        self.phase_times: dict[str, array] = {}
+        self.frames = 0  # frames recorded so far; ring index = frames % capacity
+        # (name, start, duration) in perf_counter seconds, for the trace export
+        self.events: deque[tuple[str, float, float]] = deque(maxlen=max_events)
+        self.counters: deque[tuple[float, int, int]] = deque(maxlen=max_events)
+        self._phases: dict[str, _Phase] = {}
+        self._frame_phases: dict[str, float] = {}
+        self._frame_start = 0.0
+
+    def toggle(self) -> bool:
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def phase(self, name: str):
+        """Context manager timing `name` for the current frame (no-op while disabled)."""
+        if not self.enabled:
+            return _NULL_PHASE
+        ph = self._phases.get(name)
+        if ph is None:
+            ph = self._phases[name] = _Phase(self, name)
+        return ph
+
+    def begin_frame(self) -> None:
+        if self.enabled:
+            self._frame_start = _clock()
+            self._frame_phases.clear()
+
+    def end_frame(self, entity_count: int, quality: int = 0) -> None:
+        if not self.enabled or not self._frame_start:
+            return
+        end = _clock()
+        i = self.frames % self.capacity
+        self.frame_times[i] = end - self._frame_start
+        self.entity_counts[i] = entity_count
+        self.quality_levels[i] = quality
+        for name, secs in self._frame_phases.items():
+            ring = self.phase_times.get(name)
+            if ring is None:
+                ring = self.phase_times[name] = array("d", bytes(8 * self.capacity))
+            ring[i] = secs
+        for name, ring in self.phase_times.items():
+            if name not in self._frame_phases:
+                ring[i] = 0.0
+        self.events.append(("frame", self._frame_start, end - self._frame_start))
+        self.counters.append((self._frame_start, entity_count, quality))
+        self.frames += 1
+        self._frame_start = 0.0
+
+    # ===== reading =====
+    def recent(self, ring: array) -> list[float]:
+        """Ring contents oldest first."""
+        n = min(self.frames, self.capacity)
+        i = self.frames % self.capacity
+        if n < self.capacity:
+            return list(ring[:n])
+        return list(ring[i:]) + list(ring[:i])
+
+    def stats(self) -> dict:
+        """p50/p95/p99 frame time (ms), mean ms per phase, mean entity count and worst quality level."""
+        times = sorted(self.recent(self.frame_times))
+        n = len(times)
+        counts = self.recent(self.entity_counts)
+        return {
+            "frames": n,
+            "p50_ms": percentile(times, 50) * 1000,
+            "p95_ms": percentile(times, 95) * 1000,
+            "p99_ms": percentile(times, 99) * 1000,
+            "phases_ms": {name: sum(self.recent(ring)) / n * 1000 if n else 0.0
+                          for name, ring in self.phase_times.items()},
+            "entities": sum(counts) / n if n else 0.0,
+            "quality": max(self.recent(self.quality_levels), default=0),
+        }
+
+    # ===== export =====
+    def chrome_trace(self) -> dict:
+        """Recorded events in Chrome trace-event format (timestamps in microseconds)."""
+        trace = [{"name": name, "ph": "X", "ts": start * 1e6, "dur": dur * 1e6, "pid": 0, "tid": 0}
+                 for name, start, dur in self.events]
+        trace += [{"name": "counters", "ph": "C", "ts": ts * 1e6, "pid": 0,
+                   "args": {"entities": count, "quality": quality}}
+                  for ts, count, quality in self.counters]
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export(self, path: str | None = None) -> str:
+        if path is None:
+            path = os.path.join(PROFILE_DIR, f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    # ===== overlay =====
+    def draw_overlay(self, surface: pygame.Surface, font: pygame.font.Font, budget: float) -> pygame.Rect:
+        """Frame-time bar graph (red above `budget` seconds) with percentiles and top phases."""
+        # only the overlay needs pygame; percentile() is shared with headless tools (sweep, server)
+        import pygame
+
+        bars = self.recent(self.frame_times)[-120:]
+        w, h = 300, 140
+        x0, y0 = 8, surface.get_height() - h - 8
+        area = pygame.Rect(x0, y0, w, h)
+        surface.fill((0, 0, 0, 170), area)
+        graph_h = 60
+        base = y0 + h - 4
+        limit = budget * 2
+        for i, secs in enumerate(bars):
+            bh = min(graph_h, int(secs / limit * graph_h))
+            color = (230, 80, 80) if secs > budget else (90, 200, 120)
+            surface.fill(color, (x0 + 4 + 2 * i, base - bh, 2, bh))
+        budget_y = base - graph_h // 2
+        surface.fill((200, 200, 200, 120), (x0 + 4, budget_y, w - 8, 1))
+
+        st = self.stats()
+        top = sorted(st["phases_ms"].items(), key=lambda kv: -kv[1])[:3]
+        lines = (
+            f"p50 {st['p50_ms']:.2f}  p95 {st['p95_ms']:.2f}  p99 {st['p99_ms']:.2f} ms",
+            f"entities {st['entities']:.0f}  quality {st['quality']}",
+            "  ".join(f"{name} {ms:.2f}" for name, ms in top),
+        )
+        y = y0 + 4
+        for line in lines:
+            area.union_ip(surface.blit(font.render(line, True, (230, 230, 230)), (x0 + 4, y)))
+            y += font.get_linesize()
+        return area
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from typing import Callable, Hashable
+
+import pygame
+
+from entities import scale_rect
+from settings import BACKGROUND_COLOR, RENDER_MODE, SMOOTH_SCALE
+
+# above this share of the canvas, one full update is cheaper than many small ones
+FULL_UPDATE_AREA = 0.6
+
+
+def merge_rects(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+    """Union overlapping rects so each screen pixel is pushed at most once."""
+    merged: list[pygame.Rect] = []
+    for r in rects:
+        r = r.copy()
+        idx = r.collidelist(merged)
+        while idx != -1:
+            r.union_ip(merged.pop(idx))
+            idx = r.collidelist(merged)
+        merged.append(r)
+    return merged
+
+
+class Layer:
+    """Pre-rendered transparent overlay (HUD, game-over text), re-rendered only when its key changes.
+
+    Overlays are drawn at base size; for a scaled canvas the touched area is
+    scaled once per re-render, not once per frame.
+    """
+
+    def __init__(self, size: tuple[int, int]) -> None:
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.key: Hashable = None
+        self.bounds = pygame.Rect(0, 0, 0, 0)
+        self.scaled: pygame.Surface | None = None
+
+    def render(self, key: Hashable, draw: Callable[[pygame.Surface], pygame.Rect],
+               scale: float = 1.0, smooth: bool = False) -> None:
+        if key == self.key:
+            return
+        self.surface.fill((0, 0, 0, 0), self.bounds)
+        self.bounds = draw(self.surface)
+        self.key = key
+        self.scaled = None
+        if scale != 1 and self.bounds.width and self.bounds.height:
+            resize = pygame.transform.smoothscale if smooth else pygame.transform.scale
+            self.scaled = resize(self.surface.subsurface(self.bounds), scale_rect(self.bounds, scale).size)
+
+    def blit(self, dest: pygame.Surface, scale: float = 1.0) -> pygame.Rect:
+        if self.scaled is None:
+            return dest.blit(self.surface, self.bounds, self.bounds)
+        return dest.blit(self.scaled, scale_rect(self.bounds, scale).topleft)
+
+
+class Compositor:
+    """Draws a frame onto the canvas and pushes only what changed.
+
+    Per frame: `begin()` erases last frame's sprites by restoring the cached
+    background under them, the caller draws sprites at `scale` and reports
+    their rects with `add()`, `layer()` blits cached overlays, and
+    `present()` updates just the dirty screen rects. If nothing changed since
+    the last frame (e.g. the game-over screen) `begin()` returns False and the
+    frame costs nothing.
+
+    Native rendering: the canvas is the letterboxed area of the window itself
+    and everything is drawn at window resolution, so no full-window surface
+    is scaled per frame. Scaled rendering: the canvas has the base size and
+    only its dirty rects are scaled into the window, which is cheaper for
+    integer zoom (restoring and alpha-blitting at 36x the pixels costs more
+    than scaling them) but needs a full-frame resize for smooth or
+    fractional zoom. `mode="auto"` picks per display mode.
+    """
+
+    def __init__(self, size: tuple[int, int], draw_background: Callable[[pygame.Surface, float], None],
+                 mode: str = RENDER_MODE, smooth: bool = SMOOTH_SCALE) -> None:
+        if mode not in ("auto", "native", "scaled"):
+            raise ValueError(f"unknown render mode {mode!r}")
+        self.size = size
+        self.draw_background = draw_background
+        self.mode = mode
+        self.native = mode == "native"
+        self.smooth = smooth
+        self.screen: pygame.Surface | None = None
+        self.view = pygame.Rect((0, 0), size)  # game area on the screen
+        self.output_scale = 1.0
+        self.scale = 1.0  # scale sprites are drawn at on the canvas
+        self.canvas: pygame.Surface | None = None
+        self.background: pygame.Surface | None = None
+        self._scaled_view: pygame.Surface | None = None
+        self.layers: dict[str, Layer] = {}
+        self._prev_rects: list[pygame.Rect] = []
+        self._rects: list[pygame.Rect] = []
+        self._signature: Hashable = None
+        self._full = True
+
+    def set_target(self, screen: pygame.Surface) -> None:
+        """Render into `screen` (call again after every display.set_mode)."""
+        self.screen = screen
+        sw, sh = screen.get_size()
+        bw, bh = self.size
+        scale = min(sw / bw, sh / bh)
+        dw, dh = int(bw * scale), int(bh * scale)
+        self.view = pygame.Rect((sw - dw) // 2, (sh - dh) // 2, dw, dh)
+        self.output_scale = scale
+        if self.mode != "auto":
+            self.native = self.mode == "native"
+        else:
+            self.native = self.smooth or scale != int(scale)
+        self.scale = scale if self.native else 1.0
+        self.canvas = None
+        self.layers.clear()
+        self._prev_rects = []
+        self._full = True
+
+    def set_smooth(self, smooth: bool) -> None:
+        """Switch filtered scaling on/off (the quality governor drops it first); rebuilds the canvas."""
+        if smooth == self.smooth:
+            return
+        self.smooth = smooth
+        if self.screen is not None:
+            self.set_target(self.screen)
+
+    def invalidate(self) -> None:
+        """Force a full redraw."""
+        self._full = True
+
+    def redraw_background(self) -> None:
+        """Re-render the cached background (e.g. after the camera moved) and redraw everything."""
+        if self.background is not None:
+            self.background.fill(BACKGROUND_COLOR)
+            self.draw_background(self.background, self.scale)
+        self._full = True
+
+    def _build(self) -> None:
+        screen = self.screen
+        if self.native:
+            self.canvas = screen.subsurface(self.view)
+        else:
+            self.canvas = pygame.Surface(self.size).convert()
+            # scaling destination, reused every frame instead of a new surface per flip
+            self._scaled_view = screen.subsurface(self.view)
+        self.background = pygame.Surface(self.canvas.get_size()).convert()
+        self.background.fill(BACKGROUND_COLOR)
+        self.draw_background(self.background, self.scale)
+
+    def begin(self, signature: Hashable) -> bool:
+        """Start a frame; returns False if `signature` says nothing changed."""
+        if self.canvas is None:
+            self._build()
+        if not self._full and signature == self._signature:
+            return False
+        self._signature = signature
+        if self._full:
+            self.screen.fill((0, 0, 0))
+            self.canvas.blit(self.background, (0, 0))
+        else:
+            for r in self._prev_rects:
+                self.canvas.blit(self.background, r, r)
+        self._rects = []
+        return True
+
+    def add(self, rect: pygame.Rect | None) -> None:
+        if rect is not None:
+            self._rects.append(rect)
+
+    def layer(self, name: str, key: Hashable, draw: Callable[[pygame.Surface], pygame.Rect]) -> None:
+        """Blit the named overlay, re-rendering it first if `key` changed."""
+        layer = self.layers.get(name)
+        if layer is None:
+            layer = self.layers[name] = Layer(self.size)
+        layer.render(key, draw, self.scale, self.smooth)
+        self._rects.append(layer.blit(self.canvas, self.scale))
+
+    def present(self) -> None:
+        canvas = self.canvas
+        canvas_rect = canvas.get_rect()
+        dirty = merge_rects(self._prev_rects + self._rects)
+        dirty = [r.clip(canvas_rect) for r in dirty]
+        dirty = [r for r in dirty if r.width and r.height]
+        area = sum(r.width * r.height for r in dirty)
+        full = self._full or area > FULL_UPDATE_AREA * canvas_rect.width * canvas_rect.height
+        self._prev_rects = self._rects
+        self._full = False
+        ox, oy = self.view.topleft
+
+        if self.native:
+            # the canvas is part of the screen already
+            if full:
+                pygame.display.flip()
+            elif dirty:
+                pygame.display.update([r.move(ox, oy) for r in dirty])
+            return
+
+        scale = self.output_scale
+        if self.smooth or scale != int(scale):
+            # fractional / filtered scaling does not split cleanly into pieces
+            if full or dirty:
+                resize = pygame.transform.smoothscale if self.smooth else pygame.transform.scale
+                resize(canvas, self.view.size, self._scaled_view)
+                pygame.display.flip()
+            return
+
+        s = int(scale)
+        if full:
+            dirty = [canvas_rect]
+        screen_rects = []
+        for r in dirty:
+            dest = pygame.Rect(ox + r.x * s, oy + r.y * s, r.width * s, r.height * s)
+            if s == 1:
+                self.screen.blit(canvas, dest, r)
+            else:
+                pygame.transform.scale(canvas.subsurface(r), dest.size, self.screen.subsurface(dest))
+            screen_rects.append(dest)
+        if full:
+            pygame.display.flip()
+        elif screen_rects:
+            pygame.display.update(screen_rects)
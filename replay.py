@@ -0,0 +1,235 @@
+"""Input replays: seed + timestamped inputs, with optional keyframes for seeking.
+
+File layout (little-endian):
+    header    magic "RPLY", version u8, sim_hz u16, seed u64,
+              final_tick u32, final_score i64, keyframe_interval u32
+    inputs    count u32, then per input: varint tick delta, action u8
+    keyframes count u32, then per keyframe: tick u32, size u32, zlib data
+
+Keyframes are zlib-compressed core snapshots (snapshot.py) and are only
+read when seeking; `verify` re-simulates from the seed alone so a
+tampered keyframe cannot pass.
+
+Usage:
+    python replay.py verify replays/*.rpl
+    python replay.py info replays/run.rpl
+"""
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import time
+import zlib
+from dataclasses import dataclass, field
+
+from core import GameCore
+from settings import SIM_DT, REPLAY_DIR, REPLAY_KEYFRAME_INTERVAL
+
+MAGIC = b"RPLY"
+VERSION = 2
+_HEADER = struct.Struct("<4sBHQIqI")
+_U32 = struct.Struct("<I")
+
+
+class ReplayError(Exception):
+    pass
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def sim_hz() -> int:
+    return round(1.0 / SIM_DT)
+
+
+@dataclass
+class Replay:
+    seed: int
+    inputs: list[tuple[int, int]] = field(default_factory=list)  # (tick, core.Action), tick-ordered
+    final_tick: int = 0
+    final_score: int = 0
+    keyframe_interval: int = 0
+    keyframes: dict[int, bytes] = field(default_factory=dict)  # tick -> compressed core state
+    hz: int = field(default_factory=sim_hz)
+
+    @property
+    def duration(self) -> float:
+        return self.final_tick / self.hz
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(_HEADER.pack(MAGIC, VERSION, self.hz, self.seed, self.final_tick,
+                                     self.final_score, self.keyframe_interval))
+        out += _U32.pack(len(self.inputs))
+        last = 0
+        for tick, action in self.inputs:
+            write_varint(out, tick - last)
+            out.append(action)
+            last = tick
+        out += _U32.pack(len(self.keyframes))
+        for tick in sorted(self.keyframes):
+            blob = self.keyframes[tick]
+            out += _U32.pack(tick) + _U32.pack(len(blob)) + blob
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        try:
+            magic, version, hz, seed, final_tick, final_score, interval = _HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ReplayError("not a replay file (or unsupported version)")
+            pos = _HEADER.size
+            (count,) = _U32.unpack_from(data, pos)
+            pos += _U32.size
+            inputs = []
+            tick = 0
+            for _ in range(count):
+                delta, pos = read_varint(data, pos)
+                tick += delta
+                inputs.append((tick, data[pos]))
+                pos += 1
+            (count,) = _U32.unpack_from(data, pos)
+            pos += _U32.size
+            keyframes = {}
+            for _ in range(count):
+                (kf_tick,) = _U32.unpack_from(data, pos)
+                (size,) = _U32.unpack_from(data, pos + 4)
+                pos += 8
+                if pos + size > len(data):
+                    raise IndexError(f"keyframe at tick {kf_tick} cut short")
+                keyframes[kf_tick] = data[pos:pos + size]
+                pos += size
+        except (struct.error, IndexError) as e:
+            raise ReplayError(f"truncated replay: {e}") from None
+        return cls(seed, inputs, final_tick, final_score, interval, keyframes, hz)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def capture_keyframe(core: GameCore) -> bytes:
+    return zlib.compress(core.snapshot())
+
+
+def restore_keyframe(blob: bytes) -> GameCore:
+    return GameCore.from_snapshot(zlib.decompress(blob))
+
+
+class ReplayRecorder:
+    """Collects the inputs of one run; Game feeds it from its event dispatch."""
+
+    def __init__(self, seed: int, keyframe_seconds: float = REPLAY_KEYFRAME_INTERVAL) -> None:
+        self.replay = Replay(seed, keyframe_interval=int(keyframe_seconds * sim_hz()))
+
+    @classmethod
+    def resume(cls, replay: Replay) -> "ReplayRecorder":
+        """Keep recording into a replay saved mid-run (suspend file)."""
+        recorder = cls(replay.seed)
+        recorder.replay = replay
+        return recorder
+
+    def record(self, tick: int, action: int) -> None:
+        self.replay.inputs.append((tick, action))
+
+    def on_tick(self, core: GameCore) -> None:
+        """Call after each sim tick; grabs a keyframe every keyframe_interval ticks."""
+        interval = self.replay.keyframe_interval
+        if interval and core.tick % interval == 0:
+            self.replay.keyframes[core.tick] = capture_keyframe(core)
+
+    def finish(self, core: GameCore) -> Replay:
+        self.replay.final_tick = core.tick
+        self.replay.final_score = core.player.score
+        return self.replay
+
+
+def simulate(replay: Replay, until_tick: int | None = None, core: GameCore | None = None) -> GameCore:
+    """Re-run the replay headlessly up to `until_tick` (default: the end).
+
+    Continues from `core` if given (it must be at a tick of this replay),
+    otherwise starts from the seed.
+    """
+    if replay.hz != sim_hz():
+        raise ReplayError(f"replay recorded at {replay.hz} Hz, simulation runs at {sim_hz()} Hz")
+    end = replay.final_tick if until_tick is None else min(until_tick, replay.final_tick)
+    if core is None:
+        core = GameCore(replay.seed)
+    inputs = replay.inputs
+    i = 0
+    while i < len(inputs) and inputs[i][0] < core.tick:
+        i += 1
+    while core.tick < end and not core.game_over:
+        while i < len(inputs) and inputs[i][0] == core.tick:
+            core.apply_action(inputs[i][1])
+            i += 1
+        core.update(SIM_DT)
+    return core
+
+
+def seek(replay: Replay, tick: int) -> GameCore:
+    """State at `tick`, starting from the nearest keyframe at or before it."""
+    start = max((t for t in replay.keyframes if t <= tick), default=None)
+    core = restore_keyframe(replay.keyframes[start]) if start is not None else None
+    return simulate(replay, tick, core)
+
+
+def verify(replay: Replay) -> bool:
+    """True if re-simulating from the seed reproduces the recorded end tick and score."""
+    core = simulate(replay)
+    return core.tick == replay.final_tick and core.player.score == replay.final_score
+
+
+def replay_path(seed: int) -> str:
+    return os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{seed:016x}.rpl")
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) < 2 or argv[0] not in ("verify", "info"):
+        print(__doc__)
+        return 2
+    command, paths = argv[0], argv[1:]
+    failed = 0
+    for path in paths:
+        try:
+            replay = Replay.load(path)
+        except (OSError, ReplayError) as e:
+            print(f"{path}: {e}")
+            failed += 1
+            continue
+        if command == "info":
+            print(f"{path}: seed={replay.seed} ticks={replay.final_tick} ({replay.duration:.1f}s) "
+                  f"score={replay.final_score} inputs={len(replay.inputs)} keyframes={len(replay.keyframes)} "
+                  f"size={os.path.getsize(path)}B")
+            continue
+        start = time.perf_counter()
+        ok = verify(replay)
+        wall = time.perf_counter() - start
+        speed = replay.duration / wall if wall > 0 else float("inf")
+        print(f"{path}: {'OK' if ok else 'MISMATCH'} score={replay.final_score} ({speed:,.0f}x realtime)")
+        failed += not ok
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,497 @@
+"""Asyncio game server: many headless sessions on one fixed-rate scheduler, delta-compressed state.
+
+Each TCP connection gets its own session (a GameCore with a fresh seed).
+A single scheduler task ticks every session at SIM_DT and, every
+`send_every` ticks, sends each client its view of the game as a delta
+against the last view that client acknowledged.
+
+Messages are framed as u32 length + body. Integers are varints (signed
+ones zigzag-encoded). A client frame longer than SERVER_MAX_FRAME ends its
+session before the body is read.
+    client -> server
+        INPUT   type 1, action u8 (core.Action), applied at the next tick
+        ACK     type 2, seq varint of the last STATE received
+        RESTART type 3, starts a new run after game over
+    server -> client
+        WELCOME type 0, session id, seed, lane count, sim hz, position quantum
+        STATE   type 1, seq, base seq (0 = full state), tick,
+                player (lane, x, hp, ammo, score, coins, speed level, game over),
+                removed entity ids, then per new / moved entity: id, flag,
+                full record (kind, lane, aux, y) or the y delta
+
+Positions are quantized to SERVER_POS_QUANT pixels. Enemies, pickups,
+bullets and lasers sit on lane centres, so only their lane and y are
+sent. An entity whose quantized y did not change since the base view
+costs nothing. When a tick (sim + encoding) runs over budget, the quality
+governor lowers the send rate (every 2nd, 3rd, 4th tick) instead of
+slowing the simulation. Clients whose socket buffer is full are skipped
+that round. The next delta is still against what they acknowledged.
+
+Usage:
+    python server.py serve [--port 7777]
+    python server.py bench [--sessions 300] [--seconds 10] [--check]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import struct
+import sys
+import time
+from collections import deque
+
+from core import Action, GameCore
+from governor import QualityGovernor
+from profiler import percentile
+from replay import read_varint, sim_hz, write_varint
+from settings import (
+    SIM_DT,
+    MAX_CATCHUP_STEPS,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_BACKLOG,
+    SERVER_POS_QUANT,
+    SERVER_STATE_HISTORY,
+    SERVER_MAX_BUFFER,
+    SERVER_MAX_FRAME,
+    SERVER_METRICS_INTERVAL,
+)
+
+# message types
+WELCOME, STATE = 0, 1
+INPUT, ACK, RESTART = 1, 2, 3
+# entity kinds in a view
+ENEMY, PICKUP, PLAYER_BULLET, ENEMY_BULLET, LASER = range(5)
+# per-entity flag in a STATE delta
+_FULL, _MOVED = 0, 1
+
+_FRAME = struct.Struct("<I")
+
+
+def _zigzag(v: int) -> int:
+    return v << 1 if v >= 0 else ((-v) << 1) - 1
+
+
+def _unzigzag(v: int) -> int:
+    return v >> 1 if not v & 1 else -((v + 1) >> 1)
+
+
+def _q(value: float) -> int:
+    return round(value / SERVER_POS_QUANT)
+
+
+class Session:
+    """One client's game: the core, its queued inputs and the views sent to it."""
+
+    def __init__(self, session_id: int, writer: asyncio.StreamWriter | None, lane_count: int | None = None) -> None:
+        self.id = session_id
+        self.writer = writer
+        self.seed = random.SystemRandom().getrandbits(63)
+        self.core = GameCore(self.seed) if lane_count is None else GameCore(self.seed, lane_count)
+        self.inputs: deque[int] = deque()
+        self.seq = 0
+        # seq -> (player, entities) for views not yet superseded by an ack
+        self.sent: dict[int, tuple[tuple, dict]] = {}
+        self.acked = 0
+        self._net_ids: dict[int, int] = {}  # id(entity object) -> entity id on the wire
+        self._next_net_id = 1
+
+    def tick(self) -> None:
+        core = self.core
+        if core.game_over:
+            return
+        # one action per tick, like a replay; a burst of presses spreads over the next ticks
+        if self.inputs:
+            core.apply_action(self.inputs.popleft())
+        core.update(SIM_DT)
+
+    def restart(self) -> None:
+        self.seed = random.SystemRandom().getrandbits(63)
+        self.core.reset(self.seed)
+        self.inputs.clear()
+
+    def ack(self, seq: int) -> None:
+        if seq in self.sent and seq > self.acked:
+            self.acked = seq
+            # older views can no longer be a base
+            for old in [s for s in self.sent if s < seq]:
+                del self.sent[old]
+
+    # ===== views =====
+    def view(self) -> tuple[tuple, dict[int, tuple[int, int, int, int]]]:
+        """(player tuple, {entity id: (kind, lane, aux, y)}) of the current state, quantized."""
+        core = self.core
+        player = core.player
+        player_view = (player.lane_index, _q(player.current_x), player.hp, player.ammo, player.score,
+                       player.coins, core.spawner.speed_level, int(core.game_over))
+        old_ids = self._net_ids
+        ids: dict[int, int] = {}
+        entities: dict[int, tuple[int, int, int, int]] = {}
+
+        def net_id(obj) -> int:
+            # pooled objects keep their id() when reused; a reused one just shows up as a changed record
+            key = id(obj)
+            nid = old_ids.get(key)
+            if nid is None:
+                nid = self._next_net_id
+                self._next_net_id += 1
+            ids[key] = nid
+            return nid
+
+        for e in core.spawner.enemies:
+            entities[net_id(e)] = (ENEMY, e.lane_index, e.enemy_type, _q(e.y))
+        for p in core.spawner.pickups:
+            entities[net_id(p)] = (PICKUP, p.lane_index, p.pickup_type, _q(p.y))
+        for b in core.player_bullets:
+            entities[net_id(b)] = (PLAYER_BULLET, b.lane_index, 0, _q(b.y))
+        for b in core.enemy_bullets:
+            entities[net_id(b)] = (ENEMY_BULLET, b.lane_index, 0, _q(b.y))
+        for laser in core.lasers:
+            entities[net_id(laser)] = (LASER, laser.lane_index, 0, _q(laser.start_y))
+        self._net_ids = ids
+        return player_view, entities
+
+    def encode(self) -> bytes:
+        """STATE message for the current tick, as a delta against the last acknowledged view."""
+        player_view, entities = self.view()
+        self.seq += 1
+        base_seq = self.acked if self.acked in self.sent else 0
+        base = self.sent[base_seq][1] if base_seq else {}
+        body = encode_state(self.seq, base_seq, self.core.tick, player_view, entities, base)
+        self.sent[self.seq] = (player_view, entities)
+        if len(self.sent) > SERVER_STATE_HISTORY:
+            # the client stopped acking: forget the oldest, the next state falls back to full
+            oldest = min(self.sent)
+            del self.sent[oldest]
+            if oldest == self.acked:
+                self.acked = 0
+        return body
+
+
+def encode_state(seq: int, base_seq: int, tick: int, player_view: tuple,
+                 entities: dict[int, tuple], base: dict[int, tuple]) -> bytes:
+    out = bytearray([STATE])
+    write_varint(out, seq)
+    write_varint(out, base_seq)
+    write_varint(out, tick)
+    for value in player_view:
+        write_varint(out, value)
+    removed = [nid for nid in base if nid not in entities]
+    write_varint(out, len(removed))
+    for nid in removed:
+        write_varint(out, nid)
+    changes = bytearray()
+    count = 0
+    for nid, record in entities.items():
+        old = base.get(nid)
+        if old == record:
+            continue
+        count += 1
+        write_varint(changes, nid)
+        if old is not None and old[:3] == record[:3]:
+            changes.append(_MOVED)
+            write_varint(changes, _zigzag(record[3] - old[3]))
+        else:
+            changes.append(_FULL)
+            kind, lane, aux, y = record
+            changes.append(kind)
+            write_varint(changes, lane)
+            write_varint(changes, aux)
+            write_varint(changes, _zigzag(y))
+    write_varint(out, count)
+    out += changes
+    return bytes(out)
+
+
+class ClientView:
+    """Client side of STATE decoding: rebuilds each view from the acknowledged base."""
+
+    def __init__(self) -> None:
+        self.views: dict[int, tuple[tuple, dict]] = {}
+        self.seq = 0
+        self.tick = 0
+        self.player: tuple = ()
+        self.entities: dict[int, tuple[int, int, int, int]] = {}
+
+    def apply(self, body: bytes) -> int:
+        """Decode a STATE body; returns its seq (to ACK)."""
+        if body[0] != STATE:
+            raise ValueError(f"not a STATE message: type {body[0]}")
+        seq, pos = read_varint(body, 1)
+        base_seq, pos = read_varint(body, pos)
+        tick, pos = read_varint(body, pos)
+        player = []
+        for _ in range(8):
+            value, pos = read_varint(body, pos)
+            player.append(value)
+        entities = dict(self.views[base_seq][1]) if base_seq else {}
+        count, pos = read_varint(body, pos)
+        for _ in range(count):
+            nid, pos = read_varint(body, pos)
+            del entities[nid]
+        count, pos = read_varint(body, pos)
+        for _ in range(count):
+            nid, pos = read_varint(body, pos)
+            flag = body[pos]
+            pos += 1
+            if flag == _MOVED:
+                dy, pos = read_varint(body, pos)
+                kind, lane, aux, y = entities[nid]
+                entities[nid] = (kind, lane, aux, y + _unzigzag(dy))
+            else:
+                kind = body[pos]
+                lane, pos = read_varint(body, pos + 1)
+                aux, pos = read_varint(body, pos)
+                y, pos = read_varint(body, pos)
+                entities[nid] = (kind, lane, aux, _unzigzag(y))
+        self.seq, self.tick, self.player, self.entities = seq, tick, tuple(player), entities
+        self.views[seq] = (self.player, entities)
+        # the server only bases deltas on acked views; keep the same window it does
+        for old in [s for s in self.views if s <= seq - SERVER_STATE_HISTORY]:
+            del self.views[old]
+        return seq
+
+
+class FrameTooLarge(ConnectionError):
+    pass
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int | None = None) -> bytes:
+    (size,) = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+    if max_size is not None and size > max_size:
+        # refuse before buffering: the length prefix alone could ask for 4 GB
+        raise FrameTooLarge(f"frame of {size} bytes, limit {max_size}")
+    return await reader.readexactly(size)
+
+
+def frame(body: bytes) -> bytes:
+    return _FRAME.pack(len(body)) + body
+
+
+class GameServer:
+    def __init__(self, lane_count: int | None = None, metrics_interval: float = SERVER_METRICS_INTERVAL) -> None:
+        self.lane_count = lane_count
+        self.metrics_interval = metrics_interval
+        self.sessions: dict[int, Session] = {}
+        self._next_id = 1
+        self.tick = 0
+        # send-rate levels: 0 = every tick ... 3 = every 4th tick
+        self.governor = QualityGovernor(budget=SIM_DT, max_level=3)
+        self.tick_times: deque[float] = deque(maxlen=600)
+        self.bytes_sent = 0
+        self.ticks_run = 0
+        self.skipped_sends = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._scheduler: asyncio.Task | None = None
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def send_every(self) -> int:
+        return self.governor.level + 1
+
+    # ===== connections =====
+    async def start(self, host: str = SERVER_HOST, port: int = SERVER_PORT) -> int:
+        """Listen and start the scheduler; returns the bound port (pass 0 for any free one)."""
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=SERVER_BACKLOG)
+        self._scheduler = asyncio.create_task(self._run())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for session in list(self.sessions.values()):
+            session.writer.close()
+        # closing the transport ends each handler's read loop
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = Session(self._next_id, writer, self.lane_count)
+        self._next_id += 1
+        self.sessions[session.id] = session
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        welcome = bytearray([WELCOME])
+        for value in (session.id, session.seed, session.core.lane_system.lane_count, sim_hz(), SERVER_POS_QUANT):
+            write_varint(welcome, value)
+        writer.write(frame(bytes(welcome)))
+        try:
+            while True:
+                body = await read_frame(reader, SERVER_MAX_FRAME)
+                kind = body[0]
+                if kind == INPUT and len(body) > 1 and body[1] in _ACTIONS:
+                    session.inputs.append(body[1])
+                elif kind == ACK:
+                    session.ack(read_varint(body, 1)[0])
+                elif kind == RESTART and session.core.game_over:
+                    session.restart()
+        except (asyncio.IncompleteReadError, ConnectionError, IndexError):
+            pass
+        finally:
+            del self.sessions[session.id]
+            self._handlers.discard(task)
+            writer.close()
+
+    # ===== scheduler =====
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        last = loop.time()
+        accumulator = 0.0
+        next_metrics = last + self.metrics_interval
+        while True:
+            now = loop.time()
+            accumulator += now - last
+            last = now
+            steps = 0
+            while accumulator >= SIM_DT and steps < MAX_CATCHUP_STEPS:
+                self.step()
+                accumulator -= SIM_DT
+                steps += 1
+            if steps == MAX_CATCHUP_STEPS:
+                # the host cannot keep up even at the lowest send rate: drop the backlog
+                accumulator = min(accumulator, SIM_DT)
+            if self.metrics_interval and now >= next_metrics:
+                next_metrics = now + self.metrics_interval
+                print(json.dumps(self.metrics()), flush=True)
+            await asyncio.sleep(max(0.0, SIM_DT - accumulator))
+
+    def step(self) -> None:
+        """One shared tick: advance every session, then send states if this is a send tick."""
+        start = time.perf_counter()
+        sessions = list(self.sessions.values())
+        for session in sessions:
+            session.tick()
+        self.tick += 1
+        if self.tick % self.send_every == 0:
+            for session in sessions:
+                writer = session.writer
+                if writer.is_closing():
+                    continue  # disconnected, the handler drops it shortly
+                if writer.transport.get_write_buffer_size() > SERVER_MAX_BUFFER:
+                    # slow client: skip it this round, its next delta still covers everything
+                    self.skipped_sends += 1
+                    continue
+                data = frame(session.encode())
+                writer.write(data)
+                self.bytes_sent += len(data)
+        work = time.perf_counter() - start
+        self.tick_times.append(work)
+        self.ticks_run += 1
+        self.governor.end_frame(work)
+
+    def metrics(self) -> dict:
+        times = sorted(self.tick_times)
+        mean = sum(times) / len(times) if times else 0.0
+        load = mean / SIM_DT
+        sessions = len(self.sessions)
+        ticks = max(1, self.ticks_run)
+        return {
+            "sessions": sessions,
+            "tick_ms_p50": round(percentile(times, 50) * 1000, 3),
+            "tick_ms_p95": round(percentile(times, 95) * 1000, 3),
+            "load": round(load, 3),  # share of one core's tick budget in use
+            # sessions one core could hold at this per-session cost (one process = one core)
+            "sessions_per_core": round(sessions / load) if load > 0 else None,
+            "bytes_per_tick": round(self.bytes_sent / ticks, 1),
+            "bytes_per_session_tick": round(self.bytes_sent / ticks / sessions, 2) if sessions else 0.0,
+            "send_every": self.send_every,
+            "skipped_sends": self.skipped_sends,
+        }
+
+
+_ACTIONS = (Action.NOOP, Action.LEFT, Action.RIGHT, Action.SHOOT)
+
+
+# ===== test client / bench =====
+async def bot_client(port: int, seconds: float, server: GameServer | None = None, seed: int = 0) -> tuple[int, int]:
+    """Play random inputs for `seconds`, acking every state; (states, mismatches).
+
+    With `server` (same process), every decoded view is compared with what the server sent.
+    """
+    reader, writer = await asyncio.open_connection(SERVER_HOST, port)
+    welcome = await asyncio.wait_for(read_frame(reader), timeout=seconds)
+    session_id, _ = read_varint(welcome, 1)
+    rng = random.Random(seed)
+    view = ClientView()
+    states = mismatches = 0
+    loop = asyncio.get_running_loop()
+    end = loop.time() + seconds
+    try:
+        while loop.time() < end:
+            body = await asyncio.wait_for(read_frame(reader), timeout=max(0.01, end - loop.time()))
+            seq = view.apply(body)
+            states += 1
+            if server is not None:
+                session = server.sessions.get(session_id)
+                if session is not None and seq in session.sent and session.sent[seq] != (view.player, view.entities):
+                    mismatches += 1
+            ack = bytearray([ACK])
+            write_varint(ack, seq)
+            out = frame(bytes(ack))
+            if view.player[7]:
+                out += frame(bytes([RESTART]))
+            elif rng.random() < 0.05:
+                out += frame(bytes([INPUT, rng.randrange(4)]))
+            writer.write(out)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        writer.close()
+    return states, mismatches
+
+
+async def bench(sessions: int, seconds: float, check: bool) -> dict:
+    server = GameServer(metrics_interval=0)
+    port = await server.start(SERVER_HOST, 0)
+    clients = [asyncio.create_task(bot_client(port, seconds, server if check else None, seed=i))
+               for i in range(sessions)]
+    # sample while every client is still connected
+    await asyncio.sleep(seconds)
+    metrics = server.metrics()
+    results = await asyncio.gather(*clients)
+    await server.stop()
+    metrics["states_received"] = sum(r[0] for r in results)
+    if check:
+        metrics["mismatches"] = sum(r[1] for r in results)
+    return metrics
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Asyncio game server.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_p = sub.add_parser("serve", help="host sessions until interrupted")
+    serve_p.add_argument("--host", default=SERVER_HOST)
+    serve_p.add_argument("--port", type=int, default=SERVER_PORT)
+    serve_p.add_argument("--lanes", type=int, default=None, help="lanes per session (default: the 3-lane game)")
+    bench_p = sub.add_parser("bench", help="in-process server with bot clients, then print metrics")
+    bench_p.add_argument("--sessions", type=int, default=300)
+    bench_p.add_argument("--seconds", type=float, default=10.0)
+    bench_p.add_argument("--check", action="store_true", help="compare every decoded view with the server's")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        metrics = asyncio.run(bench(args.sessions, args.seconds, args.check))
+        metrics["cores"] = os.cpu_count()
+        print(json.dumps(metrics, indent=1))
+        return 1 if metrics.get("mismatches") else 0
+
+    async def serve() -> None:
+        server = GameServer(args.lanes)
+        port = await server.start(args.host, args.port)
+        print(f"listening on {args.host}:{port}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
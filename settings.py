@@ -4,7 +4,12 @@ WINDOW_TITLE = "3-Lane Runner - Pygame"
 
 FPS = 60
 
+# ===== Fixed-timestep simulation =====
+SIM_DT = 1.0 / FPS        # seconds per simulation tick, independent of render rate
+MAX_CATCHUP_STEPS = 5     # max sim ticks per rendered frame; a longer stall drops the backlog
+
 LANE_COUNT = 3
+ARENA_LANES = 48  # python main.py --arena: lanes as wide as the normal ones, camera follows the player
 
 PLAYER_WIDTH = 60
 PLAYER_HEIGHT = 100
@@ -13,6 +18,7 @@ PLAYER_START_HP = 3
 PLAYER_START_AMMO = 10
 PLAYER_SHOOT_COOLDOWN = 0.0  # seconds
 PLAYER_INVULN_TIME = 1.0  # seconds of invulnerability after being hit
+PLAYER_LANE_CHANGE_DURATION = 0.1  # seconds, visual smooth move between lanes
 
 OBSTACLE_COLOR = (220, 70, 70)  # legacy, not used for new enemies
 GIFT_SCORE_COLOR = (80, 200, 120)  # legacy
@@ -22,6 +28,8 @@ BACKGROUND_COLOR = (20, 20, 30)
 LANE_LINE_COLOR = (70, 70, 90)
 
 FONT_NAME = "consolas"
+TEXT_CACHE_SIZE = 64  # rendered HUD strings kept (LRU)
+FONT_CACHE_FILE = "font_cache.json"  # FONT_NAME -> font file, so system fonts are scanned once
 
 BASE_SCROLL_SPEED = 250  # pixels / second
 SPEED_INCREASE_INTERVAL = 10.0  # seconds
@@ -33,33 +41,14 @@ SPAWN_INTERVAL_DECAY = 0.02  # how fast spawn interval shrinks per speed level
 
 LANE_CHANGE_COOLDOWN = 0.12  # seconds
 
-# Enemy configuration
-ENEMY_NORMAL_COLOR = (70, 140, 230)   # blue
-ENEMY_LEVEL2_COLOR = (235, 210, 80)   # yellow
-ENEMY_SPECIAL_COLOR = (230, 70, 70)   # red
-
-ENEMY_NORMAL_HP = 1
-ENEMY_LEVEL2_HP = 2
-ENEMY_SPECIAL_HP = 3
-ENEMY_SHOOT_INTERVAL = 2.0  # base seconds between shots for level2 and special
+# Enemy configuration (per-type hp, speed, colors, shots, scores and spawn
+# weights live in ARCHETYPE_FILE)
+ARCHETYPE_FILE = "archetypes.json"
+ENEMY_SHOOT_INTERVAL = 2.0  # base seconds between shots for shooting enemies
 ENEMY_SHOOT_INTERVAL_MIN = 0.6
 ENEMY_SHOOT_INTERVAL_DECAY_PER_LEVEL = 0.15
 
-# First-shot delays (cooldown before the first shot after spawning)
-ENEMY_LEVEL2_FIRST_SHOT_DELAY = 0.7
-ENEMY_SPECIAL_FIRST_SHOT_DELAY = 1.5
-
-# Enemy speed multipliers (relative to BASE_SCROLL_SPEED)
-ENEMY_NORMAL_SPEED_MULT = 1.0
-ENEMY_LEVEL2_SPEED_MULT = 0.75
-ENEMY_SPECIAL_SPEED_MULT = 1.0
-
-# Enemy spawn probabilities (should sum to 1.0)
-ENEMY_NORMAL_PROB = 0.7
-ENEMY_LEVEL2_PROB = 0.2
-ENEMY_SPECIAL_PROB = 0.1
-
-# Limit of level2+special enemies per lane at the same time
+# Limit of shooting (elite) enemies per lane at the same time
 MAX_ELITE_PER_LANE = 1
 
 # Projectiles
@@ -68,27 +57,58 @@ ENEMY_BULLET_SPEED = 380    # downwards
 LASER_DURATION = 0.4        # seconds laser stays active
 
 # Pickups
-PICKUP_AMMO_COLOR = (80, 160, 255)  # blue circle
-PICKUP_HP_COLOR = (80, 220, 140)    # green circle
-PICKUP_COIN_COLOR = (240, 215, 80)  # yellow circle (money)
 PICKUP_RADIUS = 14
-PICKUP_AMMO_AMOUNT = 5
-PICKUP_HP_AMOUNT = 1
-
-# Pickup spawn configuration
 PICKUP_SPAWN_CHANCE = 0.35  # overall chance to spawn any pickup per enemy
-# Probabilities inside pickup spawn (should sum to 1.0)
-PICKUP_AMMO_PROB = 0.4
-PICKUP_HP_PROB = 0.2
-PICKUP_COIN_PROB = 0.6
-
-# Coin reward
-PICKUP_COIN_SCORE = 15
 
 HIGHSCORE_FILE = "highscore.json"
+HISTORY_DIR = "history"        # every finished run, columnar (python history.py top)
+HISTORY_COMPACT_EVERY = 1000   # rebuild the score index after this many new runs
+SUSPEND_FILE = "suspend.bin"   # unfinished run saved on quit, continued on the next start
+
+# ===== Sound effects =====
+SFX_DIR = "assets/sfx"    # <effect>.wav overrides the built-in synthesized sound
+SFX_CHANNELS = 12         # mixer voices for effects; a new sound steals the least important one
+SFX_VOLUME = 0.6          # 0.0 -> 1.0, on top of each effect's own volume
+
+# ===== Training environment (env.py) =====
+ENV_GRID_ROWS = 24        # distance buckets from the top of the screen down to the player
+ENV_PIXEL_SCALE = 0.25    # pixel observations are drawn at this fraction of the window size
+ENV_HIT_PENALTY = 300     # reward lost per HP lost
+
+# ===== Game server (server.py) =====
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7777
+SERVER_BACKLOG = 1024          # pending connections; a burst of joins beyond it waits on SYN retries
+SERVER_POS_QUANT = 2           # pixels per position step on the wire
+SERVER_STATE_HISTORY = 64      # sent states kept as delta bases; a client further behind gets a full state
+SERVER_MAX_BUFFER = 64 * 1024  # unsent bytes at which a slow client is skipped for a round
+SERVER_MAX_FRAME = 64          # largest client message body; a longer length prefix drops the connection
+SERVER_METRICS_INTERVAL = 5.0  # seconds between metrics lines while serving (0 = off)
+
+# ===== Replays =====
+REPLAY_DIR = "replays"           # every finished run is saved here
+REPLAY_KEYFRAME_INTERVAL = 30.0  # seconds between full-state keyframes (0 = none)
+
+# ===== Profiler (F3 overlay, F4 export) =====
+PROFILER_FRAMES = 600            # frames kept for percentiles / the graph
+PROFILER_TRACE_EVENTS = 200_000  # timed events kept for the Chrome trace export
+PROFILE_DIR = "profiles"
 
 
 # ===== Display scaling (zoom whole game) =====
 SCREEN_SCALE = 1          # 1 = bình thường, 2 = phóng to 2x, 3 = 3x...
 START_FULLSCREEN = False  # True để vào fullscreen luôn
 SMOOTH_SCALE = False      # True = mượt nhưng hơi blur, False = nét (hợp pixel art)
+# "native" = draw straight at window resolution, "scaled" = draw at base size and scale the changed parts up,
+# "auto" = native only where scaled would resize the whole frame (SMOOTH_SCALE or non-integer fullscreen zoom)
+RENDER_MODE = "auto"
+SPRITE_CACHE_SIZE = 32    # scaled sprite copies kept (LRU), enough for ~4 zoom levels
+
+# ===== Adaptive quality (governor.py) =====
+GOVERNOR_ENABLED = True
+GOVERNOR_WINDOW = 30            # frames averaged per decision
+GOVERNOR_DOWN = 0.9             # mean work above this share of the frame budget -> lower quality
+GOVERNOR_UP = 0.6               # ... below this share for GOVERNOR_UP_FRAMES -> raise it again
+GOVERNOR_UP_FRAMES = 180
+GOVERNOR_UP_FRAMES_MAX = 3600   # the wait doubles up to this when a restored level fails again
+GOVERNOR_DRAW_DISTANCE = 480    # "near only" level: sprites farther above the player are not drawn
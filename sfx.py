@@ -0,0 +1,193 @@
+"""Sound effects: samples decoded once up front, played on a fixed pool of mixer channels.
+
+`Sfx.load()` runs next to the music on the background mixer thread. It
+decodes `SFX_DIR/<effect>.wav` when present and synthesizes a short
+tone otherwise, so no file is ever read or decoded while playing. Until
+loading finishes, and when there is no audio device, `play()` does
+nothing. `play()` itself is cheap enough for `Game.update`: a dict
+lookup, a per-effect rate limit, and one `Channel.play` on a voice from
+the pool. When every voice is busy, the sound with the lowest priority
+(oldest first) is cut, unless the new one matters even less.
+"""
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+import pygame
+
+from core import Event
+from settings import SFX_DIR, SFX_CHANNELS, SFX_VOLUME
+
+
+class Effect:
+    __slots__ = ("name", "priority", "min_interval", "volume")
+
+    def __init__(self, name: str, priority: int, min_interval: float, volume: float) -> None:
+        self.name = name
+        self.priority = priority          # higher steals lower when the pool is full
+        self.min_interval = min_interval  # seconds; repeats sooner than this are dropped
+        self.volume = volume
+
+
+EFFECTS = {e.name: e for e in (
+    Effect("shot", 1, 0.05, 0.5),
+    Effect("enemy_shot", 0, 0.08, 0.3),
+    Effect("hit", 1, 0.04, 0.5),
+    Effect("kill", 2, 0.05, 0.7),
+    Effect("pickup", 2, 0.05, 0.6),
+    Effect("laser_charge", 3, 0.15, 0.5),
+    Effect("player_hit", 4, 0.10, 0.8),
+    Effect("game_over", 5, 1.00, 0.9),
+)}
+
+# core.Event code -> effect name
+EVENT_SOUNDS = {
+    Event.SHOT: "shot",
+    Event.ENEMY_SHOT: "enemy_shot",
+    Event.LASER: "laser_charge",
+    Event.ENEMY_HIT: "hit",
+    Event.ENEMY_KILLED: "kill",
+    Event.PICKUP: "pickup",
+    Event.PLAYER_HIT: "player_hit",
+    Event.GAME_OVER: "game_over",
+}
+
+
+# ===== built-in sounds (mono float waveforms in [-1, 1]) =====
+def _sweep(t: np.ndarray, f0: float, f1: float) -> np.ndarray:
+    # phase of a linear frequency sweep f0 -> f1 over the length of t
+    dur = t[-1] if len(t) > 1 else 1.0
+    return 2 * np.pi * (f0 * t + (f1 - f0) * t * t / (2 * dur))
+
+
+def _square(phase: np.ndarray) -> np.ndarray:
+    return np.sign(np.sin(phase))
+
+
+def _tone(freq: int, secs: float, kind: str) -> np.ndarray:
+    t = np.arange(int(freq * secs)) / freq
+    fade = np.linspace(1.0, 0.0, len(t))
+    noise = np.random.default_rng(7).uniform(-1.0, 1.0, len(t))
+    if kind == "shot":
+        wave = _square(_sweep(t, 1400, 500)) * fade ** 2
+    elif kind == "enemy_shot":
+        wave = _square(_sweep(t, 520, 260)) * fade ** 2
+    elif kind == "hit":
+        wave = noise * fade ** 3
+    elif kind == "kill":
+        wave = (0.6 * noise + 0.4 * _square(_sweep(t, 220, 55))) * fade ** 2
+    elif kind == "pickup":
+        # two rising notes
+        wave = np.sin(2 * np.pi * np.where(t < secs / 2, 660, 990) * t) * fade
+    elif kind == "laser_charge":
+        wave = np.sin(_sweep(t, 180, 1200)) * np.linspace(0.3, 1.0, len(t))
+    elif kind == "player_hit":
+        wave = _square(_sweep(t, 240, 70)) * fade
+    else:  # game_over: three falling notes
+        notes = np.select([t < secs / 3, t < 2 * secs / 3], [392, 330], 262)
+        wave = _square(2 * np.pi * notes * t) * fade
+    return wave
+
+
+_SYNTH_SECS = {"shot": 0.07, "enemy_shot": 0.08, "hit": 0.05, "kill": 0.18, "pickup": 0.14,
+               "laser_charge": 0.4, "player_hit": 0.22, "game_over": 0.9}
+
+
+def _to_sound(wave: np.ndarray) -> pygame.mixer.Sound:
+    """Convert a float waveform to a Sound in the mixer's own sample format."""
+    _, size, channels = pygame.mixer.get_init()
+    wave = np.clip(wave, -1.0, 1.0) * 0.8
+    if size == 32:
+        samples = wave.astype(np.float32)
+    else:
+        bits = abs(size)
+        peak = 2 ** (bits - 1) - 1
+        samples = (wave * peak).astype(np.int16 if bits == 16 else np.int8)
+        if size > 0:  # unsigned formats are offset by half the range
+            samples = (samples.astype(np.int32) + peak + 1).astype(np.uint16 if bits == 16 else np.uint8)
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return pygame.sndarray.make_sound(np.ascontiguousarray(samples))
+
+
+class Sfx:
+    def __init__(self, channels: int = SFX_CHANNELS, volume: float = SFX_VOLUME) -> None:
+        self.channel_count = channels
+        self.volume = volume
+        # both set at the end of load(); None = not ready (or no audio device)
+        self._sounds: dict[str, pygame.mixer.Sound] | None = None
+        self._channels: list[pygame.mixer.Channel] = []
+        # per voice: priority and start time of what it is playing
+        self._voice_priority: list[int] = []
+        self._voice_started: list[float] = []
+        self._last_played: dict[str, float] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self._sounds is not None
+
+    def load(self) -> None:
+        """Decode / synthesize every effect; call after pygame.mixer.init(), off the game thread."""
+        if not pygame.mixer.get_init():
+            return
+        freq = pygame.mixer.get_init()[0]
+        base = os.path.join(os.path.dirname(__file__), SFX_DIR)
+        sounds = {}
+        for name, effect in EFFECTS.items():
+            path = os.path.join(base, name + ".wav")
+            try:
+                sound = pygame.mixer.Sound(path) if os.path.exists(path) else None
+            except pygame.error as e:
+                print(f"[WARN] Cannot load {path}: {e}")
+                sound = None
+            if sound is None:
+                sound = _to_sound(_tone(freq, _SYNTH_SECS[name], name))
+            sound.set_volume(effect.volume * self.volume)
+            sounds[name] = sound
+        pygame.mixer.set_num_channels(self.channel_count)
+        self._channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self._voice_priority = [0] * self.channel_count
+        self._voice_started = [0.0] * self.channel_count
+        # published last: the game thread starts playing once this is set
+        self._sounds = sounds
+
+    def play(self, name: str, now: float | None = None) -> bool:
+        """Start effect `name` unless rate-limited or outranked; True if it plays."""
+        sounds = self._sounds
+        if sounds is None:
+            return False
+        effect = EFFECTS[name]
+        if now is None:
+            now = time.perf_counter()
+        if now - self._last_played.get(name, -1e9) < effect.min_interval:
+            return False
+
+        voice = -1
+        for i, channel in enumerate(self._channels):
+            if not channel.get_busy():
+                voice = i
+                break
+        if voice < 0:
+            # steal: lowest priority, then oldest
+            voice = min(range(len(self._channels)),
+                        key=lambda i: (self._voice_priority[i], self._voice_started[i]))
+            if self._voice_priority[voice] > effect.priority:
+                return False
+
+        self._channels[voice].play(sounds[name])
+        self._voice_priority[voice] = effect.priority
+        self._voice_started[voice] = now
+        self._last_played[name] = now
+        return True
+
+    def play_events(self, events: list[int]) -> None:
+        """Play the sounds for a batch of core.Event codes; repeats in one batch play once."""
+        if self._sounds is None or not events:
+            return
+        now = time.perf_counter()
+        # most important first, so a full pool keeps those
+        names = sorted({EVENT_SOUNDS[code] for code in events}, key=lambda n: -EFFECTS[n].priority)
+        for name in names:
+            self.play(name, now)
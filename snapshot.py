@@ -0,0 +1,280 @@
+"""Full GameCore state as packed binary, for lookahead search, suspend/resume and replay keyframes.
+
+Layout (little-endian, fixed-size records from `struct`):
+    header    magic "SNAP", version u8, lane_count u32
+    core      tick, elapsed, speed timer, game_over, death cause
+    rng       the 625 words of the Mersenne Twister state + gauss_next
+    player    every PlayerCar field that changes, private timers included
+    spawner   spawn timer / interval, speed level, shoot interval, spawn counter,
+              then the entity counts
+    entities  enemies (lane-index order), pickups (lane-index order),
+              player bullets, enemy bullets, lasers (list order)
+
+Only state is stored; sizes, sprites and colours that follow from the
+archetype are rebuilt on restore. Enemies and pickups are written in
+their lane-index order with their position in the spawner list, so both
+orders come back exactly and a restored core continues bit for bit like
+the original.
+"""
+from __future__ import annotations
+
+import math
+import struct
+from operator import itemgetter
+
+from archetypes import ENEMIES, PICKUPS
+from entities import Bullet, Enemy, LaserBeam, Pickup
+from storage import write_atomic
+
+MAGIC = b"SNAP"
+VERSION = 1
+# GameCore.death_cause <-> u8
+CAUSES = (None, "enemy", "bullet", "laser")
+# a lane count beyond this is a corrupt header, not a wide arena (bench uses 1000)
+MAX_LANES = 4096
+
+_HEADER = struct.Struct("<4sBI")
+_CORE = struct.Struct("<QddBB")
+_RNG = struct.Struct("<625I")
+_GAUSS = struct.Struct("<d?")
+_PLAYER = struct.Struct("<iiqii9d")
+_SPAWNER = struct.Struct("<ddidq5I")
+_ENEMY = struct.Struct("<IddddHiqddd?dI")
+_PICKUP = struct.Struct("<IddddHI")
+_BULLET = struct.Struct("<Iddddi??3B")
+_LASER = struct.Struct("<Iddi3Bdd")
+_SIZE = struct.Struct("<I")
+# record fields checked before a restore
+_LANE, _TYPE, _POS = itemgetter(0), itemgetter(5), itemgetter(-1)
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def pack(core) -> bytes:
+    """Pack the whole run state of `core` (a GameCore)."""
+    player = core.player
+    spawner = core.spawner
+    enemies = spawner.enemies
+    pickups = spawner.pickups
+    version, words, gauss = core.rng.getstate()
+
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, core.lane_system.lane_count),
+        _CORE.pack(core.tick, core.elapsed, core.time_accum_for_speed, core.game_over,
+                   CAUSES.index(core.death_cause)),
+        _RNG.pack(*words),
+        _GAUSS.pack(0.0 if gauss is None else gauss, gauss is not None),
+        _PLAYER.pack(player.lane_index, player.hp, player.score, player.coins, player.ammo,
+                     player.last_lane_change_time, player.lane_change_duration, player.current_x,
+                     player.target_x, player.prev_x, player._lane_change_elapsed, player._lane_change_start_x,
+                     player._shoot_cooldown_timer, player.invuln_timer),
+        _SPAWNER.pack(spawner.time_since_last_spawn, spawner.spawn_interval, spawner.speed_level,
+                      spawner.current_shoot_interval, spawner._spawn_count, len(enemies), len(pickups),
+                      len(core.player_bullets), len(core.enemy_bullets), len(core.lasers)),
+    ]
+    pos = {id(e): i for i, e in enumerate(enemies)}
+    put = _ENEMY.pack
+    for lane in spawner.enemy_index.lanes:
+        for e in lane:
+            interval = e.shoot_interval
+            parts.append(put(e.lane_index, e.x, e.y, e.prev_y, e.speed, e.enemy_type, e.hp, e.spawn_id,
+                              math.nan if interval is None else interval, e.first_shot_delay,
+                              e._time_since_shot, e._has_shot_once, e.channel_timer, pos[id(e)]))
+    pos = {id(p): i for i, p in enumerate(pickups)}
+    put = _PICKUP.pack
+    for lane in spawner.pickup_index.lanes:
+        for p in lane:
+            parts.append(put(p.lane_index, p.x, p.y, p.prev_y, p.speed, p.pickup_type, pos[id(p)]))
+    put = _BULLET.pack
+    for bullets in (core.player_bullets, core.enemy_bullets):
+        for b in bullets:
+            parts.append(put(b.lane_index, b.x, b.y, b.prev_y, b.speed, b.damage, b.from_player, b.is_circle,
+                              *b.color))
+    put = _LASER.pack
+    for laser in core.lasers:
+        parts.append(put(laser.lane_index, laser.x, laser.start_y, laser.width, *laser.color,
+                          laser.duration, laser.elapsed))
+    return b"".join(parts)
+
+
+def save(path: str, core, extra: bytes = b"") -> None:
+    """Write `core`'s snapshot to `path` atomically, followed by caller data (e.g. the run's replay so far)."""
+    data = pack(core)
+    write_atomic(path, _SIZE.pack(len(data)) + data + extra)
+
+
+def load(path: str) -> tuple[bytes, bytes]:
+    """(snapshot, extra) from a file written by `save()`."""
+    with open(path, "rb") as f:
+        blob = f.read()
+    try:
+        (size,) = _SIZE.unpack_from(blob, 0)
+    except struct.error:
+        raise SnapshotError(f"{path}: truncated") from None
+    data = blob[_SIZE.size:_SIZE.size + size]
+    if len(data) != size:
+        raise SnapshotError(f"{path}: truncated")
+    return data, blob[_SIZE.size + size:]
+
+
+def lane_count(data: bytes) -> int:
+    """Lane count a snapshot was taken with (to build a matching GameCore)."""
+    try:
+        magic, version, lanes = _HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise SnapshotError("truncated snapshot") from None
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError("not a snapshot (or unsupported version)")
+    if not 1 <= lanes <= MAX_LANES:
+        raise SnapshotError(f"bad lane count {lanes}")
+    return lanes
+
+
+def unpack_into(core, data: bytes) -> None:
+    """Overwrite `core` with a snapshot taken by `pack()`; its lane count must match.
+
+    The whole snapshot is parsed and checked before `core` is touched, so a
+    corrupt one raises SnapshotError and leaves the core as it was.
+    """
+    lanes = lane_count(data)
+    if lanes != core.lane_system.lane_count:
+        raise SnapshotError(f"snapshot has {lanes} lanes, core has {core.lane_system.lane_count}")
+    try:
+        state = _parse(memoryview(data), lanes)
+    except (struct.error, IndexError, ValueError, TypeError) as e:
+        raise SnapshotError(f"corrupt snapshot: {e}") from None
+    _apply(core, state)
+
+
+def _records(data: memoryview, offset: int, record: struct.Struct, count: int) -> list[tuple]:
+    end = offset + count * record.size
+    if end > len(data):
+        raise ValueError("truncated entity records")
+    return list(record.iter_unpack(data[offset:end]))
+
+
+def _parse(data: memoryview, lanes: int) -> tuple:
+    """Every field of a snapshot, checked; nothing is applied yet."""
+    offset = _HEADER.size
+    core_fields = _CORE.unpack_from(data, offset)
+    offset += _CORE.size
+    words = _RNG.unpack_from(data, offset)
+    offset += _RNG.size
+    gauss, has_gauss = _GAUSS.unpack_from(data, offset)
+    offset += _GAUSS.size
+    if words[-1] > 624:
+        # the Mersenne Twister position; Random.setstate() would reject it
+        raise ValueError("bad RNG state")
+    rng_state = (3, words, gauss if has_gauss else None)
+    player_fields = _PLAYER.unpack_from(data, offset)
+    offset += _PLAYER.size
+    spawner_fields = _SPAWNER.unpack_from(data, offset)
+    offset += _SPAWNER.size
+    n_enemies, n_pickups, n_player_bullets, n_enemy_bullets, n_lasers = spawner_fields[5:]
+
+    if core_fields[4] >= len(CAUSES):
+        raise ValueError(f"unknown death cause {core_fields[4]}")
+    if not 0 <= player_fields[0] < lanes:
+        raise ValueError(f"player lane {player_fields[0]} out of range")
+
+    enemies = _records(data, offset, _ENEMY, n_enemies)
+    offset += n_enemies * _ENEMY.size
+    pickups = _records(data, offset, _PICKUP, n_pickups)
+    offset += n_pickups * _PICKUP.size
+    player_bullets = _records(data, offset, _BULLET, n_player_bullets)
+    offset += n_player_bullets * _BULLET.size
+    enemy_bullets = _records(data, offset, _BULLET, n_enemy_bullets)
+    offset += n_enemy_bullets * _BULLET.size
+    lasers = _records(data, offset, _LASER, n_lasers)
+    offset += n_lasers * _LASER.size
+    if offset != len(data):
+        raise ValueError(f"{len(data) - offset} trailing bytes")
+
+    for records, types, what in ((enemies, len(ENEMIES), "enemy"), (pickups, len(PICKUPS), "pickup")):
+        if records:
+            record_lanes = list(map(_LANE, records))
+            # stored in lane-index order, each with its spawner list position (0..n-1, once each)
+            if record_lanes[0] < 0 or record_lanes[-1] >= lanes or record_lanes != sorted(record_lanes):
+                raise ValueError(f"{what} records: bad lanes")
+            if max(map(_TYPE, records)) >= types:
+                raise ValueError(f"{what} records: unknown type")
+            positions = set(map(_POS, records))
+            if len(positions) != len(records) or min(positions) < 0 or max(positions) >= len(records):
+                raise ValueError(f"{what} records: bad list positions")
+    for records in (player_bullets, enemy_bullets, lasers):
+        if records and (min(map(_LANE, records)) < 0 or max(map(_LANE, records)) >= lanes):
+            raise ValueError("projectile lane out of range")
+    return (core_fields, rng_state, player_fields, spawner_fields[:5],
+            enemies, pickups, player_bullets, enemy_bullets, lasers)
+
+
+def _apply(core, state: tuple) -> None:
+    (core_fields, rng_state, player_fields, spawner_fields,
+     enemies, pickups, player_bullets, enemy_bullets, lasers) = state
+    tick, elapsed, speed_timer, game_over, cause = core_fields
+
+    # the state we replace goes back to the pools first
+    core.reset()
+    core.tick = tick
+    core.elapsed = elapsed
+    core.time_accum_for_speed = speed_timer
+    core.game_over = bool(game_over)
+    core.death_cause = CAUSES[cause]
+    core.rng.setstate(rng_state)
+
+    player = core.player
+    (player.lane_index, player.hp, player.score, player.coins, player.ammo,
+     player.last_lane_change_time, player.lane_change_duration, player.current_x,
+     player.target_x, player.prev_x, player._lane_change_elapsed, player._lane_change_start_x,
+     player._shoot_cooldown_timer, player.invuln_timer) = player_fields
+
+    spawner = core.spawner
+    (spawner.time_since_last_spawn, spawner.spawn_interval, spawner.speed_level,
+     spawner.current_shoot_interval, spawner._spawn_count) = spawner_fields
+
+    in_order = [None] * len(enemies)
+    index = spawner.enemy_index
+    for (lane, x, y, prev_y, speed, enemy_type, hp, spawn_id, interval, first_delay,
+         since_shot, has_shot, channel, pos) in enemies:
+        e = Enemy.acquire(lane, x, y, 0.0, enemy_type)
+        e.prev_y = prev_y
+        e.speed = speed
+        e.hp = hp
+        e.spawn_id = spawn_id
+        e.shoot_interval = None if math.isnan(interval) else interval
+        e.first_shot_delay = first_delay
+        e._time_since_shot = since_shot
+        e._has_shot_once = has_shot
+        e.channel_timer = channel
+        in_order[pos] = e
+        # already in lane-index order: append instead of insort
+        index.lanes[lane].append(e)
+        if e.arch.elite:
+            index.elite_count[lane] += 1
+    spawner.enemies[:] = in_order
+
+    in_order = [None] * len(pickups)
+    index = spawner.pickup_index
+    for lane, x, y, prev_y, speed, pickup_type, pos in pickups:
+        p = Pickup.acquire(lane, x, y, 0.0, pickup_type)
+        p.prev_y = prev_y
+        p.speed = speed
+        in_order[pos] = p
+        index.lanes[lane].append(p)
+    spawner.pickups[:] = in_order
+
+    for bullets, records in ((core.player_bullets, player_bullets), (core.enemy_bullets, enemy_bullets)):
+        for lane, x, y, prev_y, speed, damage, from_player, is_circle, r, g, b in records:
+            bullet = Bullet.acquire(lane, x, y, from_player, is_circle, (r, g, b))
+            bullet.prev_y = prev_y
+            bullet.speed = speed
+            bullet.damage = damage
+            bullets.append(bullet)
+
+    for lane, x, start_y, width, r, g, b, duration, laser_elapsed in lasers:
+        laser = LaserBeam.acquire(lane, x, start_y, width, (r, g, b))
+        laser.duration = duration
+        laser.elapsed = laser_elapsed
+        core.lasers.append(laser)
@@ -0,0 +1,228 @@
+"""Soak test: play thousands of runs back to back and check that nothing grows.
+
+A scripted player (bots.dodge_policy) drives the real Game on the dummy
+video driver, one sim tick per rendered frame, and restarts right after
+each game over like a kiosk user pressing ENTER (runs longer than
+--max-run are restarted too, since the bot rarely dies). Every --sample-every
+simulated seconds it records RSS, live entities, pool and cache sizes,
+gc-tracked objects and frame-time percentiles. After warm-up the first
+sample is the baseline; the run fails (exit 1) if RSS, object count or
+frame time grow past the budgets, or a cache outgrows its bound.
+
+Usage:
+    python soak.py --hours 2 --min-resets 2000
+    python soak.py --minutes 10 --tracemalloc --json soak.json
+    python soak.py --headless --hours 24        # core only, no rendering
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import entities  # noqa: E402
+from bots import dodge_policy  # noqa: E402
+from core import GameCore  # noqa: E402
+from entities import Bullet, Enemy, LaserBeam, Pickup  # noqa: E402
+from profiler import percentile  # noqa: E402
+from settings import SIM_DT, SPRITE_CACHE_SIZE, TEXT_CACHE_SIZE  # noqa: E402
+
+_POOLED = (Enemy, Pickup, Bullet, LaserBeam)
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Soak:
+    def __init__(self, seed: int, headless: bool, max_run_ticks: int) -> None:
+        self.headless = headless
+        self.max_run_ticks = max_run_ticks
+        if headless:
+            self.game = None
+            self.core = GameCore(seed)
+        else:
+            from game import Game
+            self.game = Game(save_replays=False)
+            self.game.start_run()
+            self.core = self.game.core
+        self.resets = 0
+        self.ticks = 0
+
+    def frame(self) -> float:
+        """One frame of play (input, one sim tick, draw); returns its wall time."""
+        start = time.perf_counter()
+        core = self.core
+        action = dodge_policy(core)
+        give_up = core.tick >= self.max_run_ticks
+        if self.game is None:
+            core.step(action)
+            if core.game_over or give_up:
+                core.reset()
+                self.resets += 1
+        else:
+            game = self.game
+            if action:
+                game.handle_action(action)
+            game.update(SIM_DT)
+            game.draw(1.0)
+            if game.game_over or give_up:
+                game.draw(1.0)  # the game-over screen
+                game.reset()
+                self.resets += 1
+        self.ticks += 1
+        return time.perf_counter() - start
+
+    def sample(self, frame_times: list[float]) -> dict:
+        core = self.core
+        spawner = core.spawner
+        times = sorted(frame_times)
+        s = {
+            "sim_hours": self.ticks * SIM_DT / 3600,
+            "resets": self.resets,
+            "rss_mb": rss_bytes() / 2**20,
+            "gc_objects": len(gc.get_objects()),
+            "entities": {
+                "enemies": len(spawner.enemies),
+                "pickups": len(spawner.pickups),
+                "player_bullets": len(core.player_bullets),
+                "enemy_bullets": len(core.enemy_bullets),
+                "lasers": len(core.lasers),
+            },
+            "pools": {cls.__name__: {"free": len(cls._free), "created": cls.created} for cls in _POOLED},
+            "caches": {
+                "sprites_scaled": len(entities._SCALED_SPRITES),
+                "load_sprite": len(entities._ASSET_CACHE),
+            },
+            "frame_ms": {
+                "p50": percentile(times, 50) * 1000,
+                "p95": percentile(times, 95) * 1000,
+                "p99": percentile(times, 99) * 1000,
+            },
+        }
+        if self.game is not None:
+            s["caches"]["hud_text"] = len(self.game.hud.text_cache._items)
+            s["caches"]["layers"] = len(self.game.compositor.layers)
+        return s
+
+
+def check(baseline: dict, samples: list[dict], args) -> list[str]:
+    """Budget violations between the baseline and the end of the run."""
+    failures = []
+    tail = samples[-3:]
+    rss_growth = max(s["rss_mb"] for s in tail) - baseline["rss_mb"]
+    if rss_growth > args.max_rss_growth:
+        failures.append(f"RSS grew {rss_growth:.1f} MB (budget {args.max_rss_growth} MB)")
+    obj_growth = min(s["gc_objects"] for s in tail) - baseline["gc_objects"]
+    if obj_growth > args.max_object_growth:
+        failures.append(f"gc-tracked objects grew by {obj_growth} (budget {args.max_object_growth})")
+    base_p50 = baseline["frame_ms"]["p50"]
+    end_p50 = statistics.median(s["frame_ms"]["p50"] for s in tail)
+    if base_p50 > 0 and end_p50 / base_p50 - 1 > args.max_frame_drift:
+        failures.append(f"median frame time drifted {base_p50:.3f} -> {end_p50:.3f} ms "
+                        f"(budget +{args.max_frame_drift:.0%})")
+    bounds = {"sprites_scaled": SPRITE_CACHE_SIZE, "load_sprite": SPRITE_CACHE_SIZE, "hud_text": TEXT_CACHE_SIZE}
+    last = samples[-1]
+    for name, size in last["caches"].items():
+        if name in bounds and size > bounds[name]:
+            failures.append(f"cache {name} holds {size} entries (bound {bounds[name]})")
+    for name, pool in last["pools"].items():
+        grown = pool["created"] - baseline["pools"][name]["created"]
+        if grown > args.max_pool_growth:
+            failures.append(f"{name} pool created {grown} new objects after warm-up (budget {args.max_pool_growth})")
+    return failures
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Soak test: many runs back to back, watching for growth.")
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument("--hours", type=float, help="simulated hours to play")
+    length.add_argument("--minutes", type=float, help="simulated minutes to play")
+    parser.add_argument("--min-resets", type=int, default=0, help="keep playing until this many game overs")
+    parser.add_argument("--max-run", type=float, default=30.0, help="restart runs longer than this (simulated s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sample-every", type=float, default=300.0, help="simulated seconds between samples")
+    parser.add_argument("--warmup", type=float, default=600.0, help="simulated seconds before the baseline sample")
+    parser.add_argument("--headless", action="store_true", help="drive GameCore only, no rendering")
+    parser.add_argument("--tracemalloc", action="store_true", help="track top allocators (slows the run)")
+    parser.add_argument("--max-rss-growth", type=float, default=16.0, help="MB")
+    parser.add_argument("--max-object-growth", type=int, default=5000)
+    parser.add_argument("--max-frame-drift", type=float, default=0.5, help="fraction of baseline p50")
+    parser.add_argument("--max-pool-growth", type=int, default=200, help="new pooled objects after warm-up")
+    parser.add_argument("--json", help="write all samples here")
+    args = parser.parse_args(argv)
+    sim_seconds = args.hours * 3600 if args.hours else (args.minutes or 60.0) * 60
+
+    # highscore / font cache writes land in a scratch directory, not the real ones
+    json_path = os.path.abspath(args.json) if args.json else None
+    workdir = tempfile.TemporaryDirectory(prefix="soak-")
+    os.chdir(workdir.name)
+
+    if args.tracemalloc:
+        tracemalloc.start(10)
+    soak = Soak(args.seed, args.headless, round(args.max_run / SIM_DT))
+    ticks_per_sample = max(1, round(args.sample_every / SIM_DT))
+    warmup_ticks = round(args.warmup / SIM_DT)
+    end_ticks = warmup_ticks + round(sim_seconds / SIM_DT)
+
+    for _ in range(warmup_ticks):
+        soak.frame()
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot() if args.tracemalloc else None
+    frame_times: list[float] = [soak.frame() for _ in range(ticks_per_sample)]
+    baseline = soak.sample(frame_times)
+    samples = [baseline]
+    print(f"{'sim h':>7} {'resets':>7} {'RSS MB':>8} {'objects':>8} {'entities':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+
+    def show(s: dict) -> None:
+        f = s["frame_ms"]
+        print(f"{s['sim_hours']:7.2f} {s['resets']:7d} {s['rss_mb']:8.1f} {s['gc_objects']:8d} "
+              f"{sum(s['entities'].values()):8d} {f['p50']:7.3f} {f['p95']:7.3f} {f['p99']:7.3f}")
+
+    show(baseline)
+    wall = time.perf_counter()
+    while soak.ticks < end_ticks or soak.resets < args.min_resets:
+        frame_times = [soak.frame() for _ in range(ticks_per_sample)]
+        gc.collect()
+        samples.append(soak.sample(frame_times))
+        show(samples[-1])
+    wall = time.perf_counter() - wall
+
+    failures = check(baseline, samples, args)
+    if snapshot is not None:
+        print("top allocation growth since baseline:")
+        for stat in tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:10]:
+            print(f"  {stat}")
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"samples": samples, "failures": failures, "wall_seconds": wall}, f, indent=1)
+    sim_hours = (soak.ticks - warmup_ticks) * SIM_DT / 3600
+    print(f"{sim_hours:.2f} simulated hours, {soak.resets} resets in {wall:.0f} s wall")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    workdir.cleanup()
+    if failures:
+        return 1
+    print("OK: no growth past budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -4,28 +4,39 @@ import random
 from typing import List, Tuple
 
 from lane_system import LaneSystem
-from entities import Enemy, EnemyType, Pickup, PickupType
+from lane_index import LaneIndex
+from archetypes import BASIC_ENEMY, ENEMY_SPAWN, PICKUP_SPAWN
+from entities import Enemy, Pickup, ENEMY_WIDTH, ENEMY_HEIGHT, swap_remove
 from settings import (
     BASE_SCROLL_SPEED,
     SPAWN_INTERVAL_START,
     SPAWN_INTERVAL_MIN,
     SPAWN_INTERVAL_DECAY,
-    ENEMY_NORMAL_PROB,
-    ENEMY_LEVEL2_PROB,
-    ENEMY_SPECIAL_PROB,
     PICKUP_SPAWN_CHANCE,
-    PICKUP_AMMO_PROB,
-    PICKUP_HP_PROB,
-    PICKUP_COIN_PROB,
     MAX_ELITE_PER_LANE,
+    PICKUP_RADIUS,
+    LANE_COUNT,
 )
 
 
+def _is_elite(enemy: Enemy) -> bool:
+    return enemy.arch.elite
+
+
 class Spawner:
-    def __init__(self, lane_system: LaneSystem) -> None:
+    def __init__(self, lane_system: LaneSystem, rng: random.Random | None = None) -> None:
         self.lane_system = lane_system
+        # all spawn randomness goes through this RNG so a seeded run is reproducible
+        self.rng = rng if rng is not None else random.Random()
+        # the lists are unordered (swap-remove); the lane indexes answer collision
+        # and per-lane elite queries without scanning every entity
         self.enemies: List[Enemy] = []
         self.pickups: List[Pickup] = []
+        self.enemy_index = LaneIndex(lane_system, ENEMY_WIDTH / 2, ENEMY_HEIGHT / 2, is_elite=_is_elite)
+        self.pickup_index = LaneIndex(lane_system, PICKUP_RADIUS, PICKUP_RADIUS)
+        self._spawn_count = 0
+        # wider arenas get more spawns per wave, so every lane stays as busy as in the 3-lane game
+        self.pairs_per_wave = max(1, round(lane_system.lane_count / LANE_COUNT))
 
         self.time_since_last_spawn: float = 0.0
         self.spawn_interval: float = SPAWN_INTERVAL_START
@@ -48,66 +59,98 @@ class Spawner:
 
     def spawn_pair(self) -> None:
         # spawn enemy with weighted type probabilities
-        lane_idx = random.randrange(self.lane_system.lane_count)
+        lane_idx = self.rng.randrange(self.lane_system.lane_count)
         x = self.lane_system.lane_center_x(lane_idx)
         y = -80
 
         # limit number of level2 + special enemies in the same lane
-        elite_in_lane = sum(
-            1
-            for e in self.enemies
-            if e.lane_index == lane_idx and e.enemy_type in (EnemyType.LEVEL2, EnemyType.SPECIAL)
-        )
+        elite_in_lane = self.enemy_index.elite_count[lane_idx]
 
-        r = random.random()
+        r = self.rng.random()
         if elite_in_lane >= MAX_ELITE_PER_LANE:
-            # force normal enemy if lane already has enough elites
-            enemy_type = EnemyType.NORMAL
+            # force a non-shooting enemy if lane already has enough elites
+            enemy_type = BASIC_ENEMY
         else:
-            if r < ENEMY_NORMAL_PROB:
-                enemy_type = EnemyType.NORMAL
-            elif r < ENEMY_NORMAL_PROB + ENEMY_LEVEL2_PROB:
-                enemy_type = EnemyType.LEVEL2
-            else:
-                enemy_type = EnemyType.SPECIAL
-
-        enemy = Enemy(lane_idx, x, y, self.current_speed, enemy_type, shoot_interval=self.current_shoot_interval)
+            enemy_type = ENEMY_SPAWN.pick(r)
+
+        enemy = Enemy.acquire(lane_idx, x, y, self.current_speed, enemy_type, shoot_interval=self.current_shoot_interval)
+        enemy.spawn_id = self._spawn_count
+        self._spawn_count += 1
         self.enemies.append(enemy)
+        self.enemy_index.add(enemy)
 
         # chance to spawn a pickup in (possibly) different lane
-        if random.random() < PICKUP_SPAWN_CHANCE:
-            pick_lane = random.randrange(self.lane_system.lane_count)
+        if self.rng.random() < PICKUP_SPAWN_CHANCE:
+            pick_lane = self.rng.randrange(self.lane_system.lane_count)
             pick_x = self.lane_system.lane_center_x(pick_lane)
             pick_y = y - 120
-            # decide pickup type based on configurable probabilities
-            pr = random.random()
-            if pr < PICKUP_AMMO_PROB:
-                pickup_type = PickupType.AMMO
-            elif pr < PICKUP_AMMO_PROB + PICKUP_HP_PROB:
-                pickup_type = PickupType.HP
-            else:
-                pickup_type = PickupType.COIN
-            pickup = Pickup(pick_lane, pick_x, pick_y, self.current_speed, pickup_type)
+            # decide pickup type based on the configured spawn weights
+            pickup_type = PICKUP_SPAWN.pick(self.rng.random())
+            pickup = Pickup.acquire(pick_lane, pick_x, pick_y, self.current_speed, pickup_type)
             self.pickups.append(pickup)
+            self.pickup_index.add(pickup)
 
     def update(self, dt: float) -> None:
         self.time_since_last_spawn += dt
         if self.time_since_last_spawn >= self.spawn_interval:
             self.time_since_last_spawn = 0.0
-            self.spawn_pair()
+            for _ in range(self.pairs_per_wave):
+                self.spawn_pair()
 
         for enemy in self.enemies:
             enemy.update(dt)
         for p in self.pickups:
             p.update(dt)
 
-        # remove off-screen
-        self.enemies = [e for e in self.enemies if e.y - e.height < self.lane_system.height + 80]
-        self.pickups = [p for p in self.pickups if p.y - p.height < self.lane_system.height + 80]
+        self.enemy_index.resort()
+        self.pickup_index.resort()
+
+        # remove off-screen (in place, entities go back to their pool)
+        limit = self.lane_system.height + 80
+        self._compact(self.enemies, self.enemy_index, limit)
+        self._compact(self.pickups, self.pickup_index, limit)
+
+    @staticmethod
+    def _compact(items: list, index: LaneIndex, limit: float) -> None:
+        i = 0
+        while i < len(items):
+            item = items[i]
+            if item.y - item.height < limit:
+                i += 1
+                continue
+            index.remove(item)
+            items[i] = items[-1]
+            items.pop()
+            item.release()
+
+    def remove_dead_enemies(self) -> None:
+        enemies = self.enemies
+        i = 0
+        while i < len(enemies):
+            e = enemies[i]
+            if e.hp > 0:
+                i += 1
+                continue
+            self.enemy_index.remove(e)
+            enemies[i] = enemies[-1]
+            enemies.pop()
+            e.release()
+
+    def remove_pickups(self, gone: List[Pickup]) -> None:
+        for p in gone:
+            self.pickup_index.remove(p)
+            swap_remove(self.pickups, p)
+            p.release()
 
     def clear_all(self) -> None:
+        for e in self.enemies:
+            e.release()
+        for p in self.pickups:
+            p.release()
         self.enemies.clear()
         self.pickups.clear()
+        self.enemy_index.clear()
+        self.pickup_index.clear()
 
     def all_entities(self) -> Tuple[list, list]:
         return self.enemies, self.pickups
@@ -0,0 +1,160 @@
+"""Player save data (high score, stats, settings) written off the game thread.
+
+`Store` keeps the document in memory; `set()` / `add()` only update the
+dict and wake the writer thread, so dying with a new high score costs no
+disk I/O on the frame. The writer coalesces everything changed since its
+last write into one write of the whole document: temp file, fsync,
+previous file kept as `<path>.bak`, rename over the original. A crash
+mid-write therefore leaves either the old or the new file intact, and a
+file that fails to parse is recovered from the backup instead of
+resetting to zero.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import threading
+
+from settings import HIGHSCORE_FILE
+
+# new keys only need a default here; older files are topped up on load
+DEFAULTS: dict = {
+    "high_score": 0,
+    "coins": 0,          # collected over all runs
+    "runs_played": 0,
+    "settings": {},      # window scale, fullscreen, ...
+}
+
+
+def _read(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("save data is not an object")
+    return data
+
+
+def write_atomic(path: str, data: str | bytes) -> None:
+    """Replace `path` with `data` so a crash leaves the old or the new file, never half of one."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        f.flush()
+        os.fsync(f.fileno())
+    if os.path.exists(path):
+        os.replace(path, path + ".bak")
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # make the renames themselves durable
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class Store:
+    """In-memory save document with a background writer thread."""
+
+    def __init__(self, path: str = HIGHSCORE_FILE, defaults: dict = DEFAULTS) -> None:
+        self.path = path
+        self._data = copy.deepcopy(defaults)
+        self._data.update(self._load())
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._version = 0   # bumped by every change
+        self._written = 0   # version on disk
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def _load(self) -> dict:
+        for candidate in (self.path, self.path + ".bak"):
+            if not os.path.exists(candidate):
+                continue
+            try:
+                data = _read(candidate)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Cannot read {candidate}: {e}")
+                if candidate == self.path:
+                    # keep it for inspection; the next write must not rotate it over the good backup
+                    try:
+                        os.replace(candidate, candidate + ".corrupt")
+                    except OSError:
+                        pass
+                continue
+            if candidate != self.path:
+                print(f"[WARN] Recovered save data from {candidate}")
+            return data
+        return {}
+
+    # ===== game thread =====
+    def get(self, key: str, default=None):
+        with self._lock:
+            value = self._data.get(key, default)
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def set(self, key: str, value) -> None:
+        """Change `key` and schedule a write; returns immediately."""
+        with self._lock:
+            if self._data.get(key) == value:
+                return
+            self._data[key] = copy.deepcopy(value)
+            self._changed()
+
+    def add(self, key: str, amount: int) -> int:
+        """Increment a counter (coins, runs played); returns the new value."""
+        with self._lock:
+            value = self._data[key] = self._data.get(key, 0) + amount
+            self._changed()
+        return value
+
+    def set_max(self, key: str, value) -> bool:
+        """Raise `key` to `value` if it is higher (high scores); True if it changed."""
+        with self._lock:
+            if value <= self._data.get(key, 0):
+                return False
+            self._data[key] = value
+            self._changed()
+        return True
+
+    def _changed(self) -> None:
+        # caller holds the lock
+        self._version += 1
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="save-writer", daemon=True)
+            self._thread.start()
+        self._wake.notify_all()
+
+    # ===== writer thread =====
+    def _writer(self) -> None:
+        while True:
+            with self._lock:
+                while self._written == self._version and not self._closed:
+                    self._wake.wait()
+                if self._written == self._version:
+                    return
+                version = self._version
+                text = json.dumps(self._data, ensure_ascii=False, indent=2)
+            try:
+                write_atomic(self.path, text)
+            except OSError as e:
+                print(f"[WARN] Cannot save {self.path}: {e}")
+            with self._lock:
+                # changes made during the write are picked up by the next loop
+                self._written = version
+                self._wake.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything changed so far is on disk; False on timeout."""
+        with self._lock:
+            return self._wake.wait_for(lambda: self._written == self._version, timeout)
+
+    def close(self, timeout: float | None = 2.0) -> None:
+        """Write pending changes and stop the writer (call once at exit)."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,217 @@
+"""Seed sweep: run many seeded headless games with the scripted bot on all cores.
+
+--set takes a settings.py name, or an archetype field as
+enemy.<name>.<field> / pickup.<name>.<field> (names and fields from
+archetypes.json; "weight" is short for spawn_weight).
+
+Examples:
+    python sweep.py --runs 5000 --set SPAWN_INTERVAL_DECAY=0.03 --set PICKUP_SPAWN_CHANCE=0.25
+    python sweep.py --set enemy.normal.weight=0.5 --set enemy.special.first_shot_delay=2.0
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import archetypes
+import settings
+from profiler import percentile
+
+PERCENTILES = (5, 25, 50, 75, 95)
+# archetype fields a sweep may change; shot / effect / looks change what a type is, not its balance
+ENEMY_FIELDS = ("hp", "speed_mult", "first_shot_delay", "kill_score", "spawn_weight")
+PICKUP_FIELDS = ("amount", "score", "speed_mult", "spawn_weight")
+
+
+def _archetype_field(name: str) -> tuple[object, str] | None:
+    """(archetype record, field) for enemy.<name>.<field> / pickup.<name>.<field>, else None."""
+    kind, _, rest = name.partition(".")
+    type_name, _, field = rest.rpartition(".")
+    field = "spawn_weight" if field == "weight" else field
+    if kind == "enemy":
+        records, ids, fields = archetypes.ENEMIES, archetypes.ENEMY_IDS, ENEMY_FIELDS
+    elif kind == "pickup":
+        records, ids, fields = archetypes.PICKUPS, archetypes.PICKUP_IDS, PICKUP_FIELDS
+    else:
+        return None
+    if type_name not in ids or field not in fields:
+        return None
+    return records[ids[type_name]], field
+
+
+def parse_override(text: str) -> tuple[str, object]:
+    """Parse NAME=VALUE into a settings or archetype override (VALUE is a Python literal)."""
+    name, sep, value = text.partition("=")
+    name = name.strip()
+    if not sep or not (hasattr(settings, name) if "." not in name else _archetype_field(name)):
+        raise argparse.ArgumentTypeError(
+            f"unknown setting: {text!r} (a settings.py name, or enemy.<name>.<field> / pickup.<name>.<field>)")
+    try:
+        parsed = ast.literal_eval(value.strip())
+    except (ValueError, SyntaxError):
+        raise argparse.ArgumentTypeError(f"bad value for {name}: {value!r}") from None
+    if "." in name and (isinstance(parsed, bool) or not isinstance(parsed, (int, float))):
+        raise argparse.ArgumentTypeError(f"bad value for {name}: {value!r} (expected a number)")
+    return name, parsed
+
+
+def resolve_overrides(overrides: dict[str, object]) -> dict[str, object]:
+    """Check parsed overrides as a whole and add what they imply; runs in the parent process.
+
+    New spawn weights become rebuilt spawn tables (ENEMY_SPAWN / PICKUP_SPAWN,
+    patched like a setting), so weights that cannot form a table raise
+    ArchetypeError here instead of inside a pool worker.
+    """
+    resolved = dict(overrides)
+    for kind, records, table in (("enemy", archetypes.ENEMIES, "ENEMY_SPAWN"),
+                                 ("pickup", archetypes.PICKUPS, "PICKUP_SPAWN")):
+        weights = {a.id: a.spawn_weight for a in records}
+        changed = False
+        for name, value in overrides.items():
+            if name.startswith(kind + "."):
+                record, field = _archetype_field(name)
+                if field == "spawn_weight":
+                    weights[record.id] = float(value)
+                    changed = True
+        if changed:
+            try:
+                resolved[table] = archetypes.SpawnTable([weights[a.id] for a in records])
+            except archetypes.ArchetypeError as e:
+                raise archetypes.ArchetypeError(f"{kind} weights {list(weights.values())}: {e}") from None
+    return resolved
+
+
+def apply_overrides(overrides: dict[str, object]) -> None:
+    """Patch settings everywhere they were imported with `from settings import ...`.
+
+    Takes the output of `resolve_overrides()`; archetype overrides change the
+    shared records.
+    """
+    settings_overrides = {}
+    for name, value in overrides.items():
+        if "." in name:
+            record, field = _archetype_field(name)
+            setattr(record, field, type(getattr(record, field))(value))
+        else:
+            settings_overrides[name] = value
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    game_modules = [
+        m for m in list(sys.modules.values())
+        if getattr(m, "__file__", None) and os.path.dirname(os.path.abspath(m.__file__)) == here
+    ]
+    for name, value in settings_overrides.items():
+        for module in game_modules:
+            if name in vars(module):
+                setattr(module, name, value)
+
+
+def _init_worker(overrides: dict[str, object]) -> None:
+    # import the game modules first so the override reaches their bound names
+    import core  # noqa: F401
+    import bots  # noqa: F401
+
+    apply_overrides(overrides)
+
+
+def run_one(seed: int, max_time: float, dt: float) -> dict:
+    """One headless run with the scripted bot; stops at death or `max_time` seconds."""
+    from bots import dodge_policy
+    from core import GameCore
+
+    core = GameCore(seed)
+    for _ in range(int(max_time / dt)):
+        if core.step(dodge_policy(core), dt):
+            break
+    return {
+        "seed": seed,
+        "score": core.player.score,
+        "coins": core.player.coins,
+        "time": core.elapsed,
+        # speed level only goes up during a run, so the final one is the peak
+        "peak_level": core.spawner.speed_level,
+        "cause": core.death_cause or "timeout",
+    }
+
+
+def run_chunk(seeds: range, max_time: float, dt: float) -> list[dict]:
+    return [run_one(seed, max_time, dt) for seed in seeds]
+
+
+def summarize(results: list[dict]) -> dict:
+    summary: dict = {"runs": len(results)}
+    for field in ("score", "time", "peak_level", "coins"):
+        values = sorted(r[field] for r in results)
+        summary[field] = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+        summary[field]["mean"] = sum(values) / len(values) if values else 0.0
+    causes = Counter(r["cause"] for r in results)
+    summary["cause"] = {cause: count / len(results) for cause, count in causes.most_common()}
+    return summary
+
+
+def print_summary(summary: dict) -> None:
+    print(f"runs: {summary['runs']}")
+    header = "".join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'mean':>10}"
+    print(f"{'':<12}{header}")
+    for field in ("score", "time", "peak_level", "coins"):
+        row = summary[field]
+        cells = "".join(f"{row['p' + str(p)]:>10.1f}" for p in PERCENTILES) + f"{row['mean']:>10.1f}"
+        print(f"{field:<12}{cells}")
+    print("death cause:")
+    for cause, share in summary["cause"].items():
+        print(f"  {cause:<10}{share * 100:6.1f}%")
+
+
+def sweep(runs: int, seed_start: int, workers: int, chunk_size: int, max_time: float, dt: float,
+          overrides: dict[str, object], progress: bool = True) -> list[dict]:
+    chunks = [range(s, min(s + chunk_size, seed_start + runs)) for s in range(seed_start, seed_start + runs, chunk_size)]
+    results: list[dict] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(overrides,)) as pool:
+        futures = [pool.submit(run_chunk, chunk, max_time, dt) for chunk in chunks]
+        # stream chunks back as they finish
+        for future in as_completed(futures):
+            results.extend(future.result())
+            if progress:
+                print(f"\r{len(results)}/{runs} runs", end="", file=sys.stderr, flush=True)
+    if progress:
+        print(file=sys.stderr)
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=25)
+    parser.add_argument("--max-time", type=float, default=300.0, help="simulated seconds before a run counts as timeout")
+    parser.add_argument("--dt", type=float, default=settings.SIM_DT)
+    parser.add_argument("--set", dest="overrides", type=parse_override, action="append", default=[],
+                        metavar="NAME=VALUE",
+                        help="override a settings.py value or an archetype field like enemy.normal.weight (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+    try:
+        overrides = resolve_overrides(dict(args.overrides))
+    except archetypes.ArchetypeError as e:
+        parser.error(f"bad --set: {e}")
+
+    start = time.perf_counter()
+    results = sweep(args.runs, args.seed_start, args.workers, args.chunk_size, args.max_time, args.dt, overrides)
+    summary = summarize(results)
+    summary["wall_seconds"] = time.perf_counter() - start
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+        print(f"wall: {summary['wall_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""Batch engine: same seeds and inputs give the same runs as the scalar GameCore."""
+from batch_env import BatchEnv, check_parity
+from core import GameCore
+
+
+def test_batch_engine_matches_core():
+    check_parity(seeds=range(8), ticks=3600)
+
+
+def test_start_state_matches_core():
+    batch = BatchEnv(2, seeds=[1, 2])
+    core = GameCore(1)
+    assert int(batch.lane[0]) == core.player.lane_index
+    assert float(batch.current_x[0]) == core.player.current_x
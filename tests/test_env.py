@@ -0,0 +1,30 @@
+"""Training environment: observations are plain arrays the caller may hold on to."""
+import numpy as np
+
+from core import Action
+from env import LaneRunnerEnv
+
+
+def test_pixel_observations_can_be_kept():
+    env = LaneRunnerEnv("pixels")
+    kept = [env.reset(seed=3)]
+    # a replay buffer holds every observation; rendering must not trip over any of them
+    for t in range(20):
+        obs, _, done, _ = env.step(Action.SHOOT if t % 5 == 0 else Action.NOOP)
+        kept.append(obs)
+        if done:
+            kept.append(env.reset())
+    assert all(o.shape == env.observation_shape and o.dtype == np.uint8 for o in kept)
+    # the last frame is still intact while the next one is drawn into the other buffer
+    last = kept[-1].copy()
+    env.step(Action.NOOP)
+    assert np.array_equal(kept[-1], last)
+    env.close()
+
+
+def test_grid_marks_player_lane():
+    env = LaneRunnerEnv("grid")
+    obs = env.reset(seed=3)
+    assert obs[0, env.core.player.lane_index, -1] == 1.0
+    assert obs[0].sum() == 1.0
+    env.close()
@@ -0,0 +1,31 @@
+"""Game-over screen: the run's percentile shows up once the history writer has ranked it."""
+from game import Game
+from history import run_record
+
+
+def test_percentile_line_appears_after_ranking(tmp_path, monkeypatch):
+    # Store, RunHistory and replays all write relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    game = Game(save_replays=False)
+    try:
+        game.core.step()
+        game.core.game_over = True
+        game.core.player.score = 10**6
+        assert game.draw()
+        layer = game.compositor.layers["game_over"]
+        assert layer.key[2] is None
+        without = layer.bounds.height
+
+        # two earlier runs, then the one just finished; the writer ranks it in the background
+        for seed in (1, 2):
+            game.history.append({**run_record(game.core, seed), "score": seed})
+        game.history.append(run_record(game.core, 3))
+        assert game.history.flush(5.0)
+        assert game.history.last_percentile == 100.0
+        # nothing else changed on the game-over screen: the new percentile alone must redraw it
+        assert game.draw()
+        assert layer.key[2] == 100.0
+        assert layer.bounds.height > without
+    finally:
+        game.store.close()
+        game.history.close()
@@ -0,0 +1,66 @@
+"""Quality governor: steps down under load, back up with hysteresis, and does not flap at the edge."""
+from governor import FULL, NEAREST, NEAR_ONLY, QualityGovernor
+from settings import GOVERNOR_UP_FRAMES_MAX
+
+BUDGET = 1.0 / 60
+
+
+def _run(gov: QualityGovernor, frames: int, cost) -> list[int]:
+    """Feed `frames` frames whose work is cost(level) * BUDGET; returns the level after each change."""
+    changes = []
+    for _ in range(frames):
+        if gov.end_frame(cost(gov.level) * BUDGET):
+            changes.append(gov.level)
+    return changes
+
+
+def test_steps_down_one_level_per_window():
+    gov = QualityGovernor(BUDGET, window=10, up_frames=50)
+    assert _run(gov, 9, lambda level: 1.2) == []
+    assert _run(gov, 1, lambda level: 1.2) == [NEAREST]
+    assert _run(gov, 10, lambda level: 1.2) == [NEAR_ONLY]
+
+
+def test_no_change_between_thresholds():
+    gov = QualityGovernor(BUDGET, window=10, up_frames=50)
+    _run(gov, 10, lambda level: 1.2)
+    assert gov.level == NEAREST
+    assert _run(gov, 5000, lambda level: 0.75) == []
+
+
+def test_steps_up_after_up_frames():
+    gov = QualityGovernor(BUDGET, window=10, up_frames=50)
+    _run(gov, 10, lambda level: 1.2)
+    assert _run(gov, 49, lambda level: 0.3) == []
+    assert _run(gov, 1, lambda level: 0.3) == [FULL]
+
+
+def test_edge_machine_backs_off_instead_of_flapping():
+    # full quality is just too slow, the next level is comfortably fast
+    def cost(level):
+        return 1.0 if level == FULL else 0.5
+
+    gov = QualityGovernor(BUDGET, window=10, up_frames=50)
+    changes = _run(gov, 100_000, cost)
+    # every failed retry doubles the wait: 50, 100, ... up to the cap, then one try per cap
+    retries = changes.count(FULL)
+    assert gov.up_frames == GOVERNOR_UP_FRAMES_MAX
+    assert retries <= 7 + 100_000 // GOVERNOR_UP_FRAMES_MAX
+
+
+def test_restored_level_that_holds_resets_the_wait():
+    gov = QualityGovernor(BUDGET, window=10, up_frames=50)
+    _run(gov, 10, lambda level: 1.2)
+    _run(gov, 50, lambda level: 0.3)  # back to full
+    _run(gov, 10, lambda level: 1.2)  # fails right away
+    assert gov.up_frames == 100
+    _run(gov, 100, lambda level: 0.3)
+    assert gov.level == FULL
+    _run(gov, 200, lambda level: 0.3)
+    assert gov.up_frames == 50
+
+
+def test_skipped_levels_are_passed_over():
+    gov = QualityGovernor(BUDGET, window=10, up_frames=50, skip=(NEAREST,))
+    assert _run(gov, 10, lambda level: 1.2) == [NEAR_ONLY]
+    assert _run(gov, 50, lambda level: 0.3) == [FULL]
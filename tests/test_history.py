@@ -0,0 +1,60 @@
+"""Run history: percentile and top-N over the .col files match a plain sort, before and after compaction."""
+import numpy as np
+import pytest
+
+from history import COLUMNS, RunHistory
+
+
+def _record(i: int, score: int) -> dict:
+    return {"ended": 1_700_000_000 + i * 600, "score": score, "coins": i % 7, "duration": 30.0,
+            "max_level": 2, "cause": 1, "seed": i}
+
+
+@pytest.fixture
+def filled(tmp_path):
+    scores = np.random.default_rng(3).integers(0, 5000, 53).tolist()
+    history = RunHistory(str(tmp_path), compact_every=20)
+    for start, stop in ((0, 40), (40, len(scores))):  # compacts after the first batch only
+        for i in range(start, stop):
+            history.append(_record(i, scores[i]))
+        assert history.flush(5.0)
+    yield history, scores
+    history.close()
+
+
+def _expected_percentile(scores, score):
+    return 100.0 * sum(s < score for s in scores) / len(scores)
+
+
+def test_queries_cover_index_and_tail(filled):
+    history, scores = filled
+    assert history.rows() == len(scores)
+    assert 0 < history._index_rows() < len(scores)  # compacted rows plus an unindexed tail
+    for score in (-1, 0, scores[0], scores[-1], 2500, 10_000):
+        assert history.percentile(score) == pytest.approx(_expected_percentile(scores, score))
+    top = history.top(10)
+    assert [run["score"] for run in top] == sorted(scores, reverse=True)[:10]
+    assert set(top[0]) == set(COLUMNS)
+    assert top[0]["cause"] == "enemy"
+
+
+def test_queries_unchanged_by_compaction(filled):
+    history, scores = filled
+    before = (history.percentile(2500), history.top(5))
+    history.compact()
+    assert history._index_rows() == len(scores)
+    assert (history.percentile(2500), history.top(5)) == before
+
+
+def test_last_percentile_ranks_newest_run(filled):
+    history, scores = filled
+    history.append(_record(len(scores), 2500))
+    assert history.flush(5.0)
+    assert history.last_percentile == pytest.approx(_expected_percentile(scores, 2500))
+
+
+def test_empty_history(tmp_path):
+    history = RunHistory(str(tmp_path))
+    assert history.percentile(100) is None
+    assert history.top(3) == []
+    history.close()
@@ -0,0 +1,55 @@
+"""Input pipeline: which events get through, and in what order they reach the sim."""
+import time
+
+import pygame
+
+from game import Game
+from inputs import WINDOW_EVENTS, InputPipeline
+
+
+def test_window_events_repaint_static_screen(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    game = Game(save_replays=False)
+    try:
+        assert not any(pygame.event.get_blocked(t) for t in WINDOW_EVENTS)
+        assert pygame.event.get_blocked(pygame.MOUSEMOTION)
+        game.core.game_over = True
+        game.draw()
+        # a static game-over screen is not redrawn...
+        assert not game.draw()
+        # ...until the window asks for it (what run() does on a window event)
+        game.compositor.invalidate()
+        assert game.draw()
+    finally:
+        game.store.close()
+        game.history.close()
+
+
+def test_wait_stamps_events_in_arrival_order():
+    pygame.display.init()
+    pygame.display.set_mode((8, 8))
+    pipeline = InputPipeline()
+    pipeline.install()
+    pygame.event.clear()
+    start = time.perf_counter()
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_LEFT, probe_time=start - 0.02))
+    pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(1, 1)))  # blocked
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RIGHT, probe_time=start - 0.01))
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+    events = pipeline.wait(time.perf_counter() + 0.01)
+    assert [e.key for _, e in events] == [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE]
+    stamps = [t for t, _ in events]
+    assert stamps[:2] == [start - 0.02, start - 0.01]
+    assert stamps == sorted(stamps)
+
+
+def test_due_hands_out_presses_by_tick():
+    pipeline = InputPipeline()
+    for when, action in ((1.000, 1), (1.010, 2), (1.020, 3), (1.040, 4)):
+        pipeline.push(when, action)
+    assert pipeline.due(1.0, False) == []
+    assert pipeline.due(1.0167, False) == [(1.000, 1), (1.010, 2)]
+    assert pipeline.due(1.0333, False) == [(1.020, 3)]
+    # the frame's last tick takes the rest, even presses after its span
+    assert pipeline.due(1.0333, True) == [(1.040, 4)]
+    assert not pipeline.pending
@@ -0,0 +1,25 @@
+"""Invariants the benchmarks only print: pooling stays allocation-free."""
+from bench import count_allocations
+from core import GameCore
+from entities import Bullet, Enemy, LaserBeam, Pickup
+
+
+def test_pools_reach_steady_state():
+    # after warm-up every enemy, pickup, bullet and laser comes from a free list
+    new_entities, _ = count_allocations(warmup=6000, ticks=3000)
+    assert new_entities == 0
+
+
+def test_reset_returns_entities_to_pools():
+    core = GameCore(3)
+    for _ in range(3000):
+        if core.step():
+            break
+    pooled = (Enemy, Pickup, Bullet, LaserBeam)
+    created = [cls.created for cls in pooled]
+    # a new run with the same seed reuses everything the first one released
+    core.reset(3)
+    for _ in range(3000):
+        if core.step():
+            break
+    assert [cls.created for cls in pooled] == created
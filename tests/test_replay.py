@@ -0,0 +1,51 @@
+"""Replays: a recorded run verifies from its seed; tampering and old versions are rejected."""
+import pytest
+
+import replay
+from bots import dodge_policy
+from core import Action, GameCore
+from replay import Replay, ReplayError, ReplayRecorder
+
+
+def _recorded(seed: int, ticks: int, keyframe_seconds: float = 5.0) -> tuple[Replay, GameCore]:
+    core = GameCore(seed)
+    recorder = ReplayRecorder(seed, keyframe_seconds)
+    for _ in range(ticks):
+        action = dodge_policy(core)
+        if action != Action.NOOP:
+            recorder.record(core.tick, action)
+        if core.step(action):
+            break
+        recorder.on_tick(core)
+    return recorder.finish(core), core
+
+
+def test_recorded_run_verifies_after_save(tmp_path):
+    recorded, core = _recorded(11, 1500)
+    assert recorded.inputs and recorded.keyframes
+    path = tmp_path / "run.rpl"
+    recorded.save(str(path))
+    loaded = Replay.load(str(path))
+    assert loaded.inputs == recorded.inputs
+    assert replay.verify(loaded)
+    assert replay.seek(loaded, loaded.final_tick).snapshot() == core.snapshot()
+
+
+def test_tampered_score_fails_verify():
+    recorded, _ = _recorded(11, 1500)
+    recorded.final_score += 5
+    assert not replay.verify(recorded)
+
+
+@pytest.mark.parametrize("version", [0, 1, replay.VERSION + 1])
+def test_other_versions_are_rejected(version):
+    data = bytearray(_recorded(11, 300)[0].to_bytes())
+    data[len(replay.MAGIC)] = version
+    with pytest.raises(ReplayError, match="unsupported version"):
+        Replay.from_bytes(bytes(data))
+
+
+def test_truncated_replay_raises():
+    data = _recorded(11, 1500)[0].to_bytes()
+    with pytest.raises(ReplayError):
+        Replay.from_bytes(data[:-40])
@@ -0,0 +1,97 @@
+"""Game server: zigzag/varint round trips, STATE deltas decode against the acked view, oversized frames."""
+import asyncio
+
+import pytest
+
+from bots import dodge_policy
+from replay import read_varint, write_varint
+from server import (
+    _FRAME, ACK, ClientView, GameServer, Session, _unzigzag, _zigzag, encode_state, frame, read_frame,
+)
+from settings import SERVER_HOST, SERVER_STATE_HISTORY
+
+VALUES = [0, 1, -1, 2, -2, 63, -64, 64, 127, 128, -129, 300, 2**31, -(2**31), 2**62, -(2**63)]
+
+
+def test_zigzag_varint_round_trip():
+    out = bytearray()
+    for v in VALUES:
+        assert _zigzag(v) >= 0
+        assert _unzigzag(_zigzag(v)) == v
+        write_varint(out, _zigzag(v))
+    pos = 0
+    decoded = []
+    for _ in VALUES:
+        z, pos = read_varint(bytes(out), pos)
+        decoded.append(_unzigzag(z))
+    assert decoded == VALUES and pos == len(out)
+    assert [_zigzag(v) for v in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+
+
+def test_delta_against_base_decodes():
+    base = {1: (0, 1, 2, 10), 2: (1, 0, 0, -5), 3: (2, 2, 0, 40)}
+    entities = {1: (0, 1, 2, 14), 3: (2, 2, 0, 40), 4: (3, 1, 0, -7), 2: (1, 2, 0, -5)}
+    client = ClientView()
+    client.apply(encode_state(1, 0, 5, (1,) * 8, base, {}))
+    client.apply(encode_state(2, 1, 6, (2,) * 8, entities, base))
+    assert client.entities == entities
+    assert client.player == (2,) * 8 and client.tick == 6
+    # an unchanged entity costs nothing
+    assert len(encode_state(3, 2, 7, (2,) * 8, entities, entities)) < len(encode_state(3, 0, 7, (2,) * 8, entities, {}))
+
+
+def _play(session: Session, client: ClientView, ticks: int, ack_every: int) -> None:
+    for t in range(ticks):
+        session.inputs.append(dodge_policy(session.core))
+        session.tick()
+        seq = client.apply(session.encode())
+        assert session.sent[seq] == (client.player, client.entities)
+        if t % ack_every == 0:
+            session.ack(seq)
+
+
+@pytest.mark.parametrize("ack_every", [1, 7])
+def test_session_views_match_after_acks(ack_every):
+    session = Session(1, None)
+    client = ClientView()
+    _play(session, client, 600, ack_every)
+    assert session.acked > session.seq - ack_every
+
+
+def test_client_that_stops_acking_gets_full_states():
+    session = Session(1, None)
+    client = ClientView()
+    _play(session, client, 10, 1)
+    for _ in range(SERVER_STATE_HISTORY + 5):
+        session.tick()
+        client.apply(session.encode())
+    assert session.acked == 0
+    body = session.encode()
+    assert read_varint(body, read_varint(body, 1)[1])[0] == 0  # base seq 0: full state
+    client.apply(body)
+    assert session.sent[session.seq] == (client.player, client.entities)
+
+
+def test_oversized_frame_drops_the_session():
+    async def run():
+        server = GameServer(metrics_interval=0)
+        port = await server.start(SERVER_HOST, 0)
+        try:
+            reader, writer = await asyncio.open_connection(SERVER_HOST, port)
+            await read_frame(reader)  # welcome
+            assert len(server.sessions) == 1
+            ack = bytearray([ACK])
+            write_varint(ack, 0)
+            # only the length prefix: the server must not wait for (or buffer) the body
+            writer.write(frame(bytes(ack)) + _FRAME.pack(2**31))
+            async def drain():
+                while not reader.at_eof():
+                    await reader.read(65536)
+
+            await asyncio.wait_for(drain(), timeout=5.0)
+            assert server.sessions == {}
+            writer.close()
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,72 @@
+"""Snapshots: a restored core continues bit for bit; damaged input raises SnapshotError."""
+import struct
+
+import pytest
+
+import snapshot
+from bots import dodge_policy
+from core import GameCore
+from snapshot import SnapshotError
+
+
+def _played(seed: int, ticks: int) -> GameCore:
+    core = GameCore(seed)
+    for _ in range(ticks):
+        if core.step(dodge_policy(core)):
+            break
+    return core
+
+
+def test_round_trip_is_deterministic():
+    original = _played(5, 900)
+    copy = GameCore.from_snapshot(original.snapshot())
+    assert copy.snapshot() == original.snapshot()
+    for _ in range(2000):
+        action = dodge_policy(original)
+        original.step(action)
+        copy.step(action)
+    assert copy.snapshot() == original.snapshot()
+
+
+def test_failed_restore_leaves_core_untouched():
+    data = _played(5, 900).snapshot()
+    core = _played(9, 300)
+    before = core.snapshot()
+    with pytest.raises(SnapshotError):
+        core.restore(data[:-7])
+    assert core.snapshot() == before
+
+
+@pytest.mark.parametrize("cut", [0, 3, snapshot._HEADER.size, 200, -1])
+def test_truncated(cut):
+    data = _played(5, 600).snapshot()
+    with pytest.raises(SnapshotError):
+        GameCore.from_snapshot(data[:cut])
+
+
+def test_wrong_magic():
+    data = _played(5, 600).snapshot()
+    with pytest.raises(SnapshotError):
+        GameCore.from_snapshot(b"SNAQ" + data[4:])
+
+
+@pytest.mark.parametrize("lanes", [0, snapshot.MAX_LANES + 1, 2**32 - 1])
+def test_bad_lane_count(lanes):
+    data = _played(5, 600).snapshot()
+    header = snapshot._HEADER.pack(snapshot.MAGIC, snapshot.VERSION, lanes)
+    with pytest.raises(SnapshotError):
+        GameCore.from_snapshot(header + data[snapshot._HEADER.size:])
+    with pytest.raises(SnapshotError):
+        snapshot.lane_count(header)
+
+
+def test_file_round_trip(tmp_path):
+    core = _played(5, 600)
+    path = str(tmp_path / "suspend.bin")
+    snapshot.save(path, core, b"extra")
+    data, extra = snapshot.load(path)
+    assert data == core.snapshot() and extra == b"extra"
+    with open(path, "r+b") as f:
+        f.truncate(struct.calcsize("<I") + 10)
+    with pytest.raises(SnapshotError):
+        snapshot.load(path)
@@ -0,0 +1,57 @@
+"""Save data: writes land on disk with a backup; a damaged file is recovered from `.bak`."""
+import json
+
+from storage import Store
+
+
+def _saved(path, **values) -> None:
+    store = Store(str(path))
+    try:
+        for key, value in values.items():
+            store.set(key, value)
+        assert store.flush(2.0)
+    finally:
+        store.close()
+
+
+def test_write_then_reload(tmp_path):
+    path = tmp_path / "save.json"
+    _saved(path, high_score=120)
+    _saved(path, high_score=340)
+    assert json.loads(path.read_text(encoding="utf-8"))["high_score"] == 340
+    assert json.loads((tmp_path / "save.json.bak").read_text(encoding="utf-8"))["high_score"] == 120
+    store = Store(str(path))
+    assert store.get("high_score") == 340
+    assert store.get("runs_played") == 0  # missing keys come from DEFAULTS
+    store.close()
+
+
+def test_truncated_file_recovers_from_backup(tmp_path):
+    path = tmp_path / "save.json"
+    _saved(path, high_score=120)
+    _saved(path, high_score=340)
+    path.write_bytes(path.read_bytes()[:9])
+    store = Store(str(path))
+    assert store.get("high_score") == 120
+    assert (tmp_path / "save.json.corrupt").exists()
+    # the next write must not rotate the good backup away
+    store.set("coins", 5)
+    assert store.flush(2.0)
+    store.close()
+    assert json.loads((tmp_path / "save.json.bak").read_text(encoding="utf-8"))["high_score"] == 120
+    assert Store(str(path)).get("high_score") == 120
+
+
+def test_missing_file_recovers_from_backup(tmp_path):
+    path = tmp_path / "save.json"
+    _saved(path, high_score=120)
+    _saved(path, high_score=340)
+    path.unlink()
+    assert Store(str(path)).get("high_score") == 120
+
+
+def test_unreadable_everything_starts_fresh(tmp_path):
+    path = tmp_path / "save.json"
+    path.write_text("[1, 2]", encoding="utf-8")
+    (tmp_path / "save.json.bak").write_text("{", encoding="utf-8")
+    assert Store(str(path)).get("high_score") == 0